@@ -0,0 +1,246 @@
+"""
+Audit Log for Lumorange Management System
+Asynchronous, batched writer for the audit_log table
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import date, datetime
+
+# Same definition as optimize_database.create_audit_tables()
+AUDIT_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        table_name VARCHAR(50) NOT NULL,
+        record_id INT NOT NULL,
+        action ENUM('INSERT', 'UPDATE', 'DELETE') NOT NULL,
+        old_values JSON,
+        new_values JSON,
+        user_id VARCHAR(50) DEFAULT 'system',
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_audit_table_record (table_name, record_id),
+        INDEX idx_audit_timestamp (timestamp),
+        INDEX idx_audit_user (user_id)
+    )
+"""
+
+# MySQLdb rewrites executemany() of an INSERT ... VALUES into multi-row INSERTs
+AUDIT_INSERT = """
+    INSERT INTO audit_log (table_name, record_id, action, old_values, new_values, user_id, timestamp)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+BACKPRESSURE_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _to_json(values):
+    return json.dumps(values, default=_json_value) if values is not None else None
+
+
+class AuditLog:
+    """Records data changes without adding database work to the request
+
+    - `record()` only puts a tuple on a bounded in-memory queue; JSON
+      encoding and the INSERTs happen on a background thread
+    - the thread writes up to AUDIT_BATCH_SIZE entries per multi-row INSERT
+      and commit, every AUDIT_FLUSH_SECONDS or as soon as a batch is full
+    - when the queue is full AUDIT_BACKPRESSURE decides: 'drop_oldest'
+      (default), 'drop_newest', or 'block' for up to AUDIT_BLOCK_SECONDS
+      before dropping; drops are counted in `stats()`
+    - the queue is flushed at interpreter exit; a failed batch is put back
+      and retried on the next flush
+
+    Routes call `snapshot()` for the old values before an update or delete
+    (a primary key lookup on the request's own connection) and `record()`
+    after their commit, so rolled-back changes are never logged.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self.backpressure = 'drop_oldest'
+        self.block_seconds = 0.05
+        self._queue = queue.Queue(maxsize=10000)
+        self._retry = []
+        self._flush_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._schema_ready = False
+        self._stats = {'recorded': 0, 'written': 0, 'batches': 0, 'dropped': 0, 'errors': 0}
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 500)
+        app.config.setdefault('AUDIT_FLUSH_SECONDS', 1.0)
+        app.config.setdefault('AUDIT_BACKPRESSURE', 'drop_oldest')
+        app.config.setdefault('AUDIT_BLOCK_SECONDS', 0.05)
+        if app.config['AUDIT_BACKPRESSURE'] not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"AUDIT_BACKPRESSURE must be one of {', '.join(BACKPRESSURE_POLICIES)}")
+        self.mysql = mysql
+        self.batch_size = app.config['AUDIT_BATCH_SIZE']
+        self.flush_interval = app.config['AUDIT_FLUSH_SECONDS']
+        self.backpressure = app.config['AUDIT_BACKPRESSURE']
+        self.block_seconds = app.config['AUDIT_BLOCK_SECONDS']
+        self._queue = queue.Queue(maxsize=app.config['AUDIT_QUEUE_SIZE'])
+        app.extensions['audit_log'] = self
+        atexit.register(self._flush_at_exit)
+
+    def _ensure_thread(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Entries queued by the parent before fork belong to the parent
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._retry = []
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='lumorange-audit-log', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing audit log: {e}")
+
+    def _flush_at_exit(self):
+        try:
+            written = self.flush()
+            if written:
+                print(f"Wrote {written} pending audit log entries at shutdown")
+        except Exception as e:
+            print(f"Error writing audit log at shutdown: {e}")
+
+    def snapshot(self, cur, table_name, key, key_column='id'):
+        """Current row as a dict (works with tuple and dict cursors), or None
+
+        `table_name` and `key_column` must be trusted identifiers, never user input.
+        """
+        cur.execute(f"SELECT * FROM {table_name} WHERE {key_column} = %s", (key,))
+        row = cur.fetchone()
+        if row is None or isinstance(row, dict):
+            return row
+        return dict(zip([column[0] for column in cur.description], row))
+
+    def snapshot_many(self, cur, table_name, ids):
+        """Current rows for a bulk change, as {id: row dict}, in one query"""
+        if not ids:
+            return {}
+        placeholders = ','.join(['%s'] * len(ids))
+        cur.execute(f"SELECT * FROM {table_name} WHERE id IN ({placeholders})", list(ids))
+        rows = {}
+        columns = None
+        for row in cur.fetchall():
+            if not isinstance(row, dict):
+                columns = columns or [column[0] for column in cur.description]
+                row = dict(zip(columns, row))
+            rows[row['id']] = row
+        return rows
+
+    def record(self, table_name, record_id, action, old_values=None, new_values=None, user_id='system'):
+        """Queue an audit entry; never touches the database"""
+        self._ensure_thread()
+        entry = (table_name, int(record_id), action, old_values, new_values, user_id, datetime.now())
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            if not self._put_under_pressure(entry):
+                with self._lock:
+                    self._stats['dropped'] += 1
+                return False
+        with self._lock:
+            self._stats['recorded'] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _put_under_pressure(self, entry):
+        if self.backpressure == 'block':
+            self._wakeup.set()
+            try:
+                self._queue.put(entry, timeout=self.block_seconds)
+                return True
+            except queue.Full:
+                return False
+        if self.backpressure == 'drop_oldest':
+            try:
+                self._queue.get_nowait()
+                with self._lock:
+                    self._stats['dropped'] += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(entry)
+                return True
+            except queue.Full:
+                return False
+        return False
+
+    def flush(self):
+        """Write everything queued so far, one batch per INSERT and commit
+
+        Returns the number of entries written.
+        """
+        with self._flush_lock:
+            written = 0
+            while True:
+                batch, self._retry = self._retry, []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return written
+                try:
+                    self._write(batch)
+                except Exception:
+                    with self._lock:
+                        self._stats['errors'] += 1
+                    self._retry = batch
+                    raise
+                written += len(batch)
+                with self._lock:
+                    self._stats['written'] += len(batch)
+                    self._stats['batches'] += 1
+
+    def _write(self, batch):
+        rows = [(table_name, record_id, action, _to_json(old_values), _to_json(new_values), user_id, timestamp)
+                for table_name, record_id, action, old_values, new_values, user_id, timestamp in batch]
+        with self.mysql.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                if not self._schema_ready:
+                    cur.execute(AUDIT_TABLE_DDL)
+                    self._schema_ready = True
+                cur.executemany(AUDIT_INSERT, rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize() + len(self._retry),
+                        backpressure=self.backpressure)
@@ -0,0 +1,118 @@
+"""
+JSON Serialization Benchmark
+Encodes a 10,000-row payload shaped like the app's DictCursor results
+(Decimal amounts, DATE, DATETIME and TIME columns) with Flask's stock JSON
+provider and with FastJSONProvider, row- and column-oriented, and reports
+time per response and payload size. Needs no database.
+
+Usage: python benchmark_json.py [rows] [repeats]
+"""
+
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_serialization
+from json_serialization import FastJSONProvider, columnar
+
+
+def sample_rows(count):
+    """Rows like the expense and invoice detail queries return"""
+    rng = random.Random(42)
+    categories = ['travel', 'food', 'supplies', 'training', 'utilities', 'other']
+    statuses = ['pending', 'approved', 'rejected', 'reimbursed']
+    start = date(2024, 1, 1)
+    rows = []
+    for i in range(1, count + 1):
+        amount = Decimal(rng.randint(100, 5000000)) / 100
+        expense_date = start + timedelta(days=rng.randint(0, 700))
+        rows.append({
+            'id': i,
+            'employee_id': rng.randint(1, 500),
+            'employee_name': f"Employee {rng.randint(1, 500)}",
+            'expense_date': expense_date,
+            'category': rng.choice(categories),
+            'description': f"Expense report line {i}",
+            'amount': amount,
+            'tax_amount': (amount * Decimal('0.18')).quantize(Decimal('0.01')),
+            'currency': 'INR',
+            'status': rng.choice(statuses),
+            'approved_date': expense_date + timedelta(days=rng.randint(1, 10)) if i % 3 else None,
+            'submitted_time': timedelta(hours=rng.randint(8, 19), minutes=rng.randint(0, 59)),
+            'created_date': datetime.combine(expense_date, datetime.min.time()) + timedelta(minutes=rng.randint(0, 1439)),
+            'updated_date': datetime(2025, 6, 1) + timedelta(seconds=rng.randint(0, 10 ** 7)),
+        })
+    return rows
+
+
+def time_response(app, payload, repeats):
+    """Best time over `repeats` to build a Response; returns (ms, bytes)"""
+    best = float('inf')
+    with app.app_context():
+        for _ in range(repeats):
+            started = time.perf_counter()
+            response = app.json.response(payload)
+            body = response.get_data()
+            best = min(best, time.perf_counter() - started)
+    return best * 1000, len(body)
+
+
+def make_app(provider_class):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    return app
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = sample_rows(count)
+
+    stock = make_app(DefaultJSONProvider)
+    # The stock provider cannot encode TIME columns at all; give it strings
+    stock_rows = [dict(row, submitted_time=str(row['submitted_time'])) for row in rows]
+
+    fast = make_app(FastJSONProvider)
+    unsorted = make_app(FastJSONProvider)
+    unsorted.json.sort_keys = False
+
+    backend = 'orjson' if json_serialization.orjson is not None else 'json module (orjson not installed)'
+    print(f"🧾 JSON responses for {count} rows, best of {repeats} - FastJSONProvider backend: {backend}")
+    print(f"{'Provider':>28} {'Time':>10} {'Size':>10} {'Speedup':>8}")
+    print("-" * 60)
+
+    baseline_ms, size = time_response(stock, stock_rows, repeats)
+    print(f"{'Flask DefaultJSONProvider':>28} {baseline_ms:>8.1f}ms {size / 1024:>8.0f}KB {1:>7.1f}x")
+    cases = [
+        ('Fast, rows', fast, rows),
+        ('Fast, rows, unsorted keys', unsorted, rows),
+        ('Fast, columns', fast, columnar(rows)),
+    ]
+    for label, app, payload in cases:
+        elapsed_ms, size = time_response(app, payload, repeats)
+        print(f"{label:>28} {elapsed_ms:>8.1f}ms {size / 1024:>8.0f}KB {baseline_ms / elapsed_ms:>7.1f}x")
+
+    # Sanity check: nothing is lost or reformatted unexpectedly
+    with fast.app_context():
+        decoded = fast.json.loads(fast.json.response(rows[:1]).get_data())[0]
+    expected = {
+        'amount': str(rows[0]['amount']),
+        'expense_date': rows[0]['expense_date'].isoformat(),
+        'created_date': rows[0]['created_date'].isoformat(),
+        'submitted_time': json_serialization.format_time(rows[0]['submitted_time']),
+    }
+    mismatched = [key for key, value in expected.items() if decoded[key] != value]
+    if mismatched:
+        print(f"❌ Unexpected encoding for: {', '.join(mismatched)}")
+        return 1
+    print("✅ Decimals, dates, datetimes and TIME values encode as expected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
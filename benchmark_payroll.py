@@ -0,0 +1,181 @@
+"""
+Payroll Run Benchmark
+Compares row-by-row payroll generation with the set-based INSERT ... SELECT
+across increasing headcounts. Runs against a scratch database so production
+data is never touched.
+
+Usage: python benchmark_payroll.py [headcount ...]
+"""
+
+import sys
+import time
+
+import MySQLdb
+
+from payroll_generation import generate_payroll_entries
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'passwd': 'gmkr',
+}
+BENCHMARK_DB = 'lumorange_payroll_benchmark'
+DEFAULT_HEADCOUNTS = [100, 500, 1000, 2500, 5000]
+
+SCHEMA = [
+    """CREATE TABLE employees (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        status VARCHAR(20) DEFAULT 'active'
+    )""",
+    """CREATE TABLE salaries (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        employee_id INT NOT NULL,
+        basic_salary DECIMAL(10,2) NOT NULL,
+        allowances DECIMAL(10,2) DEFAULT 0,
+        deductions DECIMAL(10,2) DEFAULT 0,
+        is_active TINYINT(1) DEFAULT 1,
+        INDEX idx_salaries_employee_active (employee_id, is_active)
+    )""",
+    """CREATE TABLE payroll_runs (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        run_name VARCHAR(100),
+        total_employees INT DEFAULT 0,
+        total_gross_pay DECIMAL(14,2) DEFAULT 0,
+        total_deductions DECIMAL(14,2) DEFAULT 0,
+        total_net_pay DECIMAL(14,2) DEFAULT 0
+    )""",
+    """CREATE TABLE payroll_entries (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        payroll_run_id INT NOT NULL,
+        employee_id INT NOT NULL,
+        salary_id INT,
+        basic_salary DECIMAL(10,2),
+        allowances DECIMAL(10,2),
+        gross_pay DECIMAL(10,2),
+        total_deductions DECIMAL(10,2),
+        net_pay DECIMAL(10,2),
+        INDEX idx_payroll_entries_run_id (payroll_run_id)
+    )""",
+]
+
+
+def setup_database(headcount):
+    """Recreate the scratch schema with `headcount` salaried employees"""
+    db = MySQLdb.connect(**DB_CONFIG)
+    cur = db.cursor()
+    cur.execute(f"DROP DATABASE IF EXISTS {BENCHMARK_DB}")
+    cur.execute(f"CREATE DATABASE {BENCHMARK_DB}")
+    cur.execute(f"USE {BENCHMARK_DB}")
+    for statement in SCHEMA:
+        cur.execute(statement)
+
+    cur.executemany("INSERT INTO employees (status) VALUES (%s)",
+                    [('active',)] * headcount)
+    cur.executemany("""INSERT INTO salaries (employee_id, basic_salary, allowances, deductions)
+                       VALUES (%s, %s, %s, %s)""",
+                    [(i, 50000 + i % 1000, 5000, 2500) for i in range(1, headcount + 1)])
+    db.commit()
+    return db
+
+
+def create_run(cur, name):
+    cur.execute("INSERT INTO payroll_runs (run_name) VALUES (%s)", (name,))
+    return cur.lastrowid
+
+
+def row_by_row(db):
+    """The original create_payroll_run loop: one INSERT per employee"""
+    cur = db.cursor()
+    payroll_run_id = create_run(cur, 'row-by-row')
+    cur.execute("""
+        SELECT e.id as employee_id, s.id as salary_id, s.basic_salary, s.allowances,
+               (s.basic_salary + COALESCE(s.allowances, 0)) as gross_pay,
+               COALESCE(s.deductions, 0) as deductions,
+               (s.basic_salary + COALESCE(s.allowances, 0) - COALESCE(s.deductions, 0)) as net_pay
+        FROM employees e
+        JOIN salaries s ON e.id = s.employee_id
+        WHERE e.status = 'active' AND s.is_active = 1
+    """)
+    employees = cur.fetchall()
+    total_gross_pay = total_deductions = total_net_pay = 0
+    for emp in employees:
+        cur.execute("""
+            INSERT INTO payroll_entries
+            (payroll_run_id, employee_id, salary_id, basic_salary, allowances, gross_pay,
+             total_deductions, net_pay)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (payroll_run_id, emp[0], emp[1], emp[2], emp[3] or 0, emp[4], emp[5], emp[6]))
+        total_gross_pay += float(emp[4])
+        total_deductions += float(emp[5])
+        total_net_pay += float(emp[6])
+    cur.execute("""
+        UPDATE payroll_runs
+        SET total_employees = %s, total_gross_pay = %s, total_deductions = %s, total_net_pay = %s
+        WHERE id = %s
+    """, (len(employees), total_gross_pay, total_deductions, total_net_pay, payroll_run_id))
+    db.commit()
+    cur.close()
+    return payroll_run_id
+
+
+def set_based(db):
+    """The current create_payroll_run: INSERT ... SELECT plus aggregate totals"""
+    cur = db.cursor()
+    payroll_run_id = create_run(cur, 'set-based')
+    generate_payroll_entries(cur, payroll_run_id)
+    db.commit()
+    cur.close()
+    return payroll_run_id
+
+
+def timed(func, db):
+    started = time.perf_counter()
+    payroll_run_id = func(db)
+    return payroll_run_id, time.perf_counter() - started
+
+
+def run_totals(db, payroll_run_id):
+    cur = db.cursor()
+    cur.execute("""SELECT total_employees, total_gross_pay, total_deductions, total_net_pay
+                   FROM payroll_runs WHERE id = %s""", (payroll_run_id,))
+    totals = cur.fetchone()
+    cur.close()
+    return totals
+
+
+def main():
+    headcounts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_HEADCOUNTS
+
+    print("📊 Payroll run creation: row-by-row vs set-based")
+    print(f"{'Employees':>10} {'Row-by-row':>12} {'Set-based':>12} {'Speed-up':>10}")
+    print("-" * 48)
+
+    try:
+        for headcount in headcounts:
+            db = setup_database(headcount)
+            try:
+                legacy_run, legacy_seconds = timed(row_by_row, db)
+                set_run, set_seconds = timed(set_based, db)
+
+                # Both paths must produce identical totals
+                legacy_totals = run_totals(db, legacy_run)
+                set_totals = run_totals(db, set_run)
+                if [float(v) for v in legacy_totals] != [float(v) for v in set_totals]:
+                    print(f"❌ Totals differ at {headcount} employees: {legacy_totals} vs {set_totals}")
+                    return 1
+
+                speedup = legacy_seconds / set_seconds if set_seconds else float('inf')
+                print(f"{headcount:>10} {legacy_seconds * 1000:>10.1f}ms {set_seconds * 1000:>10.1f}ms {speedup:>9.1f}x")
+            finally:
+                db.close()
+    finally:
+        db = MySQLdb.connect(**DB_CONFIG)
+        db.cursor().execute(f"DROP DATABASE IF EXISTS {BENCHMARK_DB}")
+        db.close()
+
+    print("✅ Totals matched for every headcount")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
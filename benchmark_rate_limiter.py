@@ -0,0 +1,128 @@
+"""
+Rate Limiter Benchmark
+Compares the original list-of-timestamps RateLimiter with the token bucket
+and sliding window counter, in memory and on a shared SQLite file: checks
+per second for one busy client, and time and memory for many distinct
+clients. Needs no database server; the SQLite file is a temporary one.
+
+Usage: python benchmark_rate_limiter.py [busy_requests] [distinct_clients]
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from security_enhancements import MemoryRateLimitStore, RateLimiter, SQLiteRateLimitStore
+
+MAX_ENTRIES = 10000
+
+
+class LegacyRateLimiter:
+    """The implementation this benchmark replaces, kept verbatim for comparison"""
+
+    def __init__(self):
+        self.requests = {}
+
+    def is_allowed(self, identifier, max_requests=100, time_window=3600):
+        now = datetime.now()
+
+        if identifier not in self.requests:
+            self.requests[identifier] = []
+
+        cutoff = now - timedelta(seconds=time_window)
+        self.requests[identifier] = [
+            req_time for req_time in self.requests[identifier]
+            if req_time > cutoff
+        ]
+
+        if len(self.requests[identifier]) < max_requests:
+            self.requests[identifier].append(now)
+            return True
+
+        return False
+
+
+def busy_client(limiter, requests):
+    """One identifier hammering an endpoint whose limit it never reaches"""
+    started = time.perf_counter()
+    for _ in range(requests):
+        limiter.is_allowed('203.0.113.7', max_requests=requests + 1, time_window=3600)
+    return requests / (time.perf_counter() - started)
+
+
+def many_clients(factory, clients):
+    """Each request from a different IP; returns (seconds, bytes retained, limiter)
+
+    Timed and measured in separate passes, as tracemalloc slows allocation down.
+    """
+    addresses = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(clients)]
+    limiter = factory()
+    started = time.perf_counter()
+    for address in addresses:
+        limiter.is_allowed(address, max_requests=100, time_window=3600)
+    elapsed = time.perf_counter() - started
+
+    limiter = factory()
+    tracemalloc.start()
+    for address in addresses:
+        limiter.is_allowed(address, max_requests=100, time_window=3600)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained, limiter
+
+
+def main():
+    busy_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    distinct_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+    tmp_dir = tempfile.mkdtemp(prefix='lumorange-ratelimit-')
+    sqlite_files = itertools.count(1)
+    limiters = [
+        ('Legacy list', LegacyRateLimiter),
+        ('Token bucket', lambda: RateLimiter('token_bucket', max_entries=MAX_ENTRIES)),
+        ('Sliding window', lambda: RateLimiter('sliding_window', max_entries=MAX_ENTRIES)),
+        # A fresh file per limiter, like the in-memory ones
+        ('Sliding/SQLite', lambda: RateLimiter('sliding_window', store=SQLiteRateLimitStore(
+            os.path.join(tmp_dir, f"rate_limits_{next(sqlite_files)}.db"), max_entries=MAX_ENTRIES))),
+    ]
+
+    print(f"🚦 Rate limiters: {busy_requests} checks from one client, "
+          f"{distinct_clients} distinct clients (cap {MAX_ENTRIES})")
+    print(f"{'Limiter':>15} {'Busy checks/s':>14} {'Many: total':>12} {'Retained':>10} {'Entries':>8}")
+    print("-" * 64)
+    try:
+        for label, factory in limiters:
+            checks_per_second = busy_client(factory(), busy_requests)
+            elapsed, retained, limiter = many_clients(factory, distinct_clients)
+            store = getattr(limiter, 'store', None)
+            if isinstance(store, MemoryRateLimitStore):
+                entries = len(store)
+            elif store is not None:
+                store.prune()
+                entries = store._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+            else:
+                entries = len(limiter.requests)
+            print(f"{label:>15} {checks_per_second:>14,.0f} {elapsed * 1000:>10.0f}ms "
+                  f"{retained / 1024 / 1024:>8.1f}MB {entries:>8}")
+    finally:
+        for name in os.listdir(tmp_dir):
+            os.unlink(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+
+    # Sanity check: both new algorithms enforce the limit
+    for algorithm in ('token_bucket', 'sliding_window'):
+        limiter = RateLimiter(algorithm)
+        allowed = sum(limiter.is_allowed('198.51.100.1', max_requests=10, time_window=60) for _ in range(25))
+        if allowed != 10:
+            print(f"❌ {algorithm} allowed {allowed} of 25 requests with a limit of 10")
+            return 1
+    print("✅ Token bucket and sliding window both stop at the limit")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
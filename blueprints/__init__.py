@@ -0,0 +1,165 @@
+"""
+Blueprints for Lumorange Management System
+URL rules for each business area, registered at startup; the view modules load on first use
+"""
+
+import threading
+
+from flask import Blueprint
+from werkzeug.utils import import_string
+
+
+class LazyView:
+    """Stands in for a view function until the first request it serves
+
+    Every URL rule is registered when the app starts, so routing and
+    url_for work for the whole app straight away, but the module holding
+    the view - with the queries, paginators and dependencies of its area -
+    is only imported when one of its URLs is first requested. A worker
+    that serves nothing but the payroll pages never imports recruitment.
+    """
+
+    _import_lock = threading.Lock()
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+        self._view = None
+
+    @property
+    def view(self):
+        if self._view is None:
+            with self._import_lock:
+                if self._view is None:
+                    self._view = import_string(self.import_name)
+        return self._view
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+# Area -> (rule, view function[, methods]); the blueprint takes the area's name,
+# so endpoints are '<area>.<view function>', e.g. url_for('payroll.payroll_details')
+ROUTES = {
+    'employees': [
+        ('/employees', 'employees', ['GET', 'POST']),
+        ('/employees/update', 'update_employee', ['POST']),
+        ('/employees/delete/<string:employee_id>', 'delete_employee'),
+        ('/departments', 'departments'),
+        ('/add_department', 'add_department', ['POST']),
+        ('/update_department', 'update_department', ['POST']),
+        ('/delete_department/<int:id>', 'delete_department'),
+        ('/api/department/<int:dept_id>/employees', 'api_department_employees'),
+        ('/api/department/<int:dept_id>/details', 'api_department_details'),
+        ('/api/departments/bulk-budget-update', 'api_bulk_budget_update', ['POST']),
+        ('/api/departments/bulk-delete', 'api_bulk_delete', ['POST']),
+    ],
+    'projects': [
+        ('/projects', 'projects'),
+        ('/add_project', 'add_project', ['POST']),
+        ('/update_project', 'update_project', ['POST']),
+        ('/delete_project/<int:id>', 'delete_project'),
+        ('/employee_projects', 'employee_projects'),
+        ('/assign_employee_project', 'assign_employee_project', ['POST']),
+        ('/delete_employee_project/<int:id>', 'delete_employee_project'),
+    ],
+    'invoicing': [
+        ('/clients', 'clients'),
+        ('/add_client', 'add_client', ['POST']),
+        ('/update_client', 'update_client', ['POST']),
+        ('/delete_client/<int:id>', 'delete_client'),
+        ('/toggle_client_status', 'toggle_client_status', ['POST']),
+        ('/invoices/<int:invoice_id>', 'invoice_details'),
+        ('/invoices', 'invoices'),
+        ('/invoices/add', 'add_invoice', ['GET', 'POST']),
+        ('/update_invoice', 'update_invoice', ['POST']),
+        ('/invoice/<int:id>', 'get_invoice'),
+        ('/api/projects/<int:client_id>', 'get_projects_by_client'),
+        ('/invoices/bulk', 'bulk_invoice_operations', ['POST']),
+        ('/update_invoice_status/<int:id>/<status>', 'update_invoice_status'),
+        ('/delete_invoice/<int:id>', 'delete_invoice'),
+    ],
+    'payroll': [
+        ('/salaries', 'salaries'),
+        ('/add_salary', 'add_salary', ['POST']),
+        ('/delete_salary/<int:id>', 'delete_salary'),
+        ('/update_salary', 'update_salary', ['POST']),
+        ('/api/salary/<int:salary_id>', 'get_salary_details'),
+        ('/salaries/export', 'export_salaries'),
+        ('/payroll', 'payroll'),
+        ('/payroll/create', 'create_payroll_run', ['POST']),
+        ('/api/payroll/<int:payroll_id>/progress', 'payroll_progress'),
+        ('/payroll/<int:payroll_id>', 'payroll_details'),
+        ('/payroll/<int:payroll_id>/edit', 'edit_payroll_run', ['GET', 'POST']),
+        ('/payroll/<int:payroll_id>/delete', 'delete_payroll_run', ['POST']),
+        ('/payroll/<int:payroll_id>/status/<new_status>', 'update_payroll_status'),
+        ('/payroll/<int:payroll_id>/download', 'download_payroll_report'),
+        ('/payroll/export', 'export_payroll_data', ['POST']),
+        ('/api/payroll/export/<int:job_id>', 'payroll_export_status'),
+        ('/payroll/export/<int:job_id>/download', 'download_payroll_export'),
+    ],
+    'expenses': [
+        ('/expenses', 'expenses'),
+        ('/add_expense', 'add_expense', ['POST']),
+        ('/receipts/<sha256>', 'expense_receipt'),
+        ('/receipts/<sha256>/<variant>', 'expense_receipt_variant'),
+        ('/api/expense/<int:expense_id>', 'get_expense'),
+        ('/update_expense', 'update_expense', ['POST']),
+        ('/update_expense_status', 'update_expense_status', ['POST']),
+        ('/expenses/bulk', 'bulk_expense_operations', ['POST']),
+        ('/expenses/export', 'export_expenses'),
+        ('/approve_expense/<int:id>', 'approve_expense'),
+        ('/reject_expense/<int:id>', 'reject_expense', ['POST']),
+        ('/mark_expense_paid/<int:id>', 'mark_expense_paid'),
+        ('/delete_expense/<int:id>', 'delete_expense'),
+    ],
+    'recruitment': [
+        ('/recruitment', 'recruitment_dashboard'),
+        ('/candidates', 'candidates'),
+        ('/api/candidates/search', 'candidate_typeahead'),
+        ('/candidates/add', 'add_candidate', ['GET', 'POST']),
+        ('/job_positions', 'job_positions'),
+        ('/job_positions/<int:position_id>/matches', 'job_position_matches'),
+        ('/job_positions/add', 'add_job_position', ['GET', 'POST']),
+        ('/interviews', 'interviews'),
+        ('/schedule_interview', 'schedule_interview', ['GET', 'POST']),
+        ('/edit_interview/<int:interview_id>', 'schedule_interview', ['GET', 'POST']),
+        ('/applications', 'applications'),
+        ('/update_application_status', 'update_application_status', ['POST']),
+        ('/recruitment_reports', 'recruitment_reports'),
+        ('/offers', 'offers'),
+        ('/video_interview/<int:interview_id>', 'video_interview'),
+        ('/update_interview_status/<int:interview_id>', 'update_interview_status', ['POST']),
+        ('/update_interview_notes/<int:interview_id>', 'update_interview_notes', ['POST']),
+        ('/auto_save_notes/<int:interview_id>', 'auto_save_notes', ['POST']),
+        ('/add_candidate', 'add_candidate_alias'),
+        ('/add_job_position', 'add_job_position_alias'),
+        ('/start_interview/<int:interview_id>', 'start_interview'),
+        ('/reschedule_interview/<int:interview_id>', 'reschedule_interview'),
+        ('/cancel_interview/<int:interview_id>', 'cancel_interview', ['POST']),
+        ('/complete_interview/<int:interview_id>', 'complete_interview', ['POST']),
+        ('/view_feedback/<int:interview_id>', 'view_feedback'),
+        ('/download_report/<int:interview_id>', 'download_report'),
+        ('/view_details/<int:interview_id>', 'view_details'),
+        ('/update_status/<int:application_id>/<status>', 'update_status', ['POST']),
+        ('/download_resume/<int:application_id>', 'download_resume'),
+        ('/send_message/<int:application_id>', 'send_message'),
+        ('/view_profile/<int:candidate_id>', 'view_profile'),
+        ('/candidate_action', 'candidate_action', ['POST']),
+    ],
+}
+
+
+def register_blueprints(app):
+    """Register one blueprint per area, each view behind a LazyView"""
+    for area, routes in ROUTES.items():
+        blueprint = Blueprint(area, __name__)
+        views = {}
+        for rule, endpoint, *methods in routes:
+            # Rules sharing a view (add and edit interview) must share the LazyView
+            view = views.get(endpoint)
+            if view is None:
+                view = views[endpoint] = LazyView(f"{__name__}.{area}.{endpoint}")
+            blueprint.add_url_rule(rule, endpoint, view, methods=methods[0] if methods else None)
+        app.register_blueprint(blueprint)
+
@@ -0,0 +1,476 @@
+"""
+Employee Views for Lumorange Management System
+Employee and department pages, bulk department actions and their JSON APIs
+"""
+
+import MySQLdb.cursors
+from flask import flash, redirect, render_template, request, url_for
+
+from extensions import audit_log, conditional, dashboard_stats, mysql, reference_cache, sequences
+from json_serialization import columnar
+from pagination import KeysetPaginator
+
+# Keyset paginators for the large list pages
+EMPLOYEE_PAGINATOR = KeysetPaginator({
+    'name': ('e.first_name', 'first_name', 'Name'),
+    'employee_id': ('e.employee_id', 'employee_id', 'Employee ID'),
+    'department': ('d.name', 'department_name', 'Department', ''),
+    'position': ('e.position', 'position', 'Position', ''),
+    'hire_date': ('e.hire_date', 'hire_date', 'Hire Date', '0001-01-01'),
+}, default_sort='name', default_order='asc', tiebreaker=('e.id', 'id'))
+
+# Employee CRUD routes
+def employees():
+    if request.method == 'POST':
+        try:
+            first_name = request.form['first_name']
+            last_name = request.form['last_name']
+            email = request.form['email']
+            phone = request.form.get('phone', '')
+            department_id = request.form['department_id']
+            position = request.form['position']
+            birth_date = request.form.get('birth_date')
+            status = request.form.get('status', 'active')
+            address = request.form.get('address', '')
+            emergency_contact = request.form.get('emergency_contact', '')
+            emergency_phone = request.form.get('emergency_phone', '')
+            
+            # Handle empty birth_date
+            if not birth_date:
+                birth_date = None
+            
+            # Generate unique employee ID
+            employee_id = sequences.next_code('employee')
+            cur = mysql.connection.cursor()
+            
+            cur.execute("""INSERT INTO employees 
+                          (employee_id, first_name, last_name, name, email, phone, 
+                           department_id, position, birth_date, status, address, 
+                           emergency_contact, emergency_phone, hire_date) 
+                          VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURDATE())""",
+                        (employee_id, first_name, last_name, f"{first_name} {last_name}", 
+                         email, phone, department_id, position, birth_date, status, 
+                         address, emergency_contact, emergency_phone))
+            new_id = cur.lastrowid
+            mysql.connection.commit()
+            reference_cache.invalidate('employees')
+            dashboard_stats.invalidate()
+            cur.close()
+            audit_log.record('employees', new_id, 'INSERT', new_values={
+                'employee_id': employee_id, 'first_name': first_name, 'last_name': last_name,
+                'email': email, 'phone': phone, 'department_id': department_id, 'position': position,
+                'birth_date': birth_date, 'status': status, 'address': address,
+                'emergency_contact': emergency_contact, 'emergency_phone': emergency_phone})
+            flash(f'Employee "{first_name} {last_name}" added successfully!', 'success')
+        except Exception as e:
+            flash(f"Error adding employee: {e}", 'danger')
+        return redirect(url_for('employees.employees'))
+
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        page = EMPLOYEE_PAGINATOR.fetch(cur, """
+            SELECT 
+                e.id,
+                e.employee_id,
+                e.first_name,
+                e.last_name,
+                CONCAT(e.first_name, ' ', e.last_name) as name,
+                e.email,
+                e.phone,
+                e.address,
+                e.birth_date,
+                e.emergency_contact,
+                e.emergency_phone,
+                d.id as department_id,
+                d.name as department_name,
+                e.position,
+                e.hire_date,
+                COALESCE(e.status, 'active') as status,
+                DATEDIFF(CURDATE(), e.hire_date) as days_since_hire
+            FROM employees e
+            LEFT JOIN departments d ON e.department_id = d.id
+            WHERE 1=1
+        """, [])
+        employees = page.items
+
+        departments = reference_cache.get(cur, 'departments', as_dicts=True)
+        
+        # Summary statistics cover the whole table, not just this page
+        cur.execute("""SELECT COUNT(*) as total_employees,
+                              COALESCE(SUM(COALESCE(status, 'active') = 'active'), 0) as active_employees,
+                              COALESCE(SUM(MONTH(hire_date) = MONTH(CURDATE())
+                                           AND YEAR(hire_date) = YEAR(CURDATE())), 0) as new_hires_month,
+                              (SELECT COUNT(*) FROM departments) as total_departments
+                       FROM employees""")
+        summary = cur.fetchone()
+        
+        cur.close()
+        
+        return render_template('employees_new.html', 
+                             employees=employees, 
+                             page=page,
+                             departments=departments,
+                             total_employees=summary['total_employees'],
+                             active_employees=summary['active_employees'],
+                             total_departments=summary['total_departments'],
+                             new_hires_month=summary['new_hires_month'])
+    except Exception as e:
+        flash(f"Error loading employees: {e}", 'danger')
+        return render_template('employees_new.html', 
+                             employees=[], 
+                             page=None,
+                             departments=[],
+                             total_employees=0,
+                             active_employees=0,
+                             total_departments=0,
+                             new_hires_month=0)
+
+def update_employee():
+    try:
+        employee_id = request.form['employee_id']
+        first_name = request.form['first_name']
+        last_name = request.form['last_name']
+        email = request.form['email']
+        phone = request.form.get('phone', '')
+        department_id = request.form['department_id']
+        position = request.form['position']
+        birth_date = request.form.get('birth_date')
+        status = request.form.get('status', 'active')
+        address = request.form.get('address', '')
+        emergency_contact = request.form.get('emergency_contact', '')
+        emergency_phone = request.form.get('emergency_phone', '')
+        
+        # Handle empty birth_date
+        if not birth_date:
+            birth_date = None
+        
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'employees', employee_id, key_column='employee_id')
+        cur.execute("""UPDATE employees SET 
+                       first_name = %s, 
+                       last_name = %s, 
+                       name = %s, 
+                       email = %s, 
+                       phone = %s,
+                       department_id = %s, 
+                       position = %s,
+                       birth_date = %s,
+                       status = %s,
+                       address = %s,
+                       emergency_contact = %s,
+                       emergency_phone = %s
+                       WHERE employee_id = %s""",
+                    (first_name, last_name, f"{first_name} {last_name}", email, phone,
+                     department_id, position, birth_date, status, address, 
+                     emergency_contact, emergency_phone, employee_id))
+        mysql.connection.commit()
+        reference_cache.invalidate('employees')
+        dashboard_stats.invalidate()
+        cur.close()
+        if old_values:
+            audit_log.record('employees', old_values['id'], 'UPDATE', old_values, {
+                'first_name': first_name, 'last_name': last_name, 'email': email, 'phone': phone,
+                'department_id': department_id, 'position': position, 'birth_date': birth_date,
+                'status': status, 'address': address, 'emergency_contact': emergency_contact,
+                'emergency_phone': emergency_phone})
+        flash(f'Employee "{first_name} {last_name}" updated successfully!', 'success')
+    except Exception as e:
+        flash(f'Error updating employee: {e}', 'danger')
+    
+    return redirect(url_for('employees.employees'))
+
+def delete_employee(employee_id):
+    try:
+        cur = mysql.connection.cursor()
+        
+        # Get employee name for message
+        cur.execute("SELECT CONCAT(first_name, ' ', last_name) FROM employees WHERE employee_id = %s", (employee_id,))
+        emp_result = cur.fetchone()
+        emp_name = emp_result[0] if emp_result else 'Unknown Employee'
+        
+        # Check for dependencies (salaries, payroll, assignments)
+        dependencies = []
+        
+        # Check salaries
+        cur.execute("SELECT COUNT(*) FROM salaries WHERE employee_id = %s", (employee_id,))
+        if cur.fetchone()[0] > 0:
+            dependencies.append("salary records")
+        
+        # Check payroll
+        cur.execute("SELECT COUNT(*) FROM payroll_reports WHERE employee_id = %s", (employee_id,))
+        if cur.fetchone()[0] > 0:
+            dependencies.append("payroll records")
+            
+        # Check project assignments
+        cur.execute("SELECT COUNT(*) FROM employee_projects WHERE employee_id = %s", (employee_id,))
+        if cur.fetchone()[0] > 0:
+            dependencies.append("project assignments")
+            
+        # Check expense reports
+        cur.execute("SELECT COUNT(*) FROM expense_reports WHERE employee_id = %s", (employee_id,))
+        if cur.fetchone()[0] > 0:
+            dependencies.append("expense reports")
+        
+        if dependencies:
+            flash(f'Cannot delete employee "{emp_name}": Has active {", ".join(dependencies)}. Please remove these records first or set employee status to inactive.', 'danger')
+        else:
+            # Safe to delete
+            old_values = audit_log.snapshot(cur, 'employees', employee_id, key_column='employee_id')
+            cur.execute("DELETE FROM employees WHERE employee_id = %s", (employee_id,))
+            mysql.connection.commit()
+            reference_cache.invalidate('employees')
+            dashboard_stats.invalidate()
+            if old_values:
+                audit_log.record('employees', old_values['id'], 'DELETE', old_values)
+            flash(f'Employee "{emp_name}" deleted successfully!', 'success')
+            
+        cur.close()
+        
+    except Exception as e:
+        flash(f'Error deleting employee: {e}', 'danger')
+        
+    return redirect(url_for('employees.employees'))
+
+# Department CRUD routes
+def departments():
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("""SELECT d.id, d.name, d.description, COALESCE(d.budget, 0) as budget, 
+                       COUNT(e.id) as employee_count, 
+                       COALESCE(DATE_FORMAT(d.created_date, '%%Y-%%m-%%d'), 'N/A') as created_date
+                       FROM departments d 
+                       LEFT JOIN employees e ON d.id = e.department_id AND e.status = 'active'
+                       GROUP BY d.id, d.name, d.description, d.budget, d.created_date
+                       ORDER BY d.name""")
+        departments = cur.fetchall()
+        
+        # Calculate summary statistics
+        total_employees = sum(dept[4] for dept in departments)
+        total_budget = sum(dept[3] for dept in departments if dept[3])
+        avg_budget = total_budget / len(departments) if departments else 0
+        
+        cur.close()
+        return render_template('departments.html', 
+                             departments=departments,
+                             total_employees=total_employees,
+                             total_budget=total_budget,
+                             avg_budget=avg_budget)
+    except Exception as e:
+        flash(f'Error loading departments: {e}', 'danger')
+        return render_template('departments.html', 
+                             departments=[],
+                             total_employees=0,
+                             total_budget=0,
+                             avg_budget=0)
+
+def add_department():
+    name = request.form.get('name', '').strip()
+    description = request.form.get('description', '').strip()
+    budget = request.form.get('budget', 0)
+    
+    if not name:
+        flash('Department name is required!', 'danger')
+        return redirect(url_for('employees.departments'))
+    
+    # Convert budget to proper format
+    try:
+        budget = float(budget) if budget else 0
+    except (ValueError, TypeError):
+        budget = 0
+        
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("INSERT INTO departments (name, description, budget) VALUES (%s, %s, %s)", (name, description, budget))
+        mysql.connection.commit()
+        reference_cache.invalidate('departments')
+        dashboard_stats.invalidate()
+        cur.close()
+        flash(f'Department "{name}" added successfully!', 'success')
+    except Exception as e:
+        flash(f'Error adding department: {e}', 'danger')
+    
+    return redirect(url_for('employees.departments'))
+
+def update_department():
+    try:
+        department_id = request.form['department_id']
+        name = request.form.get('name', '').strip()
+        description = request.form.get('description', '').strip()
+        budget = request.form.get('budget', 0)
+        
+        if not name:
+            flash('Department name is required!', 'danger')
+            return redirect(url_for('employees.departments'))
+        
+        # Convert budget to proper format
+        try:
+            budget = float(budget) if budget else 0
+        except (ValueError, TypeError):
+            budget = 0
+            
+        cur = mysql.connection.cursor()
+        cur.execute("UPDATE departments SET name = %s, description = %s, budget = %s WHERE id = %s", 
+                   (name, description, budget, department_id))
+        mysql.connection.commit()
+        reference_cache.invalidate('departments')
+        dashboard_stats.invalidate()
+        cur.close()
+        flash(f'Department "{name}" updated successfully!', 'success')
+    except Exception as e:
+        flash(f'Error updating department: {e}', 'danger')
+    
+    return redirect(url_for('employees.departments'))
+
+def delete_department(id):
+    try:
+        cur = mysql.connection.cursor()
+        
+        # First check if department has employees
+        cur.execute("SELECT COUNT(*) FROM employees WHERE department_id = %s", (id,))
+        employee_count = cur.fetchone()[0]
+        
+        if employee_count > 0:
+            flash(f'Cannot delete department: {employee_count} employees are still assigned to this department. Please reassign or remove employees first.', 'danger')
+            cur.close()
+            return redirect(url_for('employees.departments'))
+        
+        # Get department name for success message
+        cur.execute("SELECT name FROM departments WHERE id = %s", (id,))
+        dept_result = cur.fetchone()
+        dept_name = dept_result[0] if dept_result else 'Unknown Department'
+        
+        # Safe to delete department
+        cur.execute("DELETE FROM departments WHERE id = %s", (id,))
+        mysql.connection.commit()
+        reference_cache.invalidate('departments')
+        dashboard_stats.invalidate()
+        cur.close()
+        
+        flash(f'Department "{dept_name}" deleted successfully!', 'success')
+        
+    except Exception as e:
+        flash(f'Error deleting department: {e}', 'danger')
+    
+    return redirect(url_for('employees.departments'))
+
+# API endpoints for enhanced departments functionality
+@conditional.versioned("""
+    SELECT GREATEST(d.updated_date, COALESCE(MAX(e.updated_date), d.updated_date)) as last_modified,
+           COUNT(e.id) as employee_count, COALESCE(SUM(e.id), 0) as id_sum
+    FROM departments d
+    LEFT JOIN employees e ON e.department_id = d.id AND e.status = 'active'
+    WHERE d.id = %s
+    GROUP BY d.id
+""")
+def api_department_employees(dept_id):
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # First check if the department exists
+        cur.execute("SELECT id, name FROM departments WHERE id = %s", (dept_id,))
+        department = cur.fetchone()
+        
+        if not department:
+            cur.close()
+            return {'error': f'Department with ID {dept_id} not found'}, 404
+        
+        # Get employees for the department
+        cur.execute("""SELECT 
+                          CONCAT(e.first_name, ' ', e.last_name) as name,
+                          e.position,
+                          e.email,
+                          DATE_FORMAT(e.hire_date, '%%Y-%%m-%%d') as hire_date,
+                          e.id,
+                          e.status
+                       FROM employees e 
+                       WHERE e.department_id = %s AND e.status = 'active'
+                       ORDER BY e.first_name, e.last_name""", (dept_id,))
+        employees = cur.fetchall()
+        cur.close()
+        
+        count = len(employees)
+        
+        # ?layout=columns sends one array per column instead of one object per employee
+        if request.args.get('layout') == 'columns':
+            employees = columnar(employees)
+        
+        return {
+            'success': True,
+            'department': department,
+            'employees': employees,
+            'count': count
+        }
+        
+    except Exception as e:
+        print(f"Error in api_department_employees: {str(e)}")  # Server-side logging
+        return {'error': f'Database error: {str(e)}'}, 500
+
+def api_department_details(dept_id):
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get department info
+        cur.execute("""SELECT d.*, COUNT(e.id) as employee_count,
+                          AVG(CASE WHEN s.basic_salary IS NOT NULL THEN s.basic_salary ELSE 0 END) as avg_salary
+                       FROM departments d
+                       LEFT JOIN employees e ON d.id = e.department_id AND e.status = 'active'
+                       LEFT JOIN salaries s ON e.id = s.employee_id
+                       WHERE d.id = %s
+                       GROUP BY d.id""", (dept_id,))
+        dept_details = cur.fetchone()
+        
+        cur.close()
+        return {'department': dept_details}
+    except Exception as e:
+        return {'error': str(e)}, 400
+
+def api_bulk_budget_update():
+    try:
+        data = request.get_json()
+        department_ids = data.get('department_ids', [])
+        budget = data.get('budget', 0)
+        
+        if not department_ids:
+            return {'success': False, 'message': 'No departments selected'}, 400
+        
+        cur = mysql.connection.cursor()
+        placeholders = ','.join(['%s'] * len(department_ids))
+        query = f"UPDATE departments SET budget = %s WHERE id IN ({placeholders})"
+        cur.execute(query, [budget] + department_ids)
+        mysql.connection.commit()
+        dashboard_stats.invalidate()
+        cur.close()
+        
+        return {'success': True, 'message': f'Updated {len(department_ids)} departments'}
+    except Exception as e:
+        return {'success': False, 'message': str(e)}, 400
+
+def api_bulk_delete():
+    try:
+        data = request.get_json()
+        department_ids = data.get('department_ids', [])
+        
+        if not department_ids:
+            return {'success': False, 'message': 'No departments selected'}, 400
+        
+        cur = mysql.connection.cursor()
+        
+        # Check if any departments have employees
+        placeholders = ','.join(['%s'] * len(department_ids))
+        cur.execute(f"SELECT id, name FROM departments d WHERE d.id IN ({placeholders}) AND EXISTS (SELECT 1 FROM employees e WHERE e.department_id = d.id)", department_ids)
+        departments_with_employees = cur.fetchall()
+        
+        if departments_with_employees:
+            dept_names = [dept[1] for dept in departments_with_employees]
+            return {'success': False, 'message': f'Cannot delete departments with employees: {", ".join(dept_names)}'}, 400
+        
+        # Safe to delete
+        cur.execute(f"DELETE FROM departments WHERE id IN ({placeholders})", department_ids)
+        mysql.connection.commit()
+        reference_cache.invalidate('departments')
+        dashboard_stats.invalidate()
+        cur.close()
+        
+        return {'success': True, 'message': f'Deleted {len(department_ids)} departments'}
+    except Exception as e:
+        return {'success': False, 'message': str(e)}, 400
@@ -0,0 +1,599 @@
+"""
+Expense Views for Lumorange Management System
+Expense claims, receipts, the approval workflow and CSV export
+"""
+
+import json
+from datetime import datetime
+
+import MySQLdb.cursors
+from flask import flash, jsonify, redirect, render_template, request, send_file, url_for
+
+from csv_export import stream_csv
+from extensions import audit_log, conditional, expense_rollups, mysql, receipt_storage, reference_cache
+from pagination import KeysetPaginator
+from receipt_storage import ReceiptError, VARIANTS as RECEIPT_VARIANTS
+
+# Expense Management routes
+EXPENSE_PAGINATOR = KeysetPaginator({
+    'created': ('e.created_date', 'created_date', 'Newest', '0001-01-01'),
+    'expense_date': ('e.expense_date', 'expense_date', 'Expense Date', '0001-01-01'),
+    'amount': ('e.amount', 'amount', 'Amount', 0),
+    'category': ('e.category', 'category', 'Category', ''),
+}, default_sort='created', default_order='desc', tiebreaker=('e.id', 'id'))
+
+def expenses():
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get one page of expenses with detailed information
+        page = EXPENSE_PAGINATOR.fetch(cur, """
+            SELECT 
+                e.id,
+                e.employee_id,
+                COALESCE(CONCAT(emp.first_name, ' ', emp.last_name), emp.name) as employee_name,
+                e.expense_date,
+                e.category,
+                e.description,
+                e.amount,
+                e.currency,
+                e.vendor_name,
+                e.project_id,
+                p.name as project_name,
+                e.status,
+                e.receipt_path,
+                e.receipt_sha256,
+                e.receipt_filename,
+                e.receipt_content_type,
+                COALESCE(CONCAT(approver.first_name, ' ', approver.last_name), approver.name) as approved_by_name,
+                e.approved_date,
+                e.rejection_reason,
+                e.payment_date,
+                e.payment_reference,
+                e.created_date,
+                e.updated_date
+            FROM expense_reports e
+            LEFT JOIN employees emp ON e.employee_id = emp.id
+            LEFT JOIN employees approver ON e.approved_by = approver.id
+            LEFT JOIN projects p ON e.project_id = p.id
+            WHERE 1=1
+        """, [])
+        expenses = page.items
+        
+        # Dropdown lists
+        employees = reference_cache.get(cur, 'active_employees', as_dicts=True)
+        projects = reference_cache.get(cur, 'open_projects', as_dicts=True)
+        
+        # Statistics come from a handful of pre-aggregated rollup rows
+        from datetime import datetime, timedelta
+        statistics = expense_rollups.statistics(cur)
+        cur.close()
+        
+        # Add current date for form defaults
+        current_date = datetime.now().date()
+        
+        return render_template('expenses.html', 
+                             expenses=expenses, 
+                             page=page,
+                             employees=employees, 
+                             projects=projects, 
+                             statistics=statistics,
+                             current_date=current_date)
+                             
+    except Exception as e:
+        flash(f'Error loading expenses: {e}', 'danger')
+        return render_template('expenses.html', 
+                             expenses=[], 
+                             page=None,
+                             employees=[], 
+                             projects=[], 
+                             statistics={'total': 0, 'total_amount': 0, 'pending': 0, 'pending_amount': 0, 'approved': 0, 'approved_amount': 0, 'this_month': 0, 'this_month_amount': 0},
+                             current_date=datetime.now().date())
+
+def add_expense():
+    try:
+        # Get form data
+        employee_id = request.form['employee_id']
+        expense_date = request.form.get('expense_date', datetime.now().strftime('%Y-%m-%d'))
+        category = request.form.get('category', 'other')
+        description = request.form.get('description', '')
+        amount = float(request.form['amount'])
+        currency = request.form.get('currency', 'INR')
+        vendor_name = request.form.get('vendor_name', '')
+        project_id = request.form.get('project_id') if request.form.get('project_id') else None
+        
+        if not employee_id or not amount or not category:
+            return jsonify({'success': False, 'error': 'Employee, amount, and category are required!'})
+        
+        # Handle file upload
+        receipt = None
+        if 'receipt' in request.files:
+            receipt_file = request.files['receipt']
+            if receipt_file.filename != '':
+                try:
+                    receipt = receipt_storage.store(receipt_file)
+                except ReceiptError as e:
+                    return jsonify({'success': False, 'error': str(e)})
+        
+        cur = mysql.connection.cursor()
+        before = expense_rollups.snapshot(cur, [])
+        cur.execute("""
+            INSERT INTO expense_reports 
+            (employee_id, expense_date, category, description, amount, currency, 
+             vendor_name, project_id, receipt_path, receipt_sha256, receipt_filename,
+             receipt_content_type, receipt_size, status, created_date) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'submitted', NOW())
+        """, (employee_id, expense_date, category, description, amount, currency, 
+              vendor_name, project_id,
+              receipt.path if receipt else None,
+              receipt.sha256 if receipt else None,
+              receipt.filename if receipt else None,
+              receipt.content_type if receipt else None,
+              receipt.size if receipt else None))
+        new_id = cur.lastrowid
+        expense_rollups.apply(cur, before, [new_id])
+        
+        mysql.connection.commit()
+        cur.close()
+        audit_log.record('expense_reports', new_id, 'INSERT', new_values={
+            'employee_id': employee_id, 'expense_date': expense_date, 'category': category,
+            'description': description, 'amount': amount, 'currency': currency,
+            'vendor_name': vendor_name, 'project_id': project_id,
+            'receipt_sha256': receipt.sha256 if receipt else None, 'status': 'submitted'})
+        
+        return jsonify({'success': True, 'message': 'Expense submitted successfully!'})
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        return jsonify({'success': False, 'error': f'Error adding expense: {str(e)}'})
+
+def expense_receipt(sha256):
+    """Serve a stored receipt; immutable, so cacheable forever"""
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            SELECT receipt_filename, receipt_content_type FROM expense_reports
+            WHERE receipt_sha256 = %s LIMIT 1
+        """, (sha256,))
+        row = cur.fetchone()
+        cur.close()
+        if not row or not receipt_storage.exists(sha256):
+            return jsonify({'error': 'Receipt not found'}), 404
+        
+        # conditional=True answers Range and If-None-Match requests; the file
+        # itself goes out through the server's file wrapper (sendfile)
+        response = send_file(receipt_storage.path_for(sha256), mimetype=row[1],
+                             as_attachment=request.args.get('download') == '1',
+                             download_name=row[0] or sha256, conditional=True,
+                             etag=sha256, max_age=31536000)
+        # Browser cache only; receipts are not for shared caches
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+    except ReceiptError:
+        return jsonify({'error': 'Receipt not found'}), 404
+
+def expense_receipt_variant(sha256, variant):
+    """Thumbnail or preview of an image receipt, rendered on first request"""
+    try:
+        if variant not in RECEIPT_VARIANTS:
+            return jsonify({'error': 'Unknown receipt variant'}), 404
+        if receipt_storage.exists(sha256, variant):
+            response = send_file(receipt_storage.path_for(sha256, variant), mimetype='image/jpeg',
+                                 conditional=True, etag=f"{sha256}-{variant}", max_age=31536000)
+            response.cache_control.public = False
+            response.cache_control.private = True
+            return response
+        
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            SELECT receipt_content_type FROM expense_reports
+            WHERE receipt_sha256 = %s LIMIT 1
+        """, (sha256,))
+        row = cur.fetchone()
+        cur.close()
+        if not row or not receipt_storage.exists(sha256):
+            return jsonify({'error': 'Receipt not found'}), 404
+        if not (row[0] or '').startswith('image/') or not receipt_storage.schedule(sha256, variant):
+            return jsonify({'error': f'No {variant} available for this receipt'}), 404
+        
+        response = jsonify({'pending': True, 'message': f'{variant.title()} is being generated'})
+        response.status_code = 202
+        response.headers['Retry-After'] = '1'
+        return response
+    except ReceiptError:
+        return jsonify({'error': 'Receipt not found'}), 404
+
+# Additional expense routes
+@conditional.versioned("""
+    SELECT GREATEST(e.updated_date, COALESCE(emp.updated_date, e.updated_date)) as last_modified
+    FROM expense_reports e
+    LEFT JOIN employees emp ON e.employee_id = emp.id
+    WHERE e.id = %s
+""")
+def get_expense(expense_id):
+    """Get expense details for editing"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT e.*, COALESCE(CONCAT(emp.first_name, ' ', emp.last_name), emp.name) as employee_name
+            FROM expense_reports e 
+            LEFT JOIN employees emp ON e.employee_id = emp.id 
+            WHERE e.id = %s
+        """, (expense_id,))
+        expense = cur.fetchone()
+        cur.close()
+        
+        if expense:
+            return jsonify(expense)
+        else:
+            return jsonify({'error': 'Expense not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def update_expense():
+    try:
+        expense_id = request.form['expense_id']
+        status = request.form.get('status', 'submitted')
+        amount = request.form.get('amount')
+        rejection_reason = request.form.get('rejection_reason', '')
+        
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'expense_reports', expense_id)
+        before = expense_rollups.snapshot(cur, [expense_id])
+        
+        # Update expense
+        if amount:
+            cur.execute("""
+                UPDATE expense_reports 
+                SET status = %s, amount = %s, rejection_reason = %s, updated_date = NOW()
+                WHERE id = %s
+            """, (status, amount, rejection_reason, expense_id))
+        else:
+            cur.execute("""
+                UPDATE expense_reports 
+                SET status = %s, rejection_reason = %s, updated_date = NOW()
+                WHERE id = %s
+            """, (status, rejection_reason, expense_id))
+        
+        # Set approval date if approved
+        if status == 'approved':
+            cur.execute("""
+                UPDATE expense_reports 
+                SET approved_date = NOW(), approved_by = 19
+                WHERE id = %s
+            """, (expense_id,))
+        
+        # Set payment date if paid
+        if status == 'paid':
+            cur.execute("""
+                UPDATE expense_reports 
+                SET payment_date = NOW()
+                WHERE id = %s
+            """, (expense_id,))
+        
+        expense_rollups.apply(cur, before, [expense_id])
+        mysql.connection.commit()
+        cur.close()
+        if old_values:
+            new_values = {'status': status, 'rejection_reason': rejection_reason}
+            if amount:
+                new_values['amount'] = amount
+            audit_log.record('expense_reports', expense_id, 'UPDATE', old_values, new_values)
+        
+        flash(f'Expense updated successfully!', 'success')
+        return redirect(url_for('expenses.expenses'))
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        flash(f'Error updating expense: {e}', 'danger')
+        return redirect(url_for('expenses.expenses'))
+
+def update_expense_status():
+    try:
+        expense_id = request.form['expense_id']
+        status = request.form['status']
+        rejection_reason = request.form.get('rejection_reason', '')
+        
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'expense_reports', expense_id)
+        before = expense_rollups.snapshot(cur, [expense_id])
+        
+        # Update status
+        cur.execute("""
+            UPDATE expense_reports 
+            SET status = %s, rejection_reason = %s, updated_date = NOW()
+            WHERE id = %s
+        """, (status, rejection_reason, expense_id))
+        
+        # Set approval date if approved
+        if status == 'approved':
+            cur.execute("""
+                UPDATE expense_reports 
+                SET approved_date = NOW(), approved_by = 19
+                WHERE id = %s
+            """, (expense_id,))
+        
+        # Set payment date if paid
+        if status == 'paid':
+            cur.execute("""
+                UPDATE expense_reports 
+                SET payment_date = NOW()
+                WHERE id = %s
+            """, (expense_id,))
+        
+        expense_rollups.apply(cur, before, [expense_id])
+        mysql.connection.commit()
+        cur.close()
+        if old_values:
+            audit_log.record('expense_reports', expense_id, 'UPDATE', old_values,
+                             {'status': status, 'rejection_reason': rejection_reason})
+        
+        return jsonify({'success': True, 'message': f'Expense {status} successfully!'})
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        return jsonify({'success': False, 'error': f'Error updating expense: {str(e)}'})
+
+def bulk_expense_operations():
+    """Handle bulk operations on expenses"""
+    try:
+        action = request.form.get('action')
+        expense_ids = json.loads(request.form.get('expense_ids', '[]'))
+        rejection_reason = request.form.get('rejection_reason', '')
+        
+        if not action or not expense_ids:
+            return jsonify({'success': False, 'error': 'No action or expenses selected!'})
+        
+        cur = mysql.connection.cursor()
+        old_rows = audit_log.snapshot_many(cur, 'expense_reports', expense_ids)
+        before = expense_rollups.snapshot(cur, expense_ids)
+        new_values = None
+        
+        if action == 'delete':
+            # Delete selected expenses
+            format_strings = ','.join(['%s'] * len(expense_ids))
+            cur.execute(f"DELETE FROM expense_reports WHERE id IN ({format_strings})", expense_ids)
+            message = f'{len(expense_ids)} expense(s) deleted successfully!'
+            
+        elif action == 'approve':
+            # Approve selected expenses
+            format_strings = ','.join(['%s'] * len(expense_ids))
+            cur.execute(f"""
+                UPDATE expense_reports 
+                SET status = 'approved', approved_date = NOW(), approved_by = 19, updated_date = NOW()
+                WHERE id IN ({format_strings})
+            """, expense_ids)
+            new_values = {'status': 'approved', 'approved_by': 19}
+            message = f'{len(expense_ids)} expense(s) approved successfully!'
+            
+        elif action == 'reject':
+            # Reject selected expenses
+            format_strings = ','.join(['%s'] * len(expense_ids))
+            params = [rejection_reason] + expense_ids
+            cur.execute(f"""
+                UPDATE expense_reports 
+                SET status = 'rejected', rejection_reason = %s, updated_date = NOW()
+                WHERE id IN ({format_strings})
+            """, params)
+            new_values = {'status': 'rejected', 'rejection_reason': rejection_reason}
+            message = f'{len(expense_ids)} expense(s) rejected successfully!'
+            
+        elif action == 'pay':
+            # Mark as paid
+            format_strings = ','.join(['%s'] * len(expense_ids))
+            cur.execute(f"""
+                UPDATE expense_reports 
+                SET status = 'paid', payment_date = NOW(), updated_date = NOW()
+                WHERE id IN ({format_strings})
+            """, expense_ids)
+            new_values = {'status': 'paid'}
+            message = f'{len(expense_ids)} expense(s) marked as paid!'
+        
+        expense_rollups.apply(cur, before, expense_ids)
+        mysql.connection.commit()
+        cur.close()
+        for expense_id, old_values in old_rows.items():
+            if action == 'delete':
+                audit_log.record('expense_reports', expense_id, 'DELETE', old_values)
+            elif new_values:
+                audit_log.record('expense_reports', expense_id, 'UPDATE', old_values, new_values)
+        
+        return jsonify({'success': True, 'message': message})
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        return jsonify({'success': False, 'error': f'Error performing bulk operation: {str(e)}'})
+
+def export_expenses():
+    """Export expenses to CSV"""
+    try:
+        # Get filter parameters
+        search = request.args.get('search', '')
+        status = request.args.get('status', '')
+        employee = request.args.get('employee', '')
+        category = request.args.get('category', '')
+        
+        # Build query with filters
+        where_conditions = []
+        params = []
+        
+        if search:
+            where_conditions.append("(e.description LIKE %s OR emp.name LIKE %s OR e.vendor_name LIKE %s)")
+            search_term = f"%{search}%"
+            params.extend([search_term, search_term, search_term])
+        
+        if status:
+            where_conditions.append("e.status = %s")
+            params.append(status)
+            
+        if employee:
+            where_conditions.append("e.employee_id = %s")
+            params.append(employee)
+            
+        if category:
+            where_conditions.append("e.category = %s")
+            params.append(category)
+        
+        where_clause = ""
+        if where_conditions:
+            where_clause = "WHERE " + " AND ".join(where_conditions)
+        
+        def format_expense(expense):
+            return [
+                expense['id'],
+                expense['employee_name'],
+                expense['expense_date'].strftime('%Y-%m-%d') if expense['expense_date'] else '',
+                expense['category'],
+                expense['description'],
+                expense['amount'],
+                expense['currency'] or 'INR',
+                expense['vendor_name'] or '',
+                expense['status'],
+                expense['created_date'].strftime('%Y-%m-%d %H:%M') if expense['created_date'] else ''
+            ]
+        
+        # Stream straight from an unbuffered cursor instead of building the file in memory
+        return stream_csv(
+            mysql,
+            f"""
+            SELECT 
+                e.id,
+                COALESCE(CONCAT(emp.first_name, ' ', emp.last_name), emp.name) as employee_name,
+                e.expense_date,
+                e.category,
+                e.description,
+                e.amount,
+                e.currency,
+                e.vendor_name,
+                e.status,
+                e.created_date
+            FROM expense_reports e
+            LEFT JOIN employees emp ON e.employee_id = emp.id
+            {where_clause}
+            ORDER BY e.created_date DESC
+            """,
+            params,
+            ['ID', 'Employee', 'Date', 'Category', 'Description', 'Amount', 'Currency', 'Vendor', 'Status', 'Created'],
+            format_expense,
+            f'expenses_{datetime.now().strftime("%Y%m%d")}.csv',
+            cursorclass=MySQLdb.cursors.SSDictCursor)
+        
+    except Exception as e:
+        flash(f'Error exporting expenses: {e}', 'danger')
+        return redirect(url_for('expenses.expenses'))
+
+def approve_expense(id):
+    try:
+        cur = mysql.connection.cursor()
+        # For now, we'll use the first available employee as approver
+        cur.execute("SELECT id FROM employees LIMIT 1")
+        approver_result = cur.fetchone()
+        approver_id = approver_result[0] if approver_result else 1
+        
+        old_values = audit_log.snapshot(cur, 'expense_reports', id)
+        before = expense_rollups.snapshot(cur, [id])
+        cur.execute("""UPDATE expense_reports 
+                       SET status = 'approved', approved_by = %s, approved_date = NOW() 
+                       WHERE id = %s""", (approver_id, id))
+        updated = cur.rowcount
+        expense_rollups.apply(cur, before, [id])
+        mysql.connection.commit()
+        if updated > 0:
+            audit_log.record('expense_reports', id, 'UPDATE', old_values,
+                             {'status': 'approved', 'approved_by': approver_id})
+        
+        if updated > 0:
+            flash('Expense approved successfully!', 'success')
+        else:
+            flash('Expense not found!', 'danger')
+        
+        cur.close()
+    except Exception as e:
+        flash(f'Error approving expense: {e}', 'danger')
+    
+    return redirect(url_for('expenses.expenses'))
+
+def reject_expense(id):
+    try:
+        rejection_reason = request.form.get('rejection_reason', 'No reason provided')
+        
+        cur = mysql.connection.cursor()
+        cur.execute("SELECT id FROM employees LIMIT 1")
+        approver_result = cur.fetchone()
+        approver_id = approver_result[0] if approver_result else 1
+        
+        old_values = audit_log.snapshot(cur, 'expense_reports', id)
+        before = expense_rollups.snapshot(cur, [id])
+        cur.execute("""UPDATE expense_reports 
+                       SET status = 'rejected', approved_by = %s, approved_date = NOW(), rejection_reason = %s 
+                       WHERE id = %s""", (approver_id, rejection_reason, id))
+        updated = cur.rowcount
+        expense_rollups.apply(cur, before, [id])
+        mysql.connection.commit()
+        if updated > 0:
+            audit_log.record('expense_reports', id, 'UPDATE', old_values,
+                             {'status': 'rejected', 'approved_by': approver_id, 'rejection_reason': rejection_reason})
+        
+        if updated > 0:
+            flash(f'Expense rejected: {rejection_reason}', 'warning')
+        else:
+            flash('Expense not found!', 'danger')
+        
+        cur.close()
+    except Exception as e:
+        flash(f'Error rejecting expense: {e}', 'danger')
+    
+    return redirect(url_for('expenses.expenses'))
+
+def mark_expense_paid(id):
+    try:
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'expense_reports', id)
+        before = expense_rollups.snapshot(cur, [id])
+        cur.execute("""UPDATE expense_reports 
+                       SET status = 'paid', payment_date = NOW(), payment_reference = CONCAT('PAY-', id, '-', DATE_FORMAT(NOW(), '%%Y%%m%%d'))
+                       WHERE id = %s AND status = 'approved'""", (id,))
+        updated = cur.rowcount
+        expense_rollups.apply(cur, before, [id])
+        mysql.connection.commit()
+        if updated > 0:
+            audit_log.record('expense_reports', id, 'UPDATE', old_values, {'status': 'paid'})
+        
+        if updated > 0:
+            flash('Expense marked as paid successfully!', 'success')
+        else:
+            flash('Expense not found or not approved!', 'danger')
+        
+        cur.close()
+    except Exception as e:
+        flash(f'Error marking expense as paid: {e}', 'danger')
+    
+    return redirect(url_for('expenses.expenses'))
+
+def delete_expense(id):
+    try:
+        cur = mysql.connection.cursor()
+        
+        # Check if expense can be deleted (only submitted expenses)
+        cur.execute("SELECT status FROM expense_reports WHERE id = %s", (id,))
+        expense = cur.fetchone()
+        
+        if not expense:
+            flash('Expense not found!', 'danger')
+        elif expense[0] in ['approved', 'paid']:
+            flash('Cannot delete approved or paid expenses!', 'danger')
+        else:
+            old_values = audit_log.snapshot(cur, 'expense_reports', id)
+            before = expense_rollups.snapshot(cur, [id])
+            cur.execute("DELETE FROM expense_reports WHERE id = %s", (id,))
+            expense_rollups.apply(cur, before, [id])
+            mysql.connection.commit()
+            audit_log.record('expense_reports', id, 'DELETE', old_values)
+            flash('Expense deleted successfully!', 'success')
+        
+        cur.close()
+    except Exception as e:
+        flash(f'Error deleting expense: {e}', 'danger')
+    
+    return redirect(url_for('expenses.expenses'))
@@ -0,0 +1,545 @@
+"""
+Invoicing Views for Lumorange Management System
+Clients, invoices, bulk invoice actions and the client project lookup
+"""
+
+import MySQLdb.cursors
+from flask import flash, jsonify, redirect, render_template, request, url_for
+
+from extensions import audit_log, conditional, dashboard_stats, mysql, reference_cache, sequences
+from json_serialization import columnar
+from pagination import KeysetPaginator
+
+# Client CRUD routes
+# Client rows are plain tuples, so row keys are column positions
+CLIENT_PAGINATOR = KeysetPaginator({
+    'created': ('created_date', 11, 'Newest', '0001-01-01'),
+    'name': ('name', 1, 'Name'),
+}, default_sort='created', default_order='desc', tiebreaker=('id', 0))
+
+def clients():
+    cur = mysql.connection.cursor()
+    page = CLIENT_PAGINATOR.fetch(cur, """SELECT id, name, email, phone, address, contact_person, 
+                   company_type, website, tax_id, payment_terms, status, 
+                   created_date, updated_date FROM clients WHERE 1=1""", [])
+    clients = page.items
+    
+    # Calculate statistics across all clients
+    from datetime import datetime, timedelta
+    current_month = datetime.now().replace(day=1)
+    cur.execute("""SELECT COUNT(*), COALESCE(SUM(status = 'active'), 0),
+                   COALESCE(SUM(created_date >= %s), 0) FROM clients""", (current_month,))
+    total_clients, active_clients, new_this_month = cur.fetchone()
+    inactive_clients = total_clients - active_clients
+    
+    # Get unique company types for filter
+    cur.execute("SELECT DISTINCT company_type FROM clients WHERE company_type IS NOT NULL AND company_type != ''")
+    company_types = [row[0] for row in cur.fetchall()]
+    
+    statistics = {
+        'total': total_clients,
+        'active': active_clients,
+        'inactive': inactive_clients,
+        'new_this_month': new_this_month
+    }
+    
+    cur.close()
+    return render_template('clients.html', clients=clients, page=page, statistics=statistics, company_types=company_types)
+
+def add_client():
+    name = request.form['name']
+    email = request.form['email']
+    phone = request.form['phone']
+    address = request.form['address']
+    contact_person = request.form['contact_person']
+    company_type = request.form['company_type']
+    website = request.form['website']
+    tax_id = request.form['tax_id']
+    payment_terms = request.form['payment_terms']
+    status = 'active' if 'status' in request.form else 'inactive'
+    
+    if not name:
+        flash('Client name is required!', 'danger')
+        return redirect(url_for('invoicing.clients'))
+    
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("""INSERT INTO clients (name, email, phone, address, contact_person, 
+                       company_type, website, tax_id, payment_terms, status) 
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""", 
+                   (name, email, phone, address, contact_person, company_type, 
+                    website, tax_id, payment_terms, status))
+        mysql.connection.commit()
+        reference_cache.invalidate('clients')
+        cur.close()
+        flash('Client added successfully!', 'success')
+    except Exception as e:
+        flash(f'Error adding client: {e}', 'danger')
+    return redirect(url_for('invoicing.clients'))
+
+def update_client():
+    try:
+        client_id = request.form['client_id']
+        name = request.form['name']
+        email = request.form['email']
+        phone = request.form['phone']
+        address = request.form['address']
+        contact_person = request.form['contact_person']
+        company_type = request.form['company_type']
+        website = request.form['website']
+        tax_id = request.form['tax_id']
+        payment_terms = request.form['payment_terms']
+        status = 'active' if 'status' in request.form else 'inactive'
+        
+        cur = mysql.connection.cursor()
+        cur.execute("""UPDATE clients SET name = %s, email = %s, phone = %s, 
+                       address = %s, contact_person = %s, company_type = %s, 
+                       website = %s, tax_id = %s, payment_terms = %s, status = %s,
+                       updated_date = NOW() WHERE id = %s""",
+                    (name, email, phone, address, contact_person, company_type,
+                     website, tax_id, payment_terms, status, client_id))
+        mysql.connection.commit()
+        reference_cache.invalidate('clients')
+        dashboard_stats.invalidate()
+        cur.close()
+        flash(f'Client "{name}" updated successfully!', 'success')
+    except Exception as e:
+        flash(f"Error updating client: {e}", 'danger')
+    return redirect(url_for('invoicing.clients'))
+
+def delete_client(id):
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("DELETE FROM clients WHERE id = %s", (id,))
+        mysql.connection.commit()
+        reference_cache.invalidate('clients')
+        dashboard_stats.invalidate()
+        cur.close()
+        flash('Client deleted successfully!', 'success')
+    except Exception as e:
+        flash(f'Error deleting client: {e}', 'danger')
+    return redirect(url_for('invoicing.clients'))
+
+def toggle_client_status():
+    try:
+        data = request.get_json()
+        client_id = data['client_id']
+        status = data['status']
+        
+        cur = mysql.connection.cursor()
+        cur.execute("UPDATE clients SET status = %s, updated_date = NOW() WHERE id = %s", 
+                   (status, client_id))
+        mysql.connection.commit()
+        reference_cache.invalidate('clients')
+        cur.close()
+        
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+
+# Invoice routes
+def invoice_details(invoice_id):
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get main invoice details
+        cur.execute("""
+            SELECT 
+                i.id as invoice_id, i.invoice_number, i.invoice_date, i.due_date, i.status,
+                i.subtotal_amount as subtotal, i.tax_amount as tax, i.total_amount as total,
+                c.name as client_name, c.email as client_email, c.address as client_address,
+                p.name as project_name
+            FROM invoices i
+            JOIN clients c ON i.client_id = c.id
+            LEFT JOIN projects p ON i.project_id = p.id
+            WHERE i.id = %s
+        """, (invoice_id,))
+        invoice = cur.fetchone()
+
+        if not invoice:
+            flash('Invoice not found.', 'danger')
+            return redirect(url_for('invoicing.invoices'))
+
+        # For now, create simple items from invoice data
+        items = [{
+            'description': f"Project: {invoice['project_name']}" if invoice['project_name'] else "General Services",
+            'total': invoice['subtotal']
+        }]
+        
+        cur.close()
+        return render_template('invoice_details.html', invoice=invoice, items=items)
+
+    except Exception as e:
+        flash(f"Error loading invoice details: {e}", 'danger')
+        return redirect(url_for('invoicing.invoices'))
+
+INVOICE_PAGINATOR = KeysetPaginator({
+    'created': ('i.created_date', 'created_date', 'Newest', '0001-01-01'),
+    'invoice_date': ('i.invoice_date', 'invoice_date', 'Invoice Date', '0001-01-01'),
+    'due_date': ('i.due_date', 'due_date', 'Due Date', '0001-01-01'),
+    'amount': ('i.total_amount', 'total_amount', 'Amount', 0),
+    'number': ('i.invoice_number', 'invoice_number', 'Invoice Number'),
+    'client': ('c.name', 'client_name', 'Client'),
+}, default_sort='created', default_order='desc', tiebreaker=('i.id', 'id'))
+
+def invoices():
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get one page of invoices with detailed information
+        page = INVOICE_PAGINATOR.fetch(cur, """
+            SELECT 
+                i.id,
+                i.invoice_number,
+                i.invoice_date,
+                i.due_date,
+                i.client_id,
+                i.project_id,
+                i.subtotal,
+                i.tax_rate,
+                i.tax_amount,
+                i.discount_amount,
+                i.total_amount,
+                i.currency,
+                i.status,
+                i.payment_method,
+                i.payment_date,
+                i.notes,
+                i.created_date,
+                i.updated_date,
+                c.name as client_name
+            FROM invoices i 
+            JOIN clients c ON i.client_id = c.id 
+            WHERE 1=1
+        """, [])
+        invoices = page.items
+        
+        # Get clients for filters and projects for the add invoice modal
+        clients = reference_cache.get(cur, 'active_clients', as_dicts=True)
+        projects = reference_cache.get(cur, 'open_projects', as_dicts=True)
+        
+        # Calculate statistics across all invoices in a single pass
+        from datetime import datetime, timedelta
+        current_month = datetime.now().replace(day=1).date()
+        cur.execute("""
+            SELECT 
+                COUNT(*) as total,
+                COALESCE(SUM(status = 'paid'), 0) as paid,
+                COALESCE(SUM(status IN ('sent', 'pending')), 0) as pending,
+                COALESCE(SUM(status = 'overdue'), 0) as overdue,
+                COALESCE(SUM(CASE WHEN status = 'paid' THEN total_amount END), 0) as total_revenue,
+                COALESCE(SUM(CASE WHEN status IN ('sent', 'pending', 'overdue') THEN total_amount END), 0) as outstanding,
+                COALESCE(SUM(CASE WHEN status = 'paid' AND payment_date >= %s THEN total_amount END), 0) as this_month
+            FROM invoices
+        """, (current_month,))
+        statistics = cur.fetchone()
+        
+        # Add current date for template calculations
+        current_date = datetime.now().date()
+        
+        cur.close()
+        return render_template('invoices.html', 
+                             invoices=invoices, 
+                             page=page,
+                             clients=clients,
+                             projects=projects,
+                             statistics=statistics,
+                             current_date=current_date)
+    except Exception as e:
+        flash(f"Error loading invoices: {e}", 'danger')
+        return render_template('invoices.html', 
+                             invoices=[], 
+                             page=None,
+                             clients=[],
+                             projects=[],
+                             statistics={'total': 0, 'paid': 0, 'pending': 0, 'overdue': 0, 'total_revenue': 0, 'outstanding': 0, 'this_month': 0},
+                             current_date=datetime.now().date())
+
+def add_invoice():
+    if request.method == 'POST':
+        try:
+            # Get form data
+            client_id = request.form['client_id']
+            project_id = request.form['project_id'] if request.form['project_id'] else None
+            invoice_date = request.form['invoice_date']
+            due_date = request.form['due_date']
+            tax_rate = float(request.form['tax_rate'] or 0)
+            discount_amount = float(request.form.get('discount_amount', 0))
+            currency = request.form.get('currency', 'INR')
+            payment_method = request.form.get('payment_method', 'bank_transfer')
+            notes = request.form.get('notes', '')
+            terms_conditions = request.form.get('terms_conditions', 'Payment due within 30 days of invoice date.')
+            
+            if not client_id or not invoice_date or not due_date:
+                flash('Client, Invoice Date, and Due Date are required!', 'danger')
+                return redirect(url_for('invoicing.invoices'))
+            
+            # Calculate subtotal from line items
+            descriptions = request.form.getlist('description[]')
+            quantities = request.form.getlist('quantity[]')
+            unit_prices = request.form.getlist('unit_price[]')
+            
+            subtotal_amount = 0
+            for i in range(len(descriptions)):
+                if descriptions[i] and quantities[i] and unit_prices[i]:
+                    qty = float(quantities[i] or 0)
+                    price = float(unit_prices[i] or 0)
+                    subtotal_amount += qty * price
+            
+            # Calculate amounts
+            tax_amount = (subtotal_amount - discount_amount) * (tax_rate / 100)
+            total_amount = subtotal_amount + tax_amount - discount_amount
+            
+            # Generate invoice number
+            from datetime import datetime
+            cur = mysql.connection.cursor()
+            current_year = datetime.now().year
+            invoice_number = sequences.next_code('invoice', year=current_year)
+            
+            # Insert invoice
+            cur.execute("""
+                INSERT INTO invoices 
+                (client_id, project_id, invoice_number, invoice_date, due_date, 
+                 subtotal, tax_rate, tax_amount, discount_amount, total_amount, 
+                 currency, status, payment_method, notes, terms_conditions, created_date)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'draft', %s, %s, %s, NOW())
+            """, (client_id, project_id, invoice_number, invoice_date, due_date,
+                  subtotal_amount, tax_rate, tax_amount, discount_amount, total_amount,
+                  currency, payment_method, notes, terms_conditions))
+            new_id = cur.lastrowid
+            
+            mysql.connection.commit()
+            dashboard_stats.invalidate()
+            cur.close()
+            audit_log.record('invoices', new_id, 'INSERT', new_values={
+                'client_id': client_id, 'project_id': project_id, 'invoice_number': invoice_number,
+                'invoice_date': invoice_date, 'due_date': due_date, 'subtotal': subtotal_amount,
+                'tax_rate': tax_rate, 'tax_amount': tax_amount, 'discount_amount': discount_amount,
+                'total_amount': total_amount, 'currency': currency, 'status': 'draft',
+                'payment_method': payment_method})
+            
+            flash(f'Invoice {invoice_number} created successfully!', 'success')
+            return redirect(url_for('invoicing.invoices'))
+            
+        except Exception as e:
+            mysql.connection.rollback()
+            flash(f"Error creating invoice: {e}", 'danger')
+            return redirect(url_for('invoicing.invoices'))
+    
+    try:
+        # For GET request, just render the invoice form
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Active clients and the projects still open for invoicing
+        clients = reference_cache.get(cur, 'active_clients', as_dicts=True)
+        projects = reference_cache.get(cur, 'open_projects', as_dicts=True)
+        
+        cur.close()
+        return render_template('add_invoice.html', clients=clients, projects=projects)
+    except Exception as e:
+        flash(f'Error loading invoice form: {e}', 'danger')
+        return render_template('add_invoice.html', clients=[], projects=[])
+
+def update_invoice():
+    try:
+        # Get form data
+        invoice_id = request.form['invoice_id']
+        client_id = request.form.get('client_id')
+        project_id = request.form.get('project_id') if request.form.get('project_id') else None
+        invoice_date = request.form.get('invoice_date')
+        due_date = request.form.get('due_date')
+        subtotal_amount = float(request.form.get('subtotal_amount', 0))
+        tax_rate = float(request.form.get('tax_rate', 0))
+        discount_amount = float(request.form.get('discount_amount', 0))
+        currency = request.form.get('currency', 'INR')
+        status = request.form.get('status', 'draft')
+        payment_method = request.form.get('payment_method', 'bank_transfer')
+        notes = request.form.get('notes', '')
+        terms_conditions = request.form.get('terms_conditions', '')
+        
+        # Calculate amounts
+        tax_amount = (subtotal_amount - discount_amount) * (tax_rate / 100)
+        total_amount = subtotal_amount + tax_amount - discount_amount
+        
+        # Set payment date if status is paid
+        payment_date = None
+        if status == 'paid' and request.form.get('payment_date'):
+            payment_date = request.form.get('payment_date')
+        elif status == 'paid':
+            from datetime import datetime
+            payment_date = datetime.now().date()
+        
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'invoices', invoice_id)
+        
+        # Update invoice
+        if payment_date:
+            cur.execute("""
+                UPDATE invoices 
+                SET client_id=%s, project_id=%s, invoice_date=%s, due_date=%s, 
+                    subtotal=%s, tax_rate=%s, tax_amount=%s, discount_amount=%s, 
+                    total_amount=%s, currency=%s, status=%s, payment_method=%s, 
+                    notes=%s, terms_conditions=%s, payment_date=%s, updated_date=NOW() 
+                WHERE id = %s
+            """, (client_id, project_id, invoice_date, due_date, subtotal_amount, 
+                  tax_rate, tax_amount, discount_amount, total_amount, currency, 
+                  status, payment_method, notes, terms_conditions, payment_date, invoice_id))
+        else:
+            cur.execute("""
+                UPDATE invoices 
+                SET client_id=%s, project_id=%s, invoice_date=%s, due_date=%s, 
+                    subtotal=%s, tax_rate=%s, tax_amount=%s, discount_amount=%s, 
+                    total_amount=%s, currency=%s, status=%s, payment_method=%s, 
+                    notes=%s, terms_conditions=%s, updated_date=NOW() 
+                WHERE id = %s
+            """, (client_id, project_id, invoice_date, due_date, subtotal_amount, 
+                  tax_rate, tax_amount, discount_amount, total_amount, currency, 
+                  status, payment_method, notes, terms_conditions, invoice_id))
+        
+        mysql.connection.commit()
+        dashboard_stats.invalidate()
+        cur.close()
+        if old_values:
+            audit_log.record('invoices', invoice_id, 'UPDATE', old_values, {
+                'client_id': client_id, 'project_id': project_id, 'invoice_date': invoice_date,
+                'due_date': due_date, 'subtotal': subtotal_amount, 'tax_rate': tax_rate,
+                'tax_amount': tax_amount, 'discount_amount': discount_amount,
+                'total_amount': total_amount, 'currency': currency, 'status': status,
+                'payment_method': payment_method, 'payment_date': payment_date})
+        flash(f'Invoice updated successfully!', 'success')
+    except Exception as e:
+        flash(f'Error updating invoice: {e}', 'danger')
+    return redirect(url_for('invoicing.invoices'))
+
+@conditional.versioned("""
+    SELECT GREATEST(i.updated_date, COALESCE(c.updated_date, i.updated_date),
+                    COALESCE(p.updated_date, i.updated_date)) as last_modified
+    FROM invoices i
+    LEFT JOIN clients c ON i.client_id = c.id
+    LEFT JOIN projects p ON i.project_id = p.id
+    WHERE i.id = %s
+""")
+def get_invoice(id):
+    """Get invoice details for editing"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT 
+                i.*,
+                c.name as client_name,
+                p.name as project_name
+            FROM invoices i 
+            LEFT JOIN clients c ON i.client_id = c.id 
+            LEFT JOIN projects p ON i.project_id = p.id 
+            WHERE i.id = %s
+        """, (id,))
+        invoice = cur.fetchone()
+        cur.close()
+        
+        if invoice:
+            return jsonify(invoice)
+        else:
+            return jsonify({'error': 'Invoice not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@conditional.versioned("""
+    SELECT MAX(updated_date) as last_modified, COUNT(*) as project_count, COALESCE(SUM(id), 0) as id_sum
+    FROM projects
+    WHERE client_id = %s AND status != 'completed'
+""")
+def get_projects_by_client(client_id):
+    """Get projects for a specific client"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT id, name 
+            FROM projects 
+            WHERE client_id = %s AND status != 'completed' 
+            ORDER BY name
+        """, (client_id,))
+        projects = cur.fetchall()
+        cur.close()
+        if request.args.get('layout') == 'columns':
+            return jsonify(columnar(projects, ['id', 'name']))
+        return jsonify(projects)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def bulk_invoice_operations():
+    """Handle bulk operations on invoices"""
+    try:
+        action = request.form.get('action')
+        invoice_ids = request.form.getlist('invoice_ids[]')
+        
+        if not action or not invoice_ids:
+            flash('No action or invoices selected!', 'warning')
+            return redirect(url_for('invoicing.invoices'))
+        
+        cur = mysql.connection.cursor()
+        old_rows = audit_log.snapshot_many(cur, 'invoices', invoice_ids)
+        new_values = None
+        
+        if action == 'delete':
+            # Delete selected invoices
+            format_strings = ','.join(['%s'] * len(invoice_ids))
+            cur.execute(f"DELETE FROM invoices WHERE id IN ({format_strings})", invoice_ids)
+            flash(f'{len(invoice_ids)} invoice(s) deleted successfully!', 'success')
+            
+        elif action in ['draft', 'sent', 'paid', 'overdue', 'cancelled']:
+            # Update status for selected invoices
+            format_strings = ','.join(['%s'] * len(invoice_ids))
+            cur.execute(f"UPDATE invoices SET status = %s WHERE id IN ({format_strings})", [action] + invoice_ids)
+            new_values = {'status': action}
+            flash(f'{len(invoice_ids)} invoice(s) updated to {action} status!', 'success')
+            
+        elif action == 'mark_paid':
+            # Mark as paid with current date
+            from datetime import datetime
+            payment_date = datetime.now().date()
+            format_strings = ','.join(['%s'] * len(invoice_ids))
+            cur.execute(f"UPDATE invoices SET status = 'paid', payment_date = %s WHERE id IN ({format_strings})", [payment_date] + invoice_ids)
+            new_values = {'status': 'paid', 'payment_date': payment_date}
+            flash(f'{len(invoice_ids)} invoice(s) marked as paid!', 'success')
+        
+        mysql.connection.commit()
+        dashboard_stats.invalidate()
+        cur.close()
+        for invoice_id, old_values in old_rows.items():
+            if action == 'delete':
+                audit_log.record('invoices', invoice_id, 'DELETE', old_values)
+            elif new_values:
+                audit_log.record('invoices', invoice_id, 'UPDATE', old_values, new_values)
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        flash(f'Error performing bulk operation: {e}', 'danger')
+    
+    return redirect(url_for('invoicing.invoices'))
+
+def update_invoice_status(id, status):
+    try:
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'invoices', id)
+        cur.execute("UPDATE invoices SET status = %s WHERE id = %s", (status, id))
+        mysql.connection.commit()
+        dashboard_stats.invalidate()
+        cur.close()
+        if old_values:
+            audit_log.record('invoices', id, 'UPDATE', old_values, {'status': status})
+        flash(f'Invoice status updated to {status}!', 'success')
+    except Exception as e:
+        flash(f'Error updating invoice status: {e}', 'danger')
+    return redirect(url_for('invoicing.invoices'))
+
+def delete_invoice(id):
+    cur = mysql.connection.cursor()
+    old_values = audit_log.snapshot(cur, 'invoices', id)
+    cur.execute("DELETE FROM invoices WHERE id = %s", (id,))
+    mysql.connection.commit()
+    dashboard_stats.invalidate()
+    cur.close()
+    if old_values:
+        audit_log.record('invoices', id, 'DELETE', old_values)
+    return redirect(url_for('invoicing.invoices'))
@@ -0,0 +1,561 @@
+"""
+Payroll Views for Lumorange Management System
+Salaries, payroll runs, run reports and background payroll exports
+"""
+
+from datetime import datetime
+
+import MySQLdb.cursors
+from flask import flash, jsonify, redirect, render_template, request, send_file, url_for
+
+from csv_export import stream_csv
+from extensions import audit_log, conditional, job_runner, mysql, payroll_exporter, payroll_reports, reference_cache
+from payroll_reports import FORMATS as PAYROLL_REPORT_FORMATS
+
+# Salary CRUD routes
+def salaries():
+    cur = mysql.connection.cursor()
+    cur.execute("""SELECT s.id, 
+                   COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name) as employee_name,
+                   s.basic_salary, 
+                   COALESCE(s.allowances, 0) as allowances,
+                   COALESCE(s.deductions, 0) as deductions,
+                   (s.basic_salary + COALESCE(s.allowances, 0) - COALESCE(s.deductions, 0)) as net_salary,
+                   s.effective_date 
+                   FROM salaries s 
+                   JOIN employees e ON s.employee_id = e.id 
+                   WHERE s.is_active = 1
+                   ORDER BY s.effective_date DESC""")
+    salaries = cur.fetchall()
+    
+    # Get employees for dropdown
+    employees = reference_cache.get(cur, 'active_employees')
+    
+    cur.close()
+    return render_template('salaries.html', salaries=salaries, employees=employees)
+
+def add_salary():
+    employee_id = request.form['employee_id']
+    basic_salary = request.form['basic_salary']
+    allowances = request.form['allowances'] or 0
+    deductions = request.form['deductions'] or 0
+    effective_date = request.form['effective_date']
+    if not employee_id or not basic_salary or not effective_date:
+        flash('Employee ID, Basic Salary, and Effective Date are required!', 'danger')
+        return redirect(url_for('payroll.salaries'))
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("INSERT INTO salaries (employee_id, basic_salary, allowances, deductions, effective_date) VALUES (%s, %s, %s, %s, %s)", 
+                   (employee_id, basic_salary, allowances, deductions, effective_date))
+        new_id = cur.lastrowid
+        mysql.connection.commit()
+        cur.close()
+        audit_log.record('salaries', new_id, 'INSERT', new_values={
+            'employee_id': employee_id, 'basic_salary': basic_salary, 'allowances': allowances,
+            'deductions': deductions, 'effective_date': effective_date})
+        flash('Salary record added successfully!', 'success')
+    except Exception as e:
+        flash(f'Error adding salary record: {e}', 'danger')
+    return redirect(url_for('payroll.salaries'))
+
+def delete_salary(id):
+    cur = mysql.connection.cursor()
+    old_values = audit_log.snapshot(cur, 'salaries', id)
+    cur.execute("DELETE FROM salaries WHERE id = %s", (id,))
+    mysql.connection.commit()
+    cur.close()
+    if old_values:
+        audit_log.record('salaries', id, 'DELETE', old_values)
+    return redirect(url_for('payroll.salaries'))
+
+def update_salary():
+    try:
+        salary_id = request.form['salary_id']
+        employee_id = request.form['employee_id']
+        basic_salary = request.form['basic_salary']
+        allowances = request.form['allowances'] or 0
+        deductions = request.form['deductions'] or 0
+        effective_date = request.form['effective_date']
+        
+        if not salary_id or not employee_id or not basic_salary or not effective_date:
+            flash('All required fields must be filled!', 'danger')
+            return redirect(url_for('payroll.salaries'))
+        
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'salaries', salary_id)
+        
+        # Update salary record
+        cur.execute("""
+            UPDATE salaries 
+            SET employee_id = %s, basic_salary = %s, allowances = %s, 
+                deductions = %s, effective_date = %s
+            WHERE id = %s
+        """, (employee_id, basic_salary, allowances, deductions, effective_date, salary_id))
+        
+        mysql.connection.commit()
+        cur.close()
+        if old_values:
+            audit_log.record('salaries', salary_id, 'UPDATE', old_values, {
+                'employee_id': employee_id, 'basic_salary': basic_salary, 'allowances': allowances,
+                'deductions': deductions, 'effective_date': effective_date})
+        
+        flash('Salary record updated successfully!', 'success')
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        flash(f'Error updating salary record: {e}', 'danger')
+        
+    return redirect(url_for('payroll.salaries'))
+
+# Salary API endpoints
+@conditional.versioned("""
+    SELECT GREATEST(s.updated_date, e.updated_date, COALESCE(d.updated_date, e.updated_date)) as last_modified
+    FROM salaries s
+    JOIN employees e ON s.employee_id = e.id
+    LEFT JOIN departments d ON e.department_id = d.id
+    WHERE s.id = %s
+""")
+def get_salary_details(salary_id):
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT s.id, s.employee_id, s.basic_salary, s.allowances, s.deductions,
+                   (s.basic_salary + COALESCE(s.allowances, 0) - COALESCE(s.deductions, 0)) as net_salary,
+                   s.effective_date, s.end_date, s.currency, s.is_active, s.created_date,
+                   COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name) as employee_name,
+                   e.email, COALESCE(d.name, 'Not Assigned') as department
+            FROM salaries s
+            JOIN employees e ON s.employee_id = e.id
+            LEFT JOIN departments d ON e.department_id = d.id
+            WHERE s.id = %s
+        """, (salary_id,))
+        salary = cur.fetchone()
+        cur.close()
+        
+        if salary:
+            # Convert date objects to strings for JSON serialization
+            # Dates are serialized as ISO 8601 (what the edit form's inputs expect); add display forms
+            if salary['effective_date']:
+                salary['effective_date_display'] = salary['effective_date'].strftime('%d %b %Y')
+            if salary['end_date']:
+                salary['end_date'] = salary['end_date'].strftime('%d %b %Y')
+            if salary['created_date']:
+                salary['created_date'] = salary['created_date'].strftime('%d %b %Y, %I:%M %p')
+            
+            return jsonify({'success': True, 'salary': salary})
+        else:
+            return jsonify({'success': False, 'error': 'Salary record not found'}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def export_salaries():
+    def format_salary(salary):
+        return [
+            f"SAL-{salary[0]}",
+            salary[1],
+            f"{salary[2]:.2f}",
+            f"{salary[3]:.2f}",
+            f"{salary[4]:.2f}",
+            f"{salary[5]:.2f}",
+            salary[6].strftime('%Y-%m-%d') if salary[6] else '',
+            salary[7] or 'INR'
+        ]
+    
+    try:
+        # Stream straight from an unbuffered cursor instead of building the file in memory
+        return stream_csv(
+            mysql,
+            """SELECT s.id, 
+                       COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name) as employee_name,
+                       s.basic_salary, 
+                       COALESCE(s.allowances, 0) as allowances,
+                       COALESCE(s.deductions, 0) as deductions,
+                       (s.basic_salary + COALESCE(s.allowances, 0) - COALESCE(s.deductions, 0)) as net_salary,
+                       s.effective_date, s.currency
+                       FROM salaries s 
+                       JOIN employees e ON s.employee_id = e.id 
+                       WHERE s.is_active = 1
+                       ORDER BY s.effective_date DESC""",
+            (),
+            ['ID', 'Employee', 'Basic Salary', 'Allowances', 'Deductions', 'Net Salary', 'Effective Date', 'Currency'],
+            format_salary,
+            'salary_records.csv')
+        
+    except Exception as e:
+        flash(f'Error exporting salary data: {e}', 'danger')
+        return redirect(url_for('payroll.salaries'))
+
+
+def payroll():
+    """Render the payroll management page"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get payroll statistics
+        cur.execute("SELECT COUNT(*) as total_runs FROM payroll_runs")
+        total_runs = cur.fetchone()['total_runs']
+        
+        cur.execute("SELECT COUNT(*) as active_employees FROM employees WHERE status = 'active'")
+        active_employees = cur.fetchone()['active_employees']
+        
+        cur.execute("""
+            SELECT COALESCE(SUM(basic_salary + COALESCE(allowances, 0)), 0) as monthly_payroll 
+            FROM salaries WHERE is_active = 1
+        """)
+        monthly_payroll = cur.fetchone()['monthly_payroll']
+        
+        cur.execute("""
+            SELECT DATE_FORMAT(MAX(created_date), '%d %b %Y') as last_run 
+            FROM payroll_runs
+        """)
+        last_run_result = cur.fetchone()
+        last_run = last_run_result['last_run'] if last_run_result['last_run'] else 'Never'
+        
+        # Get payroll runs
+        cur.execute("""
+            SELECT * FROM payroll_runs 
+            ORDER BY created_date DESC
+        """)
+        payroll_runs = cur.fetchall()
+        
+        stats = {
+            'total_runs': total_runs,
+            'active_employees': active_employees,
+            'monthly_payroll': float(monthly_payroll or 0),
+            'last_run': last_run
+        }
+        
+        cur.close()
+        
+        return render_template('payroll.html', 
+                             stats=stats, 
+                             payroll_runs=payroll_runs,
+                             today=datetime.now().date(),
+                             export_formats=payroll_exporter.formats())
+        
+    except Exception as e:
+        print(f"Error loading payroll page: {e}")
+        stats = {'total_runs': 0, 'active_employees': 0, 'monthly_payroll': 0, 'last_run': 'Never'}
+        return render_template('payroll.html', stats=stats, payroll_runs=[], today=datetime.now().date(),
+                               export_formats=payroll_exporter.formats())
+
+def create_payroll_run():
+    """Create a new payroll run"""
+    try:
+        run_name = request.form.get('runName')
+        pay_date = request.form.get('payDate')
+        pay_period_start = request.form.get('payPeriodStart')
+        pay_period_end = request.form.get('payPeriodEnd')
+        notes = request.form.get('notes', '')
+        
+        if not all([run_name, pay_date, pay_period_start, pay_period_end]):
+            flash('All required fields must be filled!', 'danger')
+            return redirect(url_for('payroll.payroll'))
+        
+        cur = mysql.connection.cursor()
+        
+        # Create payroll run; entries are generated by a background job
+        cur.execute("""
+            INSERT INTO payroll_runs (run_name, pay_date, pay_period_start, pay_period_end, notes, processed_by,
+                                      status, progress_percent)
+            VALUES (%s, %s, %s, %s, %s, %s, 'processing', 0)
+        """, (run_name, pay_date, pay_period_start, pay_period_end, notes, 'Admin'))
+        
+        payroll_run_id = cur.lastrowid
+        cur.close()
+        
+        # Commits the run together with its job and returns straight away
+        job_id = job_runner.enqueue(mysql.connection, 'payroll_run', {'payroll_run_id': payroll_run_id})
+        audit_log.record('payroll_runs', payroll_run_id, 'INSERT', new_values={
+            'run_name': run_name, 'pay_date': pay_date, 'pay_period_start': pay_period_start,
+            'pay_period_end': pay_period_end, 'notes': notes, 'status': 'processing'})
+        
+        flash(f'Payroll run "{run_name}" is being generated (job #{job_id}). Progress is shown below.', 'success')
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        print(f"Error creating payroll run: {e}")
+        flash(f'Error creating payroll run: {str(e)}', 'danger')
+    
+    return redirect(url_for('payroll.payroll'))
+
+def payroll_progress(payroll_id):
+    """Generation progress for a payroll run"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT id, status, progress_percent, total_employees, total_gross_pay, total_net_pay
+            FROM payroll_runs WHERE id = %s
+        """, (payroll_id,))
+        run = cur.fetchone()
+        cur.close()
+        if not run:
+            return jsonify({'success': False, 'error': 'Payroll run not found'}), 404
+        return jsonify({
+            'success': True,
+            'id': run['id'],
+            'status': run['status'],
+            'progress_percent': run['progress_percent'],
+            'generating': run['status'] == 'processing' and (run['progress_percent'] or 0) < 100,
+            'total_employees': run['total_employees'] or 0,
+            'total_gross_pay': float(run['total_gross_pay'] or 0),
+            'total_net_pay': float(run['total_net_pay'] or 0)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def payroll_details(payroll_id):
+    """View detailed payroll run information"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get payroll run details
+        cur.execute("""
+            SELECT * FROM payroll_runs WHERE id = %s
+        """, (payroll_id,))
+        payroll_run = cur.fetchone()
+        
+        if not payroll_run:
+            flash('Payroll run not found!', 'danger')
+            return redirect(url_for('payroll.payroll'))
+        
+        # Get payroll entries with employee details
+        cur.execute("""
+            SELECT pe.*, e.name as employee_name, e.email, e.employee_id as emp_code,
+                   COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name) as full_name
+            FROM payroll_entries pe
+            JOIN employees e ON pe.employee_id = e.id
+            WHERE pe.payroll_run_id = %s
+            ORDER BY e.name
+        """, (payroll_id,))
+        payroll_entries = cur.fetchall()
+        
+        cur.close()
+        
+        return render_template('payroll_details.html', 
+                             payroll_run=payroll_run, 
+                             payroll_entries=payroll_entries)
+        
+    except Exception as e:
+        print(f"Error loading payroll details: {e}")
+        flash('Error loading payroll details!', 'danger')
+        return redirect(url_for('payroll.payroll'))
+
+def edit_payroll_run(payroll_id):
+    """Edit payroll run (only if status is draft)"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        if request.method == 'POST':
+            run_name = request.form.get('runName')
+            pay_date = request.form.get('payDate')
+            pay_period_start = request.form.get('payPeriodStart')
+            pay_period_end = request.form.get('payPeriodEnd')
+            notes = request.form.get('notes', '')
+            
+            if not all([run_name, pay_date, pay_period_start, pay_period_end]):
+                flash('All required fields must be filled!', 'danger')
+                return redirect(url_for('payroll.payroll_details', payroll_id=payroll_id))
+            
+            # Check if payroll is still in draft status (the row doubles as the audit snapshot)
+            old_values = audit_log.snapshot(cur, 'payroll_runs', payroll_id)
+            
+            if not old_values or old_values['status'] != 'draft':
+                flash('Only draft payroll runs can be edited!', 'danger')
+                return redirect(url_for('payroll.payroll_details', payroll_id=payroll_id))
+            
+            # Update payroll run
+            cur.execute("""
+                UPDATE payroll_runs 
+                SET run_name = %s, pay_date = %s, pay_period_start = %s, 
+                    pay_period_end = %s, notes = %s, updated_date = NOW()
+                WHERE id = %s
+            """, (run_name, pay_date, pay_period_start, pay_period_end, notes, payroll_id))
+            
+            mysql.connection.commit()
+            cur.close()
+            audit_log.record('payroll_runs', payroll_id, 'UPDATE', old_values, {
+                'run_name': run_name, 'pay_date': pay_date, 'pay_period_start': pay_period_start,
+                'pay_period_end': pay_period_end, 'notes': notes})
+            
+            flash('Payroll run updated successfully!', 'success')
+            return redirect(url_for('payroll.payroll_details', payroll_id=payroll_id))
+        
+        else:
+            # GET request - show edit form
+            cur.execute("SELECT * FROM payroll_runs WHERE id = %s", (payroll_id,))
+            payroll_run = cur.fetchone()
+            
+            if not payroll_run:
+                flash('Payroll run not found!', 'danger')
+                return redirect(url_for('payroll.payroll'))
+            
+            if payroll_run['status'] != 'draft':
+                flash('Only draft payroll runs can be edited!', 'warning')
+                return redirect(url_for('payroll.payroll_details', payroll_id=payroll_id))
+            
+            cur.close()
+            return render_template('payroll_edit.html', payroll_run=payroll_run)
+            
+    except Exception as e:
+        mysql.connection.rollback()
+        print(f"Error editing payroll run: {e}")
+        flash('Error editing payroll run!', 'danger')
+        return redirect(url_for('payroll.payroll'))
+
+def delete_payroll_run(payroll_id):
+    """Delete payroll run and all associated entries"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Check if payroll run exists and get its status (kept for the audit log)
+        payroll_run = audit_log.snapshot(cur, 'payroll_runs', payroll_id)
+        
+        if not payroll_run:
+            flash('Payroll run not found!', 'danger')
+            return redirect(url_for('payroll.payroll'))
+        
+        # Only allow deletion of draft runs
+        if payroll_run['status'] != 'draft':
+            flash('Only draft payroll runs can be deleted!', 'warning')
+            return redirect(url_for('payroll.payroll'))
+        
+        # Delete payroll entries first (due to foreign key constraint)
+        cur.execute("DELETE FROM payroll_entries WHERE payroll_run_id = %s", (payroll_id,))
+        
+        # Delete the payroll run
+        cur.execute("DELETE FROM payroll_runs WHERE id = %s", (payroll_id,))
+        
+        mysql.connection.commit()
+        cur.close()
+        payroll_reports.invalidate(payroll_id)
+        audit_log.record('payroll_runs', payroll_id, 'DELETE', payroll_run)
+        
+        flash(f'Payroll run "{payroll_run["run_name"]}" deleted successfully!', 'success')
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        print(f"Error deleting payroll run: {e}")
+        flash('Error deleting payroll run!', 'danger')
+    
+    return redirect(url_for('payroll.payroll'))
+
+def update_payroll_status(payroll_id, new_status):
+    """Update payroll run status"""
+    try:
+        if new_status not in ['draft', 'processing', 'completed', 'cancelled']:
+            flash('Invalid status!', 'danger')
+            return redirect(url_for('payroll.payroll'))
+        
+        cur = mysql.connection.cursor()
+        old_values = audit_log.snapshot(cur, 'payroll_runs', payroll_id)
+        
+        cur.execute("""
+            UPDATE payroll_runs 
+            SET status = %s, updated_date = NOW()
+            WHERE id = %s
+        """, (new_status, payroll_id))
+        
+        mysql.connection.commit()
+        cur.close()
+        # The new updated_date retires any cached report for the run
+        payroll_reports.invalidate(payroll_id)
+        if old_values:
+            audit_log.record('payroll_runs', payroll_id, 'UPDATE', old_values, {'status': new_status})
+        
+        flash(f'Payroll status updated to {new_status.title()}!', 'success')
+        
+    except Exception as e:
+        mysql.connection.rollback()
+        print(f"Error updating payroll status: {e}")
+        flash('Error updating payroll status!', 'danger')
+    
+    return redirect(url_for('payroll.payroll'))
+
+def download_payroll_report(payroll_id):
+    """Download payroll report as Excel (XLSX) or CSV"""
+    try:
+        report_format = request.args.get('format', 'xlsx')
+        if report_format not in PAYROLL_REPORT_FORMATS:
+            flash('Unsupported report format!', 'danger')
+            return redirect(url_for('payroll.payroll_details', payroll_id=payroll_id))
+        
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get payroll run details
+        cur.execute("SELECT id, run_name, status, updated_date FROM payroll_runs WHERE id = %s", (payroll_id,))
+        payroll_run = cur.fetchone()
+        cur.close()
+        
+        if not payroll_run:
+            flash('Payroll run not found!', 'danger')
+            return redirect(url_for('payroll.payroll'))
+        
+        # Entries stream row by row from their own pooled connection
+        return payroll_reports.response(payroll_run, report_format)
+        
+    except Exception as e:
+        print(f"Error downloading payroll report: {e}")
+        flash('Error preparing download!', 'danger')
+        return redirect(url_for('payroll.payroll'))
+
+def export_payroll_data():
+    """Start a background export of all payroll runs and entries in a pay-date range"""
+    try:
+        payload = payroll_exporter.payload(request.form.get('dateFrom'), request.form.get('dateTo'),
+                                           request.form.get('format', 'csv'))
+        
+        # Returns straight away; the file is written by a background job
+        job_id = job_runner.enqueue(mysql.connection, 'payroll_export', payload)
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('payroll.payroll_export_status', job_id=job_id)
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error exporting payroll data: {e}")
+        return jsonify({'success': False, 'error': 'Error starting export'}), 500
+
+def _payroll_export_job(job_id):
+    cur = mysql.connection.cursor()
+    job = job_runner.get(cur, job_id)
+    cur.close()
+    if not job or job['job_type'] != 'payroll_export':
+        return None
+    return job
+
+def payroll_export_status(job_id):
+    """Progress of a payroll export, with its download link once finished"""
+    try:
+        job = _payroll_export_job(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Export not found'}), 404
+        if job['status'] == 'completed':
+            job['download_url'] = url_for('payroll.download_payroll_export', job_id=job_id)
+        return jsonify({'success': True, 'job': job})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def download_payroll_export(job_id):
+    """Download a finished payroll export"""
+    try:
+        job = _payroll_export_job(job_id)
+        path = None
+        if job and job['status'] == 'completed' and job['result']:
+            path = payroll_exporter.path_for(job['result']['filename'])
+        if not path:
+            flash('Export not found or no longer available!', 'warning')
+            return redirect(url_for('payroll.payroll'))
+        
+        return send_file(path, as_attachment=True, download_name=job['result']['filename'],
+                         mimetype='application/gzip' if path.endswith('.gz') else 'application/octet-stream',
+                         conditional=True)
+        
+    except Exception as e:
+        print(f"Error downloading payroll export: {e}")
+        flash('Error preparing export download!', 'danger')
+        return redirect(url_for('payroll.payroll'))
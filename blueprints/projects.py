@@ -0,0 +1,265 @@
+"""
+Project Views for Lumorange Management System
+Projects and employee-to-project assignments
+"""
+
+import MySQLdb.cursors
+from flask import flash, redirect, render_template, request, url_for
+
+from extensions import dashboard_stats, mysql, reference_cache
+
+# Project CRUD routes
+def projects():
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get comprehensive project data with statistics
+        cur.execute("""
+            SELECT 
+                p.id,
+                p.name,
+                p.description,
+                p.client_id,
+                p.department_id,
+                p.project_manager_id,
+                p.start_date,
+                p.end_date,
+                p.budget,
+                p.actual_cost,
+                p.status,
+                p.priority,
+                p.created_date,
+                p.updated_date,
+                p.progress,
+                d.name as department_name,
+                c.name as client_name,
+                CONCAT(pm.first_name, ' ', pm.last_name) as project_manager_name,
+                DATEDIFF(CURDATE(), p.start_date) as days_running,
+                CASE 
+                    WHEN p.end_date IS NULL THEN 0
+                    ELSE DATEDIFF(p.end_date, CURDATE())
+                END as days_remaining,
+                (SELECT COUNT(*) FROM employee_projects ep WHERE ep.project_id = p.id) as team_size
+            FROM projects p 
+            LEFT JOIN departments d ON p.department_id = d.id
+            LEFT JOIN clients c ON p.client_id = c.id
+            LEFT JOIN employees pm ON p.project_manager_id = pm.id
+            ORDER BY p.created_date DESC
+        """)
+        projects = cur.fetchall()
+        
+        # Calculate summary statistics
+        total_projects = len(projects)
+        active_projects = len([p for p in projects if p['status'] == 'active'])
+        completed_projects = len([p for p in projects if p['status'] == 'completed'])
+        
+        # Calculate total budget and actual costs
+        total_budget = sum(float(p['budget'] or 0) for p in projects)
+        total_actual_cost = sum(float(p['actual_cost'] or 0) for p in projects)
+        
+        # Get average progress
+        active_project_progress = [p['progress'] for p in projects if p['status'] == 'active' and p['progress'] is not None]
+        avg_progress = sum(active_project_progress) / len(active_project_progress) if active_project_progress else 0
+        
+        # Get high priority projects count
+        high_priority_projects = len([p for p in projects if p['priority'] == 'high'])
+        
+        # Dropdown lists
+        departments = reference_cache.get(cur, 'departments', as_dicts=True)
+        clients = reference_cache.get(cur, 'clients', as_dicts=True)
+        employees = reference_cache.get(cur, 'active_employees', as_dicts=True)
+        
+        cur.close()
+        
+        return render_template('projects_clean.html', 
+                             projects=projects, 
+                             departments=departments, 
+                             clients=clients,
+                             employees=employees,
+                             total_projects=total_projects,
+                             active_projects=active_projects,
+                             completed_projects=completed_projects,
+                             total_budget=total_budget,
+                             total_actual_cost=total_actual_cost,
+                             avg_progress=round(avg_progress, 1),
+                             high_priority_projects=high_priority_projects)
+    except Exception as e:
+        flash(f"Error loading projects: {e}", 'danger')
+        return render_template('projects_new.html', 
+                             projects=[], 
+                             departments=[], 
+                             clients=[],
+                             employees=[],
+                             total_projects=0,
+                             active_projects=0,
+                             completed_projects=0,
+                             total_budget=0,
+                             total_actual_cost=0,
+                             avg_progress=0,
+                             high_priority_projects=0)
+
+def add_project():
+    try:
+        name = request.form['name']
+        description = request.form.get('description', '')
+        department_id = request.form['department_id']
+        client_id = request.form.get('client_id') or None
+        project_manager_id = request.form.get('project_manager_id') or None
+        status = request.form.get('status', 'planning')
+        priority = request.form.get('priority', 'medium')
+        budget = request.form.get('budget', 0)
+        progress = request.form.get('progress', 0)
+        start_date = request.form['start_date']
+        end_date = request.form.get('end_date') or None
+        
+        # Validate status against allowed ENUM values
+        allowed_statuses = ['planning', 'active', 'on_hold', 'completed', 'cancelled']
+        if status not in allowed_statuses:
+            status = 'planning'
+            
+        # Validate priority against allowed ENUM values
+        allowed_priorities = ['low', 'medium', 'high', 'urgent']
+        if priority not in allowed_priorities:
+            priority = 'medium'
+        
+        # Validate and convert numeric fields
+        try:
+            budget = float(budget) if budget else 0.0
+            progress = int(progress) if progress else 0
+            progress = max(0, min(100, progress))
+        except (ValueError, TypeError):
+            budget = 0.0
+            progress = 0
+        
+        if not name or not department_id or not start_date:
+            flash('Name, Department, and Start Date are required!', 'danger')
+            return redirect(url_for('projects.projects'))
+            
+        cur = mysql.connection.cursor()
+        cur.execute("""INSERT INTO projects (name, description, department_id, client_id, 
+                       project_manager_id, status, priority, budget, progress, start_date, end_date) 
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""", 
+                       (name, description, department_id, client_id, project_manager_id, 
+                        status, priority, budget, progress, start_date, end_date))
+        mysql.connection.commit()
+        reference_cache.invalidate('projects')
+        dashboard_stats.invalidate()
+        cur.close()
+        flash(f'Project "{name}" added successfully!', 'success')
+    except Exception as e:
+        flash(f'Error adding project: {e}', 'danger')
+    return redirect(url_for('projects.projects'))
+
+def update_project():
+    try:
+        project_id = request.form['project_id']
+        name = request.form['name']
+        description = request.form.get('description', '')
+        department_id = request.form['department_id']
+        client_id = request.form.get('client_id') or None
+        project_manager_id = request.form.get('project_manager_id') or None
+        status = request.form.get('status', 'planning')
+        priority = request.form.get('priority', 'medium')
+        budget = request.form.get('budget', 0)
+        actual_cost = request.form.get('actual_cost', 0)
+        progress = request.form.get('progress', 0)
+        start_date = request.form['start_date']
+        end_date = request.form.get('end_date') or None
+        
+        # Validate ENUM values
+        allowed_statuses = ['planning', 'active', 'on_hold', 'completed', 'cancelled']
+        if status not in allowed_statuses:
+            status = 'planning'
+            
+        allowed_priorities = ['low', 'medium', 'high', 'urgent']
+        if priority not in allowed_priorities:
+            priority = 'medium'
+        
+        # Validate numeric fields
+        try:
+            budget = float(budget) if budget else 0.0
+            actual_cost = float(actual_cost) if actual_cost else 0.0
+            progress = int(progress) if progress else 0
+            progress = max(0, min(100, progress))
+        except (ValueError, TypeError):
+            budget = 0.0
+            actual_cost = 0.0
+            progress = 0
+        
+        cur = mysql.connection.cursor()
+        cur.execute("""UPDATE projects SET name = %s, description = %s, department_id = %s,
+                       client_id = %s, project_manager_id = %s, status = %s, priority = %s,
+                       budget = %s, actual_cost = %s, progress = %s, start_date = %s, end_date = %s
+                       WHERE id = %s""", 
+                   (name, description, department_id, client_id, project_manager_id, 
+                    status, priority, budget, actual_cost, progress, start_date, end_date, project_id))
+        mysql.connection.commit()
+        reference_cache.invalidate('projects')
+        dashboard_stats.invalidate()
+        cur.close()
+        flash(f'Project "{name}" updated successfully!', 'success')
+    except Exception as e:
+        flash(f'Error updating project: {e}', 'danger')
+    return redirect(url_for('projects.projects'))
+
+def delete_project(id):
+    cur = mysql.connection.cursor()
+    cur.execute("DELETE FROM projects WHERE id = %s", (id,))
+    mysql.connection.commit()
+    reference_cache.invalidate('projects')
+    dashboard_stats.invalidate()
+    cur.close()
+    return redirect(url_for('projects.projects'))
+
+# Employee-Project Assignment CRUD routes
+def employee_projects():
+    cur = mysql.connection.cursor()
+    cur.execute("""SELECT ep.id, ep.employee_id, ep.project_id, ep.role, 
+                   COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name) as employee_name,
+                   p.name as project_name, d.name as department_name,
+                   COALESCE(ep.assigned_date, ep.start_date, ep.created_date) as assigned_date
+                   FROM employee_projects ep
+                   LEFT JOIN employees e ON ep.employee_id = e.id
+                   LEFT JOIN projects p ON ep.project_id = p.id  
+                   LEFT JOIN departments d ON e.department_id = d.id
+                   WHERE COALESCE(ep.is_active, 1) = 1
+                   ORDER BY ep.created_date DESC""")
+    employee_projects = cur.fetchall()
+    
+    # Dropdown lists
+    employees = reference_cache.get(cur, 'active_employees')
+    projects = reference_cache.get(cur, 'projects')
+    
+    cur.close()
+    
+    return render_template('employee_projects.html', 
+                         employee_projects=employee_projects, 
+                         employees=employees, 
+                         projects=projects)
+
+def assign_employee_project():
+    employee_id = request.form['employee_id']
+    project_id = request.form['project_id']
+    role = request.form['role']
+    assigned_date = request.form.get('assigned_date', 'CURDATE()')
+    
+    if not employee_id or not project_id or not role:
+        flash('All fields are required!', 'danger')
+        return redirect(url_for('projects.employee_projects'))
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("INSERT INTO employee_projects (employee_id, project_id, role, assigned_date) VALUES (%s, %s, %s, %s)", 
+                   (employee_id, project_id, role, assigned_date))
+        mysql.connection.commit()
+        cur.close()
+        flash('Assignment added successfully!', 'success')
+    except Exception as e:
+        flash(f'Error assigning employee to project: {e}', 'danger')
+    return redirect(url_for('projects.employee_projects'))
+
+def delete_employee_project(id):
+    cur = mysql.connection.cursor()
+    cur.execute("DELETE FROM employee_projects WHERE id = %s", (id,))
+    mysql.connection.commit()
+    cur.close()
+    return redirect(url_for('projects.employee_projects'))
@@ -0,0 +1,1195 @@
+"""
+Recruitment Views for Lumorange Management System
+Candidates, job positions, interviews, applications and recruitment reports
+"""
+
+import MySQLdb.cursors
+from flask import flash, jsonify, redirect, render_template, request, url_for
+
+from extensions import (candidate_search, job_runner, mysql, notes_autosave, recruitment_analytics,
+                        reference_cache, sequences, skill_matcher)
+from pagination import KeysetPaginator
+
+def get_unique_interview_code():
+    """Get the next interview code (INT001, INT002, ...) from the interview sequence"""
+    return sequences.next_code('interview')
+
+def recruitment_dashboard():
+    """Recruitment Dashboard with Analytics"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get recruitment analytics
+        cur.execute("""
+            SELECT 
+                COUNT(DISTINCT jp.id) as total_positions,
+                COUNT(DISTINCT CASE WHEN jp.status = 'Open' THEN jp.id END) as open_positions,
+                COUNT(DISTINCT ja.id) as total_applications,
+                COUNT(DISTINCT CASE WHEN ja.status IN ('Applied', 'Under Review', 'Shortlisted') THEN ja.id END) as active_applications,
+                COUNT(DISTINCT i.id) as total_interviews,
+                COUNT(DISTINCT CASE WHEN i.status = 'Scheduled' THEN i.id END) as scheduled_interviews,
+                COUNT(DISTINCT jo.id) as total_offers,
+                COUNT(DISTINCT CASE WHEN jo.status = 'Sent' THEN jo.id END) as pending_offers
+            FROM job_positions jp
+            LEFT JOIN job_applications ja ON jp.id = ja.job_position_id
+            LEFT JOIN interviews i ON ja.id = i.application_id
+            LEFT JOIN job_offers jo ON ja.id = jo.application_id
+        """)
+        analytics = cur.fetchone()
+        
+        # Get recent applications
+        cur.execute("""
+            SELECT ja.*, c.first_name, c.last_name, c.email, jp.position_title,
+                   COALESCE(d.name, 'No Department') as department_name,
+                   DATE(ja.application_date) as app_date
+            FROM job_applications ja
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            LEFT JOIN departments d ON jp.department_id = d.id
+            ORDER BY ja.application_date DESC
+            LIMIT 10
+        """)
+        recent_applications = cur.fetchall()
+        
+        # Get upcoming interviews
+        cur.execute("""
+            SELECT i.*, c.first_name, c.last_name, jp.position_title, it.type_name,
+                   DATE(i.scheduled_date) as interview_date,
+                   TIME(i.scheduled_time) as interview_time
+            FROM interviews i
+            JOIN job_applications ja ON i.application_id = ja.id
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            JOIN interview_types it ON i.interview_type_id = it.id
+            WHERE i.scheduled_date >= CURDATE() AND i.status = 'Scheduled'
+            ORDER BY i.scheduled_date ASC, i.scheduled_time ASC
+            LIMIT 10
+        """)
+        upcoming_interviews = cur.fetchall()
+        
+        # Get pipeline statistics
+        cur.execute("""
+            SELECT 
+                ja.status,
+                COUNT(*) as count
+            FROM job_applications ja
+            WHERE ja.status IN ('Applied', 'Under Review', 'Shortlisted', 'Interview Scheduled', 'Interviewed', 'Selected', 'Offer Extended')
+            GROUP BY ja.status
+            ORDER BY FIELD(ja.status, 'Applied', 'Under Review', 'Shortlisted', 'Interview Scheduled', 'Interviewed', 'Selected', 'Offer Extended')
+        """)
+        pipeline_stats = cur.fetchall()
+        
+        cur.close()
+        
+        return render_template('recruitment_dashboard.html', 
+                             analytics=analytics or {},
+                             recent_applications=recent_applications or [],
+                             upcoming_interviews=upcoming_interviews or [],
+                             pipeline_stats=pipeline_stats or [])
+    
+    except Exception as e:
+        flash(f'Error loading recruitment dashboard: {str(e)}', 'danger')
+        return render_template('recruitment_dashboard.html', 
+                             analytics={}, recent_applications=[], 
+                             upcoming_interviews=[], pipeline_stats=[])
+
+CANDIDATE_PAGINATOR = KeysetPaginator({
+    'created': ('c.created_at', 'created_at', 'Newest', '0001-01-01'),
+    'name': ('c.first_name', 'first_name', 'Name'),
+    'experience': ('c.total_experience', 'total_experience', 'Experience', 0),
+}, default_sort='created', default_order='desc', tiebreaker=('c.id', 'id'))
+
+# Search results default to best match first
+CANDIDATE_SEARCH_PAGINATOR = KeysetPaginator(dict({
+    'relevance': ('m.relevance', 'relevance', 'Best match'),
+}, **CANDIDATE_PAGINATOR.sort_options), default_sort='relevance', default_order='desc',
+    tiebreaker=('c.id', 'id'))
+
+def attach_application_counts(cur, candidates_list):
+    """Add application_count/selected_count to a page of candidate rows"""
+    if not candidates_list:
+        return
+    ids = [candidate['id'] for candidate in candidates_list]
+    placeholders = ','.join(['%s'] * len(ids))
+    cur.execute(f"""
+        SELECT candidate_id,
+               COUNT(*) as application_count,
+               COUNT(CASE WHEN status = 'Selected' THEN 1 END) as selected_count
+        FROM job_applications
+        WHERE candidate_id IN ({placeholders})
+        GROUP BY candidate_id
+    """, ids)
+    counts = {row['candidate_id']: row for row in cur.fetchall()}
+    for candidate in candidates_list:
+        row = counts.get(candidate['id'])
+        candidate['application_count'] = row['application_count'] if row else 0
+        candidate['selected_count'] = row['selected_count'] if row else 0
+
+def candidates():
+    """Candidates Listing"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get search parameters
+        search = request.args.get('search', '')
+        status = request.args.get('status', '')
+        source = request.args.get('source', '')
+        
+        # Build filters shared by the page and summary queries
+        filters = ""
+        params = []
+            
+        if status:
+            filters += " AND c.status = %s"
+            params.append(status)
+            
+        if source:
+            filters += " AND c.source = %s"
+            params.append(source)
+        
+        search_sql, search_params = candidate_search.filter(cur, search)
+        
+        # Ranked search pages over matching ids only; application counts are
+        # fetched for the rows on this page afterwards
+        ranked = candidate_search.ranked_source(cur, search) if search else None
+        if ranked:
+            source_sql, source_params = ranked
+            query = "SELECT c.*, m.relevance " + source_sql + " WHERE 1=1" + filters
+            page = CANDIDATE_SEARCH_PAGINATOR.fetch(cur, query, source_params + params)
+        else:
+            query = "SELECT c.* FROM candidates c WHERE 1=1" + search_sql + filters
+            page = CANDIDATE_PAGINATOR.fetch(cur, query, search_params + params)
+        candidates_list = page.items
+        attach_application_counts(cur, candidates_list)
+        
+        # Summary stats cover every matching candidate, not just this page
+        cur.execute("""
+            SELECT 
+                COUNT(*) as total,
+                COALESCE(SUM(c.status = 'Selected'), 0) as selected,
+                COALESCE(SUM(c.status = 'Interview Scheduled'), 0) as interview_scheduled,
+                COALESCE(SUM(c.status = 'Shortlisted'), 0) as shortlisted
+            FROM candidates c
+            WHERE 1=1
+        """ + search_sql + filters, search_params + params)
+        summary = cur.fetchone()
+        
+        cur.close()
+        
+        return render_template('candidates.html', 
+                             candidates=candidates_list or [],
+                             page=page,
+                             summary=summary,
+                             search=search,
+                             selected_status=status,
+                             selected_source=source)
+    
+    except Exception as e:
+        flash(f'Error loading candidates: {str(e)}', 'danger')
+        return render_template('candidates.html', candidates=[], page=None, summary=None)
+
+def candidate_typeahead():
+    """Prefix search for the candidate search box"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        results = candidate_search.typeahead(cur, request.args.get('q', '').strip(),
+                                             request.args.get('limit', type=int))
+        cur.close()
+        return jsonify({'success': True, 'results': results})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+def add_candidate():
+    """Add New Candidate or Edit Existing"""
+    edit_id = request.args.get('edit')
+    candidate = None
+    
+    # If editing, fetch the candidate
+    if edit_id:
+        try:
+            cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+            cur.execute("SELECT * FROM candidates WHERE id = %s", (edit_id,))
+            candidate = cur.fetchone()
+            cur.close()
+            
+            if not candidate:
+                flash('Candidate not found!', 'danger')
+                return redirect(url_for('recruitment.candidates'))
+        except Exception as e:
+            flash(f'Error loading candidate: {str(e)}', 'danger')
+            return redirect(url_for('recruitment.candidates'))
+    
+    if request.method == 'POST':
+        try:
+            cur = mysql.connection.cursor()
+            
+            if edit_id:
+                # Update existing candidate
+                cur.execute("""
+                    UPDATE candidates SET 
+                        first_name = %s, last_name = %s, email = %s, phone = %s,
+                        current_company = %s, current_position = %s, current_salary = %s, 
+                        expected_salary = %s, total_experience = %s, skills = %s, 
+                        source = %s, notes = %s
+                    WHERE id = %s
+                """, (
+                    request.form['first_name'],
+                    request.form['last_name'], 
+                    request.form['email'],
+                    request.form['phone'],
+                    request.form.get('current_company'),
+                    request.form.get('current_position'),
+                    float(request.form['current_salary']) if request.form.get('current_salary') else None,
+                    float(request.form['expected_salary']) if request.form.get('expected_salary') else None,
+                    float(request.form['total_experience']) if request.form.get('total_experience') else None,
+                    request.form.get('skills'),
+                    request.form['source'],
+                    request.form.get('notes'),
+                    edit_id
+                ))
+                saved_candidate_id = edit_id
+                flash('Candidate updated successfully!', 'success')
+            else:
+                # Generate candidate ID
+                candidate_id = sequences.next_code('candidate')
+                
+                # Insert candidate
+                cur.execute("""
+                    INSERT INTO candidates (candidate_id, first_name, last_name, email, phone, 
+                                          current_company, current_position, current_salary, expected_salary,
+                                          total_experience, skills, source, notes)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    candidate_id,
+                    request.form['first_name'],
+                    request.form['last_name'], 
+                    request.form['email'],
+                    request.form['phone'],
+                    request.form.get('current_company'),
+                    request.form.get('current_position'),
+                    float(request.form['current_salary']) if request.form.get('current_salary') else None,
+                    float(request.form['expected_salary']) if request.form.get('expected_salary') else None,
+                    float(request.form['total_experience']) if request.form.get('total_experience') else None,
+                    request.form.get('skills'),
+                    request.form['source'],
+                    request.form.get('notes')
+                ))
+                saved_candidate_id = cur.lastrowid
+                flash('Candidate added successfully!', 'success')
+            
+            mysql.connection.commit()
+            cur.close()
+            skill_matcher.update_candidate(saved_candidate_id, request.form.get('skills'))
+            
+            return redirect(url_for('recruitment.candidates'))
+            
+        except Exception as e:
+            mysql.connection.rollback()
+            flash(f'Error {"updating" if edit_id else "adding"} candidate: {str(e)}', 'danger')
+    
+    return render_template('candidate_form.html', candidate=candidate)
+
+def job_positions():
+    """Job Positions Listing"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get search parameters
+        search = request.args.get('search', '')
+        department = request.args.get('department', '')
+        status = request.args.get('status', '')
+        
+        # Build query
+        query = """
+            SELECT jp.*, COALESCE(d.name, 'No Department') as department_name,
+                   COUNT(ja.id) as application_count,
+                   COUNT(CASE WHEN ja.status = 'Selected' THEN 1 END) as selected_count
+            FROM job_positions jp
+            LEFT JOIN departments d ON jp.department_id = d.id
+            LEFT JOIN job_applications ja ON jp.id = ja.job_position_id
+            WHERE 1=1
+        """
+        params = []
+        
+        if search:
+            query += " AND (jp.position_title LIKE %s OR jp.job_description LIKE %s)"
+            params.extend([f'%{search}%', f'%{search}%'])
+            
+        if department:
+            query += " AND jp.department_id = %s"
+            params.append(department)
+            
+        if status:
+            query += " AND jp.status = %s"
+            params.append(status)
+            
+        query += " GROUP BY jp.id ORDER BY jp.created_at DESC"
+        
+        cur.execute(query, params)
+        positions = cur.fetchall()
+        
+        # Get departments for filter
+        departments = reference_cache.get(cur, 'departments', as_dicts=True)
+        
+        cur.close()
+        
+        return render_template('job_positions.html', 
+                             positions=positions or [],
+                             departments=departments or [],
+                             search=search,
+                             selected_department=department,
+                             selected_status=status)
+    
+    except Exception as e:
+        flash(f'Error loading job positions: {str(e)}', 'danger')
+        return render_template('job_positions.html', positions=[], departments=[])
+
+def job_position_matches(position_id):
+    """Top candidates for a position, ranked by required-skill coverage"""
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("SELECT id, position_title, required_skills FROM job_positions WHERE id = %s", (position_id,))
+        position = cur.fetchone()
+        if not position:
+            cur.close()
+            return jsonify({'success': False, 'message': 'Job position not found'}), 404
+        
+        required, ranked = skill_matcher.matches(cur, position[2], request.args.get('limit', type=int))
+        cur.close()
+        
+        # Profile details for the ranked candidates only
+        details = {}
+        if ranked:
+            ids = [match['candidate_id'] for match in ranked]
+            placeholders = ','.join(['%s'] * len(ids))
+            dict_cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+            dict_cur.execute(f"""
+                SELECT id, candidate_id, first_name, last_name, email, status,
+                       current_position, total_experience
+                FROM candidates WHERE id IN ({placeholders})
+            """, ids)
+            details = {row['id']: row for row in dict_cur.fetchall()}
+            dict_cur.close()
+        
+        matches = []
+        for match in ranked:
+            candidate = details.get(match['candidate_id'])
+            if not candidate:
+                continue
+            matches.append({
+                'id': candidate['id'],
+                'candidate_id': candidate['candidate_id'],
+                'name': f"{candidate['first_name']} {candidate['last_name']}",
+                'email': candidate['email'],
+                'status': candidate['status'],
+                'current_position': candidate['current_position'],
+                'total_experience': float(candidate['total_experience']) if candidate['total_experience'] is not None else None,
+                'score': match['score'],
+                'matched_skills': match['matched_skills'],
+                'missing_skills': match['missing_skills'],
+            })
+        
+        return jsonify({
+            'success': True,
+            'position': {'id': position[0], 'title': position[1]},
+            'required_skills': list(required),
+            'matches': matches
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+def add_job_position():
+    """Add New Job Position"""
+    if request.method == 'POST':
+        try:
+            cur = mysql.connection.cursor()
+            
+            cur.execute("""
+                INSERT INTO job_positions (position_title, department_id, job_description, required_skills,
+                                         experience_level, employment_type, salary_min, salary_max, location,
+                                         posted_date, closing_date, created_by)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                request.form['position_title'],
+                request.form['department_id'] if request.form['department_id'] else None,
+                request.form['job_description'],
+                request.form['required_skills'],
+                request.form['experience_level'],
+                request.form['employment_type'],
+                float(request.form['salary_min']) if request.form['salary_min'] else None,
+                float(request.form['salary_max']) if request.form['salary_max'] else None,
+                request.form['location'],
+                request.form['posted_date'],
+                request.form['closing_date'] if request.form['closing_date'] else None,
+                'admin'  # Replace with actual user session
+            ))
+            
+            mysql.connection.commit()
+            cur.close()
+            
+            flash('Job position created successfully!', 'success')
+            return redirect(url_for('recruitment.job_positions'))
+            
+        except Exception as e:
+            mysql.connection.rollback()
+            flash(f'Error creating job position: {str(e)}', 'danger')
+    
+    # GET request - show form
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        departments = reference_cache.get(cur, 'departments', as_dicts=True)
+        cur.close()
+        
+        return render_template('job_position_form.html', departments=departments or [], position=None)
+    
+    except Exception as e:
+        flash(f'Error loading form: {str(e)}', 'danger')
+        return render_template('job_position_form.html', departments=[], position=None)
+
+INTERVIEW_PAGINATOR = KeysetPaginator({
+    'scheduled': ('TIMESTAMP(i.scheduled_date, i.scheduled_time)', 'scheduled_at', 'Scheduled', '0001-01-01 00:00:00'),
+    'candidate': ('c.first_name', 'first_name', 'Candidate'),
+    'position': ('jp.position_title', 'position_title', 'Position'),
+}, default_sort='scheduled', default_order='desc', tiebreaker=('i.id', 'id'))
+
+def interviews():
+    """Interviews Listing"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get filter parameters
+        status = request.args.get('status', '')
+        date_from = request.args.get('date_from', '')
+        date_to = request.args.get('date_to', '')
+        
+        # Build filters shared by the page and summary queries
+        filters = ""
+        params = []
+        
+        if status:
+            filters += " AND i.status = %s"
+            params.append(status)
+            
+        if date_from:
+            filters += " AND i.scheduled_date >= %s"
+            params.append(date_from)
+            
+        if date_to:
+            filters += " AND i.scheduled_date <= %s"
+            params.append(date_to)
+        
+        query = """
+            SELECT i.*, c.first_name, c.last_name, c.email, jp.position_title,
+                   it.type_name, COALESCE(d.name, 'No Department') as department_name,
+                   DATE(i.scheduled_date) as interview_date,
+                   TIME(i.scheduled_time) as interview_time,
+                   TIMESTAMP(i.scheduled_date, i.scheduled_time) as scheduled_at
+            FROM interviews i
+            JOIN job_applications ja ON i.application_id = ja.id
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            LEFT JOIN departments d ON jp.department_id = d.id
+            JOIN interview_types it ON i.interview_type_id = it.id
+            WHERE 1=1
+        """ + filters
+        
+        page = INTERVIEW_PAGINATOR.fetch(cur, query, params)
+        interviews_list = page.items
+        
+        # Quick stats cover every matching interview, not just this page
+        cur.execute("""
+            SELECT 
+                COUNT(*) as total,
+                COALESCE(SUM(i.status = 'Scheduled'), 0) as scheduled,
+                COALESCE(SUM(i.status = 'Completed'), 0) as completed,
+                COALESCE(SUM(i.recommendation IN ('Strong Hire', 'Hire')), 0) as positive
+            FROM interviews i
+            WHERE 1=1
+        """ + filters, params)
+        summary = cur.fetchone()
+        
+        cur.close()
+        
+        return render_template('interviews.html', 
+                             interviews=interviews_list or [],
+                             page=page,
+                             summary=summary,
+                             selected_status=status,
+                             date_from=date_from,
+                             date_to=date_to)
+    
+    except Exception as e:
+        flash(f'Error loading interviews: {str(e)}', 'danger')
+        return render_template('interviews.html', interviews=[], page=None, summary=None)
+
+def schedule_interview(interview_id=None):
+    """Schedule or Edit Interview"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        if request.method == 'POST':
+            action = request.form.get('action')
+            
+            if action == 'delete' and interview_id:
+                # Delete interview
+                cur.execute("DELETE FROM interviews WHERE id = %s", (interview_id,))
+                mysql.connection.commit()
+                flash('Interview deleted successfully!', 'success')
+                return redirect(url_for('recruitment.interviews'))
+            
+            elif action == 'schedule':
+                # Get form data
+                application_id = request.form.get('application_id')
+                interview_type_id = request.form.get('interview_type_id')
+                interview_round = request.form.get('interview_round')
+                scheduled_date = request.form.get('scheduled_date')
+                scheduled_time = request.form.get('scheduled_time')
+                duration_minutes = request.form.get('duration_minutes')
+                interview_mode = request.form.get('interview_mode')
+                meeting_room = request.form.get('meeting_room')
+                meeting_link = request.form.get('meeting_link')
+                interviewer_notes = request.form.get('interviewer_notes')
+                
+                if interview_id:
+                    # Update existing interview; the form's notes replace any autosaved text
+                    saved_at = notes_autosave.discard(interview_id)
+                    query = """
+                        UPDATE interviews SET
+                        application_id = %s, interview_type_id = %s, interview_round = %s,
+                        scheduled_date = %s, scheduled_time = %s, duration_minutes = %s,
+                        interview_mode = %s, meeting_room = %s, meeting_link = %s,
+                        interviewer_notes = %s, notes_saved_at = %s, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = %s
+                    """
+                    params = (application_id, interview_type_id, interview_round,
+                             scheduled_date, scheduled_time, duration_minutes,
+                             interview_mode, meeting_room, meeting_link,
+                             interviewer_notes, saved_at, interview_id)
+                    
+                    cur.execute(query, params)
+                    flash('Interview updated successfully!', 'success')
+                else:
+                    # Create new interview - generate unique interview code
+                    interview_code = get_unique_interview_code()
+                    
+                    query = """
+                        INSERT INTO interviews (
+                            interview_code, application_id, interview_type_id, interview_round,
+                            scheduled_date, scheduled_time, duration_minutes,
+                            interview_mode, meeting_room, meeting_link,
+                            interviewer_notes, status, created_at
+                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'Scheduled', CURRENT_TIMESTAMP)
+                    """
+                    params = (interview_code, application_id, interview_type_id, interview_round,
+                             scheduled_date, scheduled_time, duration_minutes,
+                             interview_mode, meeting_room, meeting_link,
+                             interviewer_notes)
+                    
+                    cur.execute(query, params)
+                    flash('Interview scheduled successfully!', 'success')
+                
+                mysql.connection.commit()
+                return redirect(url_for('recruitment.interviews'))
+        
+        # GET request - load form
+        interview = None
+        if interview_id:
+            cur.execute("SELECT * FROM interviews WHERE id = %s", (interview_id,))
+            interview = cur.fetchone()
+            if not interview:
+                flash('Interview not found!', 'error')
+                return redirect(url_for('recruitment.interviews'))
+        
+        # Load job applications with candidate and position details
+        cur.execute("""
+            SELECT ja.id, 
+                   CONCAT(c.first_name, ' ', c.last_name) as candidate_name,
+                   c.email as candidate_email,
+                   jp.position_title,
+                   COALESCE(d.name, 'No Department') as department_name
+            FROM job_applications ja
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            LEFT JOIN departments d ON jp.department_id = d.id
+            WHERE ja.status IN ('Applied', 'Under Review', 'Interview Scheduled')
+            ORDER BY ja.application_date DESC
+        """)
+        applications = cur.fetchall()
+        
+        # Load interview types
+        interview_types = reference_cache.get(cur, 'interview_types', as_dicts=True)
+        
+        cur.close()
+        
+        return render_template('interview_form.html',
+                             interview=interview,
+                             applications=applications,
+                             interview_types=interview_types)
+    
+    except Exception as e:
+        flash(f'Error loading interview form: {str(e)}', 'danger')
+        return redirect(url_for('recruitment.interviews'))
+
+APPLICATION_PAGINATOR = KeysetPaginator({
+    'applied': ('ja.application_date', 'application_date', 'Application Date'),
+    'candidate': ('c.first_name', 'first_name', 'Candidate'),
+    'position': ('jp.position_title', 'position_title', 'Position'),
+    'score': ('ja.screening_score', 'screening_score', 'Screening Score', 0),
+}, default_sort='applied', default_order='desc', tiebreaker=('ja.id', 'id'))
+
+def applications():
+    """Job Applications Listing"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get filter parameters
+        status = request.args.get('status', '')
+        position = request.args.get('position', '')
+        date_from = request.args.get('date_from', '')
+        
+        # Build filters shared by the page and summary queries
+        filters = ""
+        params = []
+        
+        if status:
+            filters += " AND ja.status = %s"
+            params.append(status)
+            
+        if position:
+            filters += " AND ja.job_position_id = %s"
+            params.append(position)
+            
+        if date_from:
+            filters += " AND ja.application_date >= %s"
+            params.append(date_from)
+        
+        query = """
+            SELECT ja.*, 
+                   c.first_name, c.last_name, c.email, c.phone, c.current_company, 
+                   c.total_experience, c.skills, c.resume_path,
+                   jp.position_title, 
+                   COALESCE(d.name, 'No Department') as department_name
+            FROM job_applications ja
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            LEFT JOIN departments d ON jp.department_id = d.id
+            WHERE 1=1
+        """ + filters
+        
+        page = APPLICATION_PAGINATOR.fetch(cur, query, params)
+        applications_list = page.items
+        
+        # Quick stats cover every matching application, not just this page
+        cur.execute("""
+            SELECT 
+                COUNT(*) as total,
+                COALESCE(SUM(ja.status = 'Under Review'), 0) as under_review,
+                COALESCE(SUM(ja.status = 'Interview Scheduled'), 0) as interview_scheduled,
+                COALESCE(SUM(ja.status IN ('Offer Extended', 'Hired')), 0) as positive
+            FROM job_applications ja
+            WHERE 1=1
+        """ + filters, params)
+        summary = cur.fetchone()
+        
+        # Get all positions for filter dropdown
+        cur.execute("SELECT id, position_title FROM job_positions WHERE status = 'Open' ORDER BY position_title")
+        positions = cur.fetchall()
+        
+        cur.close()
+        
+        return render_template('applications.html',
+                             applications=applications_list or [],
+                             page=page,
+                             summary=summary,
+                             positions=positions or [],
+                             selected_status=status,
+                             selected_position=position,
+                             date_from=date_from)
+    
+    except Exception as e:
+        flash(f'Error loading applications: {str(e)}', 'danger')
+        return render_template('applications.html', applications=[], positions=[], page=None, summary=None)
+
+def update_application_status():
+    """Update Job Application Status via AJAX"""
+    try:
+        application_id = request.form.get('application_id')
+        new_status = request.form.get('status')
+        
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            UPDATE job_applications 
+            SET status = %s, updated_at = CURRENT_TIMESTAMP 
+            WHERE id = %s
+        """, (new_status, application_id))
+        mysql.connection.commit()
+        cur.close()
+        
+        return jsonify({'success': True, 'message': 'Status updated successfully'})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+def recruitment_reports():
+    """Recruitment Analytics and Reports"""
+    try:
+        period_days = request.args.get('days', type=int)
+        
+        # Applications changed since the last refresh are folded in by a background job
+        if recruitment_analytics.refresh_due():
+            try:
+                job_runner.enqueue(mysql.connection, 'recruitment_analytics_refresh', {})
+            except Exception as e:
+                print(f"Error scheduling recruitment analytics refresh: {e}")
+        
+        analytics_cur = mysql.connection.cursor()
+        report = recruitment_analytics.report(analytics_cur, period_days)
+        top_positions = recruitment_analytics.top_positions(analytics_cur, period_days)
+        recent_activities = recruitment_analytics.recent_activity(analytics_cur)
+        analytics_cur.close()
+        
+        return render_template('recruitment_reports.html',
+                             total_applications=report['total_applications'],
+                             applications_under_review=report['screened'],
+                             interviews_scheduled=report['interviewed'],
+                             offers_extended=report['offered'],
+                             hires_made=report['hired'],
+                             conversion_rate=report['conversion_rate'],
+                             interview_success_rate=report['interview_success_rate'],
+                             offer_acceptance_rate=report['offer_acceptance_rate'],
+                             average_time_to_hire=report['time_to_hire']['average'],
+                             time_to_hire=report['time_to_hire'],
+                             funnel=report['funnel'],
+                             period_days=period_days,
+                             top_positions=top_positions,
+                             recent_activities=recent_activities)
+    
+    except Exception as e:
+        flash(f'Error loading reports: {str(e)}', 'danger')
+        return render_template('recruitment_reports.html',
+                             total_applications=0,
+                             applications_under_review=0,
+                             interviews_scheduled=0,
+                             offers_extended=0,
+                             hires_made=0,
+                             conversion_rate=0,
+                             interview_success_rate=0,
+                             offer_acceptance_rate=0,
+                             average_time_to_hire=0,
+                             time_to_hire=None,
+                             funnel=[],
+                             period_days=None,
+                             top_positions=[],
+                             recent_activities=[])
+
+def offers():
+    """Job Offers Management"""
+    return render_template('offers.html', title='Job Offers')
+
+def video_interview(interview_id):
+    """Video Interview Room"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get interview details
+        cur.execute("""
+            SELECT i.*, 
+                   CONCAT(c.first_name, ' ', c.last_name) as candidate_name,
+                   c.email as candidate_email,
+                   jp.position_title,
+                   it.type_name as interview_type,
+                   DATE(i.scheduled_date) as interview_date,
+                   TIME(i.scheduled_time) as interview_time
+            FROM interviews i
+            JOIN job_applications ja ON i.application_id = ja.id
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            JOIN interview_types it ON i.interview_type_id = it.id
+            WHERE i.id = %s
+        """, (interview_id,))
+        
+        interview = cur.fetchone()
+        if not interview:
+            flash('Interview not found!', 'error')
+            return redirect(url_for('recruitment.interviews'))
+        
+        # Show notes still waiting in the autosave buffer
+        interview['interviewer_notes'] = notes_autosave.pending(interview_id, interview['interviewer_notes'])
+        
+        # Generate meeting ID and URL
+        import uuid
+        meeting_id = f"interview-{interview_id}-{str(uuid.uuid4())[:8]}"
+        meeting_url = f"https://meet.jit.si/{meeting_id}"
+        
+        # Update meeting link in database
+        cur.execute("""
+            UPDATE interviews 
+            SET meeting_link = %s, status = 'In Progress' 
+            WHERE id = %s
+        """, (meeting_url, interview_id))
+        mysql.connection.commit()
+        
+        cur.close()
+        
+        return render_template('video_interview.html',
+                             interview=interview,
+                             meeting_id=meeting_id,
+                             meeting_url=meeting_url)
+    
+    except Exception as e:
+        flash(f'Error loading video interview: {str(e)}', 'danger')
+        return redirect(url_for('recruitment.interviews'))
+
+def update_interview_status(interview_id):
+    """Update Interview Status via AJAX"""
+    try:
+        status = request.form.get('status')
+        
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            UPDATE interviews 
+            SET status = %s, updated_at = CURRENT_TIMESTAMP 
+            WHERE id = %s
+        """, (status, interview_id))
+        mysql.connection.commit()
+        cur.close()
+        
+        return jsonify({'success': True})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+def update_interview_notes(interview_id):
+    """Update Interview Notes and Feedback"""
+    try:
+        notes = request.form.get('notes', '')
+        overall_score = request.form.get('overall_score')
+        recommendation = request.form.get('recommendation')
+        
+        # Convert empty string to None for decimal fields
+        if overall_score == '' or overall_score is None:
+            overall_score = None
+        else:
+            try:
+                overall_score = float(overall_score)
+            except (ValueError, TypeError):
+                overall_score = None
+        
+        # Handle recommendation field
+        if recommendation == '' or recommendation is None:
+            recommendation = None
+        
+        # These notes supersede anything still waiting in the autosave buffer
+        saved_at = notes_autosave.discard(interview_id)
+        
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            UPDATE interviews 
+            SET interviewer_notes = %s, notes_saved_at = %s, overall_score = %s, recommendation = %s,
+                status = 'Completed', updated_at = CURRENT_TIMESTAMP 
+            WHERE id = %s
+        """, (notes, saved_at, overall_score, recommendation, interview_id))
+        mysql.connection.commit()
+        cur.close()
+        
+        flash('Interview notes saved successfully!', 'success')
+        return redirect(url_for('recruitment.interviews'))
+    
+    except Exception as e:
+        flash(f'Error saving notes: {str(e)}', 'danger')
+        return redirect(url_for('recruitment.video_interview', interview_id=interview_id))
+
+def auto_save_notes(interview_id):
+    """Auto-save Interview Notes via AJAX"""
+    try:
+        notes = request.form.get('notes')
+        
+        # Buffered; the latest text per interview is written on the next flush
+        notes_autosave.buffer(interview_id, notes)
+        
+        return jsonify({'success': True})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+# Route aliases for compatibility
+def add_candidate_alias():
+    """Redirect to candidates/add"""
+    return redirect(url_for('recruitment.add_candidate'))
+
+def add_job_position_alias():
+    """Redirect to job_positions/add"""
+    return redirect(url_for('recruitment.add_job_position'))
+
+# Interview action routes
+def start_interview(interview_id):
+    """Start Interview - Redirect to Video Interview"""
+    return redirect(url_for('recruitment.video_interview', interview_id=interview_id))
+
+def reschedule_interview(interview_id):
+    """Reschedule Interview"""
+    # Redirect to interview form for editing
+    return redirect(url_for('recruitment.interviews') + f'?edit={interview_id}')
+
+def cancel_interview(interview_id):
+    """Cancel Interview"""
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            UPDATE interviews 
+            SET status = 'Cancelled', updated_at = CURRENT_TIMESTAMP 
+            WHERE id = %s
+        """, (interview_id,))
+        mysql.connection.commit()
+        cur.close()
+        
+        flash('Interview cancelled successfully!', 'success')
+        return jsonify({'success': True})
+    
+    except Exception as e:
+        flash(f'Error cancelling interview: {str(e)}', 'danger')
+        return jsonify({'success': False, 'message': str(e)})
+
+def complete_interview(interview_id):
+    """Complete Interview"""
+    try:
+        notes_autosave.flush(interview_id)
+        
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            UPDATE interviews 
+            SET status = 'Completed', updated_at = CURRENT_TIMESTAMP 
+            WHERE id = %s
+        """, (interview_id,))
+        mysql.connection.commit()
+        cur.close()
+        
+        flash('Interview marked as completed!', 'success')
+        return jsonify({'success': True})
+    
+    except Exception as e:
+        flash(f'Error completing interview: {str(e)}', 'danger')
+        return jsonify({'success': False, 'message': str(e)})
+
+def view_feedback(interview_id):
+    """View Interview Feedback"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT i.*, c.first_name, c.last_name, jp.position_title,
+                   it.type_name as interview_type
+            FROM interviews i
+            JOIN job_applications ja ON i.application_id = ja.id
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            JOIN interview_types it ON i.interview_type_id = it.id
+            WHERE i.id = %s
+        """, (interview_id,))
+        interview = cur.fetchone()
+        cur.close()
+        
+        if not interview:
+            flash('Interview not found!', 'danger')
+            return redirect(url_for('recruitment.interviews'))
+        
+        return render_template('interview_feedback.html', interview=interview)
+    
+    except Exception as e:
+        flash(f'Error loading interview feedback: {str(e)}', 'danger')
+        return redirect(url_for('recruitment.interviews'))
+
+def download_report(interview_id):
+    """Download Interview Report"""
+    flash('Interview report download feature coming soon!', 'info')
+    return redirect(url_for('recruitment.interviews'))
+
+def view_details(interview_id):
+    """View Interview Details"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT i.*, c.first_name, c.last_name, c.email, c.phone,
+                   jp.position_title, jp.job_description,
+                   it.type_name as interview_type,
+                   COALESCE(d.name, 'No Department') as department_name
+            FROM interviews i
+            JOIN job_applications ja ON i.application_id = ja.id
+            JOIN candidates c ON ja.candidate_id = c.id
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            JOIN interview_types it ON i.interview_type_id = it.id
+            LEFT JOIN departments d ON jp.department_id = d.id
+            WHERE i.id = %s
+        """, (interview_id,))
+        interview = cur.fetchone()
+        cur.close()
+        
+        if not interview:
+            flash('Interview not found!', 'danger')
+            return redirect(url_for('recruitment.interviews'))
+        
+        return render_template('interview_details.html', interview=interview)
+    
+    except Exception as e:
+        flash(f'Error loading interview details: {str(e)}', 'danger')
+        return redirect(url_for('recruitment.interviews'))
+
+# Application action routes
+def update_status(application_id, status):
+    """Update Application Status"""
+    try:
+        cur = mysql.connection.cursor()
+        cur.execute("""
+            UPDATE job_applications 
+            SET status = %s, updated_at = CURRENT_TIMESTAMP 
+            WHERE id = %s
+        """, (status, application_id))
+        mysql.connection.commit()
+        cur.close()
+        
+        return jsonify({'success': True, 'message': f'Status updated to {status}'})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+def download_resume(application_id):
+    """Download Candidate Resume"""
+    flash('Resume download feature coming soon!', 'info')
+    return redirect(url_for('recruitment.applications'))
+
+def send_message(application_id):
+    """Send Message to Candidate"""
+    flash('Messaging feature coming soon!', 'info')
+    return redirect(url_for('recruitment.applications'))
+
+def view_profile(candidate_id):
+    """View Candidate Profile"""
+    try:
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cur.execute("""
+            SELECT c.*, 
+                   COUNT(ja.id) as total_applications,
+                   COUNT(CASE WHEN ja.status = 'Selected' THEN 1 END) as successful_applications
+            FROM candidates c
+            LEFT JOIN job_applications ja ON c.id = ja.candidate_id
+            WHERE c.id = %s
+            GROUP BY c.id
+        """, (candidate_id,))
+        candidate = cur.fetchone()
+        
+        # Get candidate's application history
+        cur.execute("""
+            SELECT ja.*, jp.position_title, jp.department_id,
+                   COALESCE(d.name, 'No Department') as department_name
+            FROM job_applications ja
+            JOIN job_positions jp ON ja.job_position_id = jp.id
+            LEFT JOIN departments d ON jp.department_id = d.id
+            WHERE ja.candidate_id = %s
+            ORDER BY ja.application_date DESC
+        """, (candidate_id,))
+        applications = cur.fetchall()
+        
+        cur.close()
+        
+        if not candidate:
+            flash('Candidate not found!', 'danger')
+            return redirect(url_for('recruitment.candidates'))
+        
+        return render_template('candidate_profile.html', candidate=candidate, applications=applications)
+    
+    except Exception as e:
+        flash(f'Error loading candidate profile: {str(e)}', 'danger')
+        return redirect(url_for('recruitment.candidates'))
+
+def candidate_action():
+    """Handle candidate actions via AJAX"""
+    try:
+        data = request.get_json()
+        action = data.get('action')
+        candidate_id = data.get('candidate_id')
+        
+        if not action or not candidate_id:
+            return jsonify({'success': False, 'message': 'Missing required parameters'})
+        
+        cur = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        
+        if action == 'update_status':
+            status = data.get('status')
+            if not status:
+                return jsonify({'success': False, 'message': 'Status is required'})
+            
+            cur.execute("UPDATE candidates SET status = %s WHERE id = %s", (status, candidate_id))
+            mysql.connection.commit()
+            
+            return jsonify({'success': True, 'message': 'Status updated successfully'})
+        
+        elif action == 'send_message':
+            message = data.get('message')
+            if not message:
+                return jsonify({'success': False, 'message': 'Message is required'})
+            
+            # Here you would typically integrate with an email service or messaging system
+            # For now, we'll just log the action and return success
+            print(f"Message to candidate {candidate_id}: {message}")
+            
+            return jsonify({'success': True, 'message': 'Message sent successfully'})
+        
+        elif action == 'delete':
+            # Check if candidate has any applications and show warning
+            cur.execute("SELECT COUNT(*) as app_count FROM job_applications WHERE candidate_id = %s", (candidate_id,))
+            app_count = cur.fetchone()['app_count']
+            
+            # Check if candidate has any interviews through applications
+            cur.execute("""
+                SELECT COUNT(*) as interview_count 
+                FROM interviews i 
+                JOIN job_applications ja ON i.application_id = ja.id 
+                WHERE ja.candidate_id = %s
+            """, (candidate_id,))
+            interview_count = cur.fetchone()['interview_count']
+            
+            # Get candidate name for the confirmation message
+            cur.execute("SELECT first_name, last_name FROM candidates WHERE id = %s", (candidate_id,))
+            candidate_info = cur.fetchone()
+            
+            if not candidate_info:
+                return jsonify({'success': False, 'message': 'Candidate not found'})
+            
+            candidate_name = f"{candidate_info['first_name']} {candidate_info['last_name']}"
+            
+            # Days whose recruitment aggregates include this candidate's applications
+            analytics_cur = mysql.connection.cursor()
+            application_days = recruitment_analytics.application_days(analytics_cur, candidate_id)
+            analytics_cur.close()
+            
+            # Delete the candidate (CASCADE will handle related records)
+            cur.execute("DELETE FROM candidates WHERE id = %s", (candidate_id,))
+            mysql.connection.commit()
+            skill_matcher.remove_candidate(candidate_id)
+            
+            try:
+                recruitment_analytics.refresh_days(application_days)
+            except Exception as e:
+                print(f"Error refreshing recruitment analytics: {e}")
+            
+            # Prepare success message with details
+            message = f'Candidate "{candidate_name}" deleted successfully'
+            if app_count > 0 or interview_count > 0:
+                details = []
+                if app_count > 0:
+                    details.append(f"{app_count} application(s)")
+                if interview_count > 0:
+                    details.append(f"{interview_count} interview(s)")
+                message += f" (along with {" and ".join(details)})"
+            
+            return jsonify({'success': True, 'message': message})
+        
+        else:
+            return jsonify({'success': False, 'message': 'Invalid action'})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'})
+    
+    finally:
+        if 'cur' in locals():
+            cur.close()
@@ -0,0 +1,175 @@
+"""
+Candidate Search for Lumorange Management System
+FULLTEXT-backed ranked search and typeahead over candidate profiles
+
+Usage: python candidate_search.py --create-index
+"""
+
+import re
+import sys
+
+SEARCH_INDEX_NAME = 'ft_candidates_search'
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email', 'current_company', 'skills', 'notes')
+
+CREATE_SEARCH_INDEX = (f"ALTER TABLE candidates ADD FULLTEXT INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} "
+                       f"({', '.join(SEARCH_COLUMNS)})")
+
+# InnoDB defaults: innodb_ft_min_token_size and the built-in stopword list.
+# Required (+) terms the index never stores would make every search empty.
+MIN_TOKEN_SIZE = 3
+STOPWORDS = frozenset("""
+    a about an are as at be by com de en for from how i in is it la of on or that
+    the this to was what when where who will with und www
+""".split())
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(alias='c'):
+    """MATCH(...) over the indexed columns, with an optional table alias"""
+    prefix = f"{alias}." if alias else ''
+    return f"MATCH({', '.join(prefix + column for column in SEARCH_COLUMNS)})"
+
+
+def boolean_query(text, prefix_all=False):
+    """Turn user input into a BOOLEAN MODE query, or None if nothing is searchable
+
+    Every word is required. The last word is always a prefix so results
+    follow the user's typing; with `prefix_all` every word is, for typeahead.
+    Operators in the input are dropped rather than interpreted.
+    """
+    words = [word.lower() for word in _TOKEN.findall(text or '')]
+    words = [word for word in words if len(word) >= MIN_TOKEN_SIZE and word not in STOPWORDS]
+    if not words:
+        return None
+    terms = [f"+{word}*" if prefix_all or i == len(words) - 1 else f"+{word}"
+             for i, word in enumerate(words)]
+    return ' '.join(terms)
+
+
+class CandidateSearch:
+    """Ranked candidate search on a FULLTEXT index over names, email, company, skills and notes
+
+    The index is maintained by InnoDB on every insert and update, so nothing
+    has to be rebuilt by the application. It is created with
+    `python candidate_search.py --create-index` (building it on a large
+    table takes a while, so requests never do it); until it exists, search
+    falls back to the old LIKE matching.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.typeahead_limit = 10
+        self._index_ready = None
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('CANDIDATE_TYPEAHEAD_LIMIT', 10)
+        self.mysql = mysql
+        self.typeahead_limit = app.config['CANDIDATE_TYPEAHEAD_LIMIT']
+        app.extensions['candidate_search'] = self
+
+    def index_ready(self, cur):
+        """Whether the FULLTEXT index exists; checked once per process once found"""
+        if not self._index_ready:
+            cur.execute("""
+                SELECT COUNT(*) as count FROM information_schema.STATISTICS
+                WHERE table_schema = DATABASE() AND table_name = 'candidates' AND index_name = %s
+            """, (SEARCH_INDEX_NAME,))
+            row = cur.fetchone()
+            count = row['count'] if isinstance(row, dict) else row[0]
+            self._index_ready = count > 0
+        return self._index_ready
+
+    def filter(self, cur, text):
+        """(sql, params) restricting `candidates c` to matches, to append after WHERE 1=1"""
+        if not text:
+            return '', []
+        query = boolean_query(text)
+        if query and self.index_ready(cur):
+            return f" AND {match_expression()} AGAINST (%s IN BOOLEAN MODE)", [query]
+        pattern = f'%{text}%'
+        return (" AND (c.first_name LIKE %s OR c.last_name LIKE %s OR c.email LIKE %s "
+                "OR c.current_company LIKE %s)", [pattern] * 4)
+
+    def ranked_source(self, cur, text):
+        """FROM clause yielding matching candidates `c` with a `m.relevance` score
+
+        Returns (sql, params), or None when the text can't be served from the
+        index. Only ids and scores are ranked, so sorting stays cheap however
+        wide the candidate rows are.
+        """
+        query = boolean_query(text)
+        if not query or not self.index_ready(cur):
+            return None
+        match = match_expression(alias='')
+        return (f"""
+            FROM (
+                SELECT id, {match} AGAINST (%s IN BOOLEAN MODE) as relevance
+                FROM candidates
+                WHERE {match} AGAINST (%s IN BOOLEAN MODE)
+            ) m
+            JOIN candidates c ON c.id = m.id
+        """, [query, query])
+
+    def typeahead(self, cur, text, limit=None):
+        """Best prefix matches for a search box; a list of small dicts"""
+        limit = max(1, min(int(limit or self.typeahead_limit), 50))
+        query = boolean_query(text, prefix_all=True)
+        if not query or not self.index_ready(cur):
+            if not text or len(text) < 2:
+                return []
+            # Without the index, stay on the indexed/left-anchored columns
+            pattern = f'{text}%'
+            cur.execute("""
+                SELECT id, candidate_id, first_name, last_name, email, current_company
+                FROM candidates
+                WHERE first_name LIKE %s OR last_name LIKE %s OR email LIKE %s
+                ORDER BY first_name, last_name
+                LIMIT %s
+            """, (pattern, pattern, pattern, limit))
+        else:
+            match = match_expression(alias='')
+            cur.execute(f"""
+                SELECT id, candidate_id, first_name, last_name, email, current_company
+                FROM candidates
+                WHERE {match} AGAINST (%s IN BOOLEAN MODE)
+                ORDER BY {match} AGAINST (%s IN BOOLEAN MODE) DESC, id DESC
+                LIMIT %s
+            """, (query, query, limit))
+        columns = ('id', 'candidate_id', 'first_name', 'last_name', 'email', 'current_company')
+        results = []
+        for row in cur.fetchall():
+            row = row if isinstance(row, dict) else dict(zip(columns, row))
+            results.append({
+                'id': row['id'],
+                'candidate_id': row['candidate_id'],
+                'name': f"{row['first_name']} {row['last_name']}",
+                'email': row['email'],
+                'current_company': row['current_company'],
+            })
+        return results
+
+
+def main():
+    import MySQLdb
+
+    if sys.argv[1:] != ['--create-index']:
+        print(__doc__.strip().splitlines()[-1])
+        return 2
+
+    db = MySQLdb.connect(host='localhost', user='root', passwd='gmkr', db='lumorange_db')
+    cur = db.cursor()
+    try:
+        print(f"🔧 Creating FULLTEXT index {SEARCH_INDEX_NAME} on candidates...")
+        cur.execute(CREATE_SEARCH_INDEX)
+        print("✅ Candidate search index ready")
+        return 0
+    finally:
+        cur.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Response Compression for Lumorange Management System
+gzip / brotli encoding of HTML, CSV and JSON responses, streamed exports, and cached static assets
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+import zlib
+
+from flask import request
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+class _CompressedStream:
+    """Compresses a streamed body as it is iterated
+
+    A class rather than a generator so that `close()` reaches the wrapped
+    body even when the client disconnects before the first chunk, which
+    is what releases an export's pooled connection.
+    """
+
+    def __init__(self, body, compress, finish):
+        self.body = body
+        self.compress = compress
+        self.finish = finish
+
+    def __iter__(self):
+        for chunk in self.body:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield self.compress(chunk)
+        yield self.finish()
+
+    def close(self):
+        close = getattr(self.body, 'close', None)
+        if close is not None:
+            close()
+
+
+class Compression:
+    """Compresses text responses for clients that send Accept-Encoding
+
+    - brotli is preferred when the `brotli` package is installed and the
+      client accepts it, gzip otherwise; quality is kept moderate
+      (COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY) since it is paid on
+      every request
+    - only COMPRESS_MIMETYPES responses of at least COMPRESS_MIN_SIZE bytes
+      are touched; 206/304 and already-encoded responses pass through
+    - streamed responses (CSV exports, payroll reports) are compressed chunk
+      by chunk with a flush after each one, so rows keep arriving while the
+      query runs and nothing is buffered
+    - files from the static folder are compressed once at maximum quality
+      into COMPRESS_STATIC_CACHE_DIR, keyed by path, size and mtime
+
+    Strong ETags become weak on compressed responses, since the bytes differ
+    from the identity encoding; If-None-Match still matches them.
+    """
+
+    def __init__(self, app=None):
+        self.min_size = 500
+        self.mimetypes = frozenset(DEFAULT_MIMETYPES)
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        self.static_cache_dir = None
+        self._static_root = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+        app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BROTLI_QUALITY', 4)
+        app.config.setdefault('COMPRESS_STATIC_CACHE_DIR', os.path.join(app.root_path, 'cache', 'static'))
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        self.mimetypes = frozenset(app.config['COMPRESS_MIMETYPES'])
+        self.gzip_level = app.config['COMPRESS_GZIP_LEVEL']
+        self.brotli_quality = app.config['COMPRESS_BROTLI_QUALITY']
+        self.static_cache_dir = app.config['COMPRESS_STATIC_CACHE_DIR']
+        self._static_root = app.static_folder
+        app.after_request(self.after_request)
+        app.extensions['compression'] = self
+
+    def encodings(self):
+        """Encodings this installation can produce, in order of preference"""
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def _negotiate(self):
+        accepted = request.accept_encodings
+        for encoding in self.encodings():
+            if accepted.quality(encoding) > 0:
+                return encoding
+        return None
+
+    def _compress(self, data, encoding, best=False):
+        if encoding == 'br':
+            return brotli.compress(data, quality=11 if best else self.brotli_quality)
+        return gzip.compress(data, compresslevel=9 if best else self.gzip_level, mtime=0)
+
+    def _stream(self, body, encoding):
+        """Wrap a streamed body; every chunk is flushed so the client sees rows as they come"""
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return _CompressedStream(body, lambda chunk: compressor.process(chunk) + compressor.flush(),
+                                     compressor.finish)
+        # wbits 31: deflate stream with a gzip header and trailer
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return _CompressedStream(body, lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+                                 compressor.flush)
+
+    def after_request(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.mimetype not in self.mimetypes
+                or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self._negotiate()
+        if encoding is None or request.method == 'HEAD':
+            return response
+
+        if request.endpoint == 'static' and response.status_code == 200:
+            return self._static(response, encoding)
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding)
+            response.direct_passthrough = False
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            compressed = self._compress(data, encoding)
+            if len(compressed) >= len(data):
+                return response
+            response.set_data(compressed)
+        return self._encoded(response, encoding)
+
+    def _encoded(self, response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        # Byte ranges of the identity body no longer apply
+        response.headers.pop('Accept-Ranges', None)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _static(self, response, encoding):
+        """Serve a static file from the compressed-asset cache, filling it on a miss"""
+        path = safe_join(self._static_root, (request.view_args or {}).get('filename', ''))
+        if path is None or not os.path.isfile(path):
+            return response
+        stat = os.stat(path)
+        if stat.st_size < self.min_size:
+            return response
+        key = hashlib.sha256(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+        cached = os.path.join(self.static_cache_dir, f"{key}.{encoding}")
+        try:
+            with open(cached, 'rb') as f:
+                compressed = f.read()
+        except FileNotFoundError:
+            with open(path, 'rb') as f:
+                compressed = self._compress(f.read(), encoding, best=True)
+            os.makedirs(self.static_cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.static_cache_dir, prefix='.partial-')
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(compressed)
+            os.replace(tmp_path, cached)
+        # Closes the file send_file opened before the body is replaced
+        response.close()
+        response.direct_passthrough = False
+        response.set_data(compressed)
+        return self._encoded(response, encoding)
@@ -0,0 +1,123 @@
+"""
+Conditional Responses for Lumorange Management System
+ETag / Last-Modified validators for JSON detail endpoints, checked with a cheap version probe
+"""
+
+import hashlib
+import threading
+from datetime import timedelta, timezone
+from functools import wraps
+
+from flask import make_response, request
+
+
+class ConditionalResponses:
+    """Answers repeat requests for unchanged records with 304 Not Modified
+
+    A view decorated with `versioned(probe)` first runs `probe`, a single
+    indexed SELECT whose first column is the newest updated_date among the
+    rows the payload is built from; further columns (row counts, id sums)
+    catch rows leaving a list. The probe row becomes a weak ETag and its
+    first column the Last-Modified header. When the client already holds
+    that version the view is never called: no payload query, no JSON
+    encoding, no body.
+
+    TIMESTAMP columns only have one-second resolution, so a version
+    modified within the last CONDITIONAL_SETTLE_SECONDS (by the database
+    clock) is served without validators; two writes in the same second
+    can then never hide behind one ETag. Probes that return no row or a
+    NULL timestamp fall through to the view as well.
+
+    Only 200 responses get validators, so views must report errors with an
+    error status. The probes read salaries.updated_date (added by
+    fix_database_schema.py) and idx_projects_client_status (created by
+    optimize_database.py); until those exist a probe fails and the full
+    response is served.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.cache_control = 'private, no-cache'
+        self.settle_seconds = 1
+        self._lock = threading.Lock()
+        self._stats = {'not_modified': 0, 'full': 0, 'unversioned': 0, 'errors': 0}
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        # no-cache: browsers keep the body but revalidate before every reuse
+        app.config.setdefault('CONDITIONAL_CACHE_CONTROL', 'private, no-cache')
+        app.config.setdefault('CONDITIONAL_SETTLE_SECONDS', 1)
+        self.mysql = mysql
+        self.cache_control = app.config['CONDITIONAL_CACHE_CONTROL']
+        self.settle_seconds = app.config['CONDITIONAL_SETTLE_SECONDS']
+        app.extensions['conditional_responses'] = self
+
+    def _probe(self, probe, params):
+        """(etag, last_modified, dates_only) for the current version, or None"""
+        cur = self.mysql.connection.cursor()
+        try:
+            # The database clock decides whether the version has settled, and
+            # its UTC offset turns the session-time stamp into an HTTP date
+            cur.execute(f"SELECT probe.*, NOW(), UTC_TIMESTAMP() FROM ({probe}) probe", params)
+            row = cur.fetchone()
+        finally:
+            cur.close()
+        if row is None or row[0] is None:
+            return None
+        *version, now, utc_now = row
+        if version[0] > now - timedelta(seconds=self.settle_seconds):
+            return None
+        digest = hashlib.sha1(repr((request.path, request.query_string, version)).encode()).hexdigest()
+        last_modified = (version[0] - (now - utc_now)).replace(tzinfo=timezone.utc)
+        # A newest-change date alone cannot tell that a row left a list
+        return digest[:20], last_modified, len(version) == 1
+
+    def _not_modified(self, etag, last_modified, dates_only):
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+        return (dates_only and request.if_modified_since is not None
+                and last_modified <= request.if_modified_since)
+
+    def _validate(self, response, etag, last_modified):
+        response.set_etag(etag, weak=True)
+        response.last_modified = last_modified
+        response.headers['Cache-Control'] = self.cache_control
+        return response
+
+    def versioned(self, probe):
+        """Decorator; `probe` takes the view's URL arguments as parameters, in order"""
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                try:
+                    version = self._probe(probe, tuple(kwargs.values()))
+                except Exception as e:
+                    print(f"Error probing version for {request.path}: {e}")
+                    self._count('errors')
+                    version = None
+                if version is None:
+                    self._count('unversioned')
+                    return f(*args, **kwargs)
+
+                etag, last_modified, dates_only = version
+                if self._not_modified(etag, last_modified, dates_only):
+                    self._count('not_modified')
+                    return self._validate(make_response('', 304), etag, last_modified)
+
+                response = make_response(f(*args, **kwargs))
+                self._count('full')
+                if response.status_code == 200:
+                    self._validate(response, etag, last_modified)
+                return response
+            return decorated_function
+        return decorator
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def stats(self):
+        """How often each outcome happened, for monitoring"""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,112 @@
+"""
+CSV Export Streaming for Lumorange Management System
+Streams exports row by row from an unbuffered server-side cursor
+"""
+
+import csv
+import io
+
+import MySQLdb
+import MySQLdb.cursors
+from flask import Response, stream_with_context
+
+
+class QueryStream:
+    """Row chunks from an executed unbuffered cursor, see `stream_query()`"""
+
+    def __init__(self, pool, entry, cursor, chunk_rows):
+        self.pool = pool
+        self.entry = entry
+        self.cursor = cursor
+        self.chunk_rows = chunk_rows
+        self.exhausted = False
+
+    def __iter__(self):
+        while self.entry is not None:
+            rows = self.cursor.fetchmany(self.chunk_rows)
+            if not rows:
+                self.exhausted = True
+                self.close()
+                return
+            yield rows
+
+    def close(self):
+        """Hand the connection back; safe to call more than once"""
+        if self.entry is None:
+            return
+        entry, self.entry = self.entry, None
+        if self.exhausted:
+            self.cursor.close()
+            self.pool.release(entry)
+        else:
+            # Stopped early (client went away mid-download): closing the
+            # connection is far cheaper than reading the rest of an
+            # unbuffered result set
+            self.pool.release(entry, discard=True)
+
+
+def stream_query(mysql, query, params, cursorclass=MySQLdb.cursors.SSCursor, chunk_rows=500):
+    """Run `query` on a dedicated pooled connection; returns a QueryStream
+
+    The query is executed before this returns, so SQL errors still surface
+    in the calling view. Iterating yields lists of up to `chunk_rows` rows
+    read from an unbuffered cursor, so memory stays flat however large the
+    result is. Callers must `close()` the stream when they stop early.
+    """
+    pool = mysql.pool
+    entry = pool.acquire()
+    try:
+        cur = entry.connection.cursor(cursorclass)
+        cur.execute(query, params)
+    except Exception as e:
+        pool.release(entry, discard=isinstance(e, MySQLdb.OperationalError))
+        raise
+    return QueryStream(pool, entry, cur, chunk_rows)
+
+
+def stream_csv(mysql, query, params, header, format_row, filename,
+               cursorclass=MySQLdb.cursors.SSCursor, chunk_rows=500):
+    """Run `query` on a dedicated pooled connection and stream it as CSV
+
+    Rows are written out as they arrive from `stream_query()`, so memory
+    stays flat however large the export is and the download starts
+    immediately.
+    """
+    stream = stream_query(mysql, query, params, cursorclass, chunk_rows)
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        try:
+            writer.writerow(header)
+            yield drain_buffer(buffer)
+            for rows in stream:
+                writer.writerows(format_row(row) for row in rows)
+                yield drain_buffer(buffer)
+        finally:
+            stream.close()
+
+    return streaming_response(generate(), 'text/csv', filename, on_close=stream.close)
+
+
+def drain_buffer(buffer):
+    """Return and clear everything written to a StringIO/BytesIO so far"""
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return data
+
+
+def streaming_response(body, mimetype, filename, on_close=None):
+    """Attachment response for a generator body
+
+    `on_close` also runs when the response is dropped before the body was
+    ever iterated, which a generator's own `finally` would not notice.
+    """
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    if on_close is not None:
+        response.call_on_close(on_close)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    # Let reverse proxies pass chunks straight through instead of buffering
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,212 @@
+"""
+Dashboard Statistics for Lumorange Management System
+Set-based dashboard queries served from a short-lived in-process cache
+"""
+
+import threading
+import time
+from datetime import date
+
+
+def _month_start(day, months_back=0):
+    """First day of the month `months_back` months before `day`"""
+    month_index = day.year * 12 + day.month - 1 - months_back
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class DashboardStats:
+    """Computes everything the home page shows in four queries and caches it
+
+    The cached value is rebuilt at most once per DASHBOARD_CACHE_TTL seconds,
+    or straight away after a write route calls `invalidate()`. While one
+    thread rebuilds, other requests keep serving the previous value.
+    """
+
+    def __init__(self, app=None, mysql=None, currency_formatter=None):
+        self.mysql = mysql
+        self.ttl = 60
+        self.currency_formatter = currency_formatter or (lambda amount: f"{amount:,.2f}")
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._cached = None
+        self._expires_at = 0.0
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'last_build_ms': None}
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('DASHBOARD_CACHE_TTL', 60)
+        self.mysql = mysql
+        self.ttl = app.config['DASHBOARD_CACHE_TTL']
+        app.extensions['dashboard_stats'] = self
+
+    def invalidate(self):
+        """Drop the cached dashboard so the next request rebuilds it"""
+        with self._lock:
+            self._expires_at = 0.0
+            self._stats['invalidations'] += 1
+
+    def get(self, cur):
+        """Cached dashboard data, rebuilt with `cur` when stale"""
+        with self._lock:
+            if self._cached is not None and time.monotonic() < self._expires_at:
+                self._stats['hits'] += 1
+                return self._cached
+            stale = self._cached
+
+        # Only one thread rebuilds; the rest serve the stale copy if there is one
+        if not self._refresh_lock.acquire(blocking=stale is None):
+            with self._lock:
+                self._stats['hits'] += 1
+            return stale
+        try:
+            with self._lock:
+                if self._cached is not None and time.monotonic() < self._expires_at:
+                    self._stats['hits'] += 1
+                    return self._cached
+                # Writes that land during the build leave the new value expired
+                invalidations = self._stats['invalidations']
+            started = time.perf_counter()
+            data = self.build(cur)
+            with self._lock:
+                self._cached = data
+                if self._stats['invalidations'] == invalidations:
+                    self._expires_at = time.monotonic() + self.ttl
+                self._stats['misses'] += 1
+                self._stats['last_build_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            return data
+        finally:
+            self._refresh_lock.release()
+
+    def build(self, cur):
+        """Run the dashboard queries and shape the result for index.html"""
+        today = date.today()
+        this_month = _month_start(today)
+        next_month = _month_start(today, -1)
+        prev_month = _month_start(today, 1)
+        year_start = date(today.year, 1, 1)
+        next_year = date(today.year + 1, 1, 1)
+
+        # Headline counts and revenue in a single round trip
+        cur.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM employees WHERE status = 'active') as total_employees,
+                (SELECT COUNT(*) FROM departments) as total_departments,
+                p.total_projects,
+                p.active_projects,
+                r.monthly_revenue,
+                r.yearly_revenue,
+                r.prev_month_revenue
+            FROM (
+                SELECT COUNT(*) as total_projects,
+                       COALESCE(SUM(status IN ('In Progress', 'Planned')), 0) as active_projects
+                FROM projects
+            ) p
+            CROSS JOIN (
+                SELECT
+                    COALESCE(SUM(CASE WHEN invoice_date >= %s AND invoice_date < %s THEN total_amount END), 0) as monthly_revenue,
+                    COALESCE(SUM(CASE WHEN invoice_date >= %s THEN total_amount END), 0) as yearly_revenue,
+                    COALESCE(SUM(CASE WHEN invoice_date >= %s AND invoice_date < %s THEN total_amount END), 0) as prev_month_revenue
+                FROM invoices
+                WHERE status IN ('paid', 'sent')
+                  AND invoice_date >= %s AND invoice_date < %s
+            ) r
+        """, (this_month, next_month, year_start, prev_month, this_month,
+              min(prev_month, year_start), next_year))
+        (total_employees, total_departments, total_projects, active_projects,
+         monthly_revenue, yearly_revenue, prev_month_revenue) = cur.fetchone()
+
+        stats = {
+            'total_employees': total_employees,
+            'total_departments': total_departments,
+            'total_projects': total_projects,
+            'active_projects': active_projects,
+            'monthly_revenue': monthly_revenue,
+            'yearly_revenue': yearly_revenue,
+            'revenue_growth': 0,
+            'growth_positive': True,
+        }
+        if prev_month_revenue > 0:
+            growth_percent = ((monthly_revenue - prev_month_revenue) / prev_month_revenue) * 100
+            stats['revenue_growth'] = round(growth_percent, 1)
+            stats['growth_positive'] = growth_percent > 0
+
+        # Latest hires feed both the "recent employees" card and the activity list
+        cur.execute("""SELECT COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name) as full_name,
+                       e.position, e.hire_date, d.name as dept_name
+                       FROM employees e
+                       LEFT JOIN departments d ON e.department_id = d.id
+                       WHERE e.status = 'active'
+                       ORDER BY e.hire_date DESC LIMIT 5""")
+        latest_hires = cur.fetchall()
+        recent_employees = [row[:3] for row in latest_hires]
+
+        cur.execute("""SELECT d.name, COUNT(e.id) as employee_count, COALESCE(d.budget, 0) as budget
+                       FROM departments d
+                       LEFT JOIN employees e ON d.id = e.department_id AND e.status = 'active'
+                       GROUP BY d.id, d.name, d.budget
+                       ORDER BY employee_count DESC LIMIT 5""")
+        department_summary = cur.fetchall()
+
+        # Latest project and invoice activity in one statement
+        cur.execute("""(SELECT 'project' as kind, p.name, p.status, p.start_date as happened_on,
+                        COALESCE(p.progress, 0) as value
+                        FROM projects p
+                        ORDER BY p.start_date DESC LIMIT 2)
+                       UNION ALL
+                       (SELECT 'invoice' as kind, i.invoice_number, c.name, i.invoice_date,
+                        COALESCE(i.total_amount, 0)
+                        FROM invoices i
+                        LEFT JOIN clients c ON i.client_id = c.id
+                        ORDER BY i.invoice_date DESC LIMIT 2)""")
+        activity_rows = cur.fetchall()
+
+        return {
+            'stats': stats,
+            'recent_employees': recent_employees,
+            'department_summary': department_summary,
+            'recent_activities': self._activities(latest_hires[:2], activity_rows),
+        }
+
+    def _activities(self, hires, activity_rows):
+        activities = []
+        for full_name, _position, hire_date, dept_name in hires:
+            activities.append({
+                'type': 'employee',
+                'icon': 'fa-user-plus',
+                'color': 'success',
+                'title': 'New employee added',
+                'description': f"{full_name} has been added to the {dept_name or 'Unknown'} Department",
+                'time': hire_date if hire_date else 'Recently'
+            })
+        for kind, name, detail, happened_on, value in activity_rows:
+            if kind == 'project':
+                # UNION ALL widens progress to the invoice amount's DECIMAL type
+                progress = int(value) if value == int(value) else value
+                activities.append({
+                    'type': 'project',
+                    'icon': 'fa-project-diagram',
+                    'color': 'primary',
+                    'title': 'Project update',
+                    'description': f"{name} - Status: {detail} ({progress}% complete)",
+                    'time': happened_on if happened_on else 'Recently'
+                })
+            else:
+                activities.append({
+                    'type': 'invoice',
+                    'icon': 'fa-file-invoice',
+                    'color': 'warning',
+                    'title': 'Invoice generated',
+                    'description': f"{name} for {detail or 'Unknown Client'} - {self.currency_formatter(value)}",
+                    'time': happened_on if happened_on else 'Recently'
+                })
+        return activities
+
+    def stats(self):
+        """Cache hit/miss counters for monitoring"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['ttl_seconds'] = self.ttl
+            snapshot['cached'] = self._cached is not None
+            snapshot['fresh'] = self._cached is not None and time.monotonic() < self._expires_at
+        return snapshot
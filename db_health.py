@@ -0,0 +1,131 @@
+"""
+Database Health Monitor for Lumorange Management System
+Probes the database on a background timer and serves the cached result
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class HealthMonitor:
+    """Background `SELECT 1` probe with a cached result and latency history
+
+    Templates read `is_healthy()` from memory instead of running a query on
+    every render. The probe thread is started lazily in each worker process.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.interval = 15
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._history = deque(maxlen=60)
+        self._last = None
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('DB_HEALTH_INTERVAL', 15)
+        app.config.setdefault('DB_HEALTH_HISTORY', 60)
+        self.mysql = mysql
+        self.interval = app.config['DB_HEALTH_INTERVAL']
+        self._history = deque(maxlen=app.config['DB_HEALTH_HISTORY'])
+        app.extensions['db_health'] = self
+
+    def probe(self):
+        """Run one probe and record its outcome"""
+        started = time.perf_counter()
+        error = None
+        try:
+            with self.mysql.pool.connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchone()
+                cur.close()
+            ok = True
+        except Exception as e:
+            ok = False
+            error = str(e)
+        result = {
+            'ok': ok,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 2),
+            'checked_at': datetime.now(),
+            'error': error,
+        }
+        with self._lock:
+            self._last = result
+            self._history.append(result)
+        return result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.probe()
+
+    def ensure_started(self):
+        """Start the probe thread once per worker process"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            with self._lock:
+                self._stop.clear()
+                self._history.clear()
+                self._last = None
+            # First result is taken synchronously so the first page is accurate
+            self.probe()
+            self._thread = threading.Thread(target=self._run, name='db-health-probe', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_healthy(self):
+        """Last known database state, without touching the database"""
+        self.ensure_started()
+        last = self._last
+        return bool(last and last['ok'])
+
+    def snapshot(self):
+        """Health state and probe latency history for the /healthz endpoint"""
+        self.ensure_started()
+        with self._lock:
+            last = self._last
+            history = list(self._history)
+
+        latencies = sorted(item['latency_ms'] for item in history if item['ok'])
+        summary = {}
+        if latencies:
+            summary = {
+                'min_ms': latencies[0],
+                'avg_ms': round(sum(latencies) / len(latencies), 2),
+                'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                'max_ms': latencies[-1],
+            }
+
+        return {
+            'status': 'ok' if last and last['ok'] else 'unavailable',
+            'database': {
+                'connected': bool(last and last['ok']),
+                'last_checked': last['checked_at'].isoformat() if last else None,
+                'age_seconds': round((datetime.now() - last['checked_at']).total_seconds(), 1) if last else None,
+                'last_error': last['error'] if last else None,
+                'probe_interval_seconds': self.interval,
+            },
+            'latency': summary,
+            'history': [
+                {
+                    'checked_at': item['checked_at'].isoformat(),
+                    'ok': item['ok'],
+                    'latency_ms': item['latency_ms'],
+                }
+                for item in history
+            ],
+        }
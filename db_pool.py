@@ -0,0 +1,354 @@
+"""
+Database Connection Pool for Lumorange Management System
+Bounded, thread-safe MySQL connection pool shared by every request in a worker
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import MySQLdb
+from flask import g, has_app_context
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection is released within the overflow wait timeout"""
+
+
+class _PoolEntry:
+    """A raw MySQLdb connection plus the bookkeeping the pool needs"""
+
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Bounded pool of MySQLdb connections
+
+    - min_size connections are opened on first use and kept warm
+    - at most max_size connections are ever open at once
+    - checkout waits up to `timeout` seconds for a connection to be released
+    - connections older than max_lifetime seconds are recycled
+    - connections idle longer than ping_interval seconds are pinged on checkout
+    """
+
+    def __init__(self, connect_kwargs, min_size=2, max_size=10, max_lifetime=3600,
+                 timeout=10, ping_interval=30):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.connect_kwargs = dict(connect_kwargs)
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._reset_state()
+
+    def _reset_state(self):
+        """Forget every connection (used at start-up and after a fork)"""
+        self._pid = os.getpid()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._warmed = False
+        self._stats = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'recycled': 0,
+        }
+
+    def _check_fork(self):
+        # Sockets inherited from a parent process (e.g. gunicorn --preload) must
+        # never be shared, so a forked worker starts with an empty pool.
+        if self._pid != os.getpid():
+            self._reset_state()
+
+    def _connect(self):
+        connection = MySQLdb.connect(**self.connect_kwargs)
+        with self._lock:
+            self._stats['connections_created'] += 1
+        return _PoolEntry(connection)
+
+    def _close(self, entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._stats['connections_closed'] += 1
+
+    def _expired(self, entry, now):
+        return self.max_lifetime and now - entry.created_at > self.max_lifetime
+
+    def _warm_up(self):
+        """Open min_size connections the first time the pool is used"""
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = max(0, self.min_size - self._size)
+            self._size += missing
+        opened = []
+        try:
+            for _ in range(missing):
+                opened.append(self._connect())
+        finally:
+            with self._lock:
+                self._size -= missing - len(opened)
+                self._idle.extend(opened)
+                self._available.notify_all()
+
+    def acquire(self):
+        """Check a connection out of the pool"""
+        self._check_fork()
+        if not self._warmed:
+            try:
+                self._warm_up()
+            except MySQLdb.Error:
+                pass  # surfaced below when the real checkout fails
+
+        deadline = None
+        waited_since = None
+        while True:
+            entry = None
+            create = False
+            expired = []
+            with self._lock:
+                now = time.monotonic()
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if self._expired(candidate, now):
+                        self._size -= 1
+                        self._stats['recycled'] += 1
+                        expired.append(candidate)
+                        continue
+                    entry = candidate
+                    break
+
+                if entry is None and self._size < self.max_size:
+                    self._size += 1
+                    create = True
+
+                if entry is None and not create:
+                    if deadline is None:
+                        deadline = now + self.timeout
+                        waited_since = now
+                        self._stats['waits'] += 1
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        self._stats['wait_time_total'] += now - waited_since
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.timeout}s "
+                            f"(pool max_size={self.max_size})")
+                    self._available.wait(remaining)
+                    continue
+
+            for stale in expired:
+                self._close(stale)
+
+            if create:
+                try:
+                    entry = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._available.notify()
+                    raise
+            elif not self._healthy(entry):
+                continue
+
+            with self._lock:
+                self._in_use += 1
+                self._stats['checkouts'] += 1
+                if waited_since is not None:
+                    self._stats['wait_time_total'] += time.monotonic() - waited_since
+            entry.last_used = time.monotonic()
+            return entry
+
+    def _healthy(self, entry):
+        """Ping connections that sat idle long enough to have been dropped"""
+        if time.monotonic() - entry.last_used < self.ping_interval:
+            return True
+        try:
+            entry.connection.ping()
+            return True
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._stats['health_check_failures'] += 1
+                self._available.notify()
+            self._close(entry)
+            return False
+
+    def release(self, entry, discard=False):
+        """Return a connection to the pool, closing it if it is broken or too old"""
+        if self._pid != os.getpid():
+            return
+        if not discard:
+            try:
+                # Drop any transaction left open so the next user starts clean
+                entry.connection.rollback()
+            except Exception:
+                discard = True
+
+        now = time.monotonic()
+        with self._lock:
+            self._in_use -= 1
+            if discard or self._expired(entry, now):
+                self._size -= 1
+                if not discard:
+                    self._stats['recycled'] += 1
+                close_entry = True
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+                close_entry = False
+            self._available.notify()
+        if close_entry:
+            self._close(entry)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a raw connection outside the request cycle (background threads, scripts)"""
+        entry = self.acquire()
+        discard = False
+        try:
+            yield entry.connection
+        except MySQLdb.OperationalError:
+            discard = True
+            raise
+        finally:
+            self.release(entry, discard=discard)
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close when released)"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        """Snapshot of pool utilisation for monitoring"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'pid': self._pid,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+            })
+        snapshot['avg_wait_ms'] = round(
+            snapshot['wait_time_total'] * 1000 / snapshot['waits'], 2) if snapshot['waits'] else 0
+        snapshot['wait_time_total'] = round(snapshot['wait_time_total'], 4)
+        return snapshot
+
+
+class PooledMySQL:
+    """Drop-in replacement for flask_mysqldb.MySQL backed by a ConnectionPool
+
+    `mysql.connection` checks a connection out on first use inside an app
+    context and hands it back to the pool when the context is torn down.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Callables applied to each request's connection on checkout, e.g. to
+        # wrap it for instrumentation. Each takes and returns a connection.
+        self.connection_hooks = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MYSQL_HOST', 'localhost')
+        app.config.setdefault('MYSQL_USER', None)
+        app.config.setdefault('MYSQL_PASSWORD', None)
+        app.config.setdefault('MYSQL_DB', None)
+        app.config.setdefault('MYSQL_PORT', 3306)
+        app.config.setdefault('MYSQL_UNIX_SOCKET', None)
+        app.config.setdefault('MYSQL_CONNECT_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_CHARSET', 'utf8')
+        app.config.setdefault('MYSQL_POOL_MIN_SIZE', 2)
+        app.config.setdefault('MYSQL_POOL_MAX_SIZE', 10)
+        app.config.setdefault('MYSQL_POOL_MAX_LIFETIME', 3600)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_POOL_PING_INTERVAL', 30)
+        self.app = app
+        app.extensions['mysql_pool'] = self
+        app.teardown_appcontext(self.teardown)
+
+    def _connect_kwargs(self):
+        config = self.app.config
+        kwargs = {
+            'host': config['MYSQL_HOST'],
+            'port': config['MYSQL_PORT'],
+            'connect_timeout': config['MYSQL_CONNECT_TIMEOUT'],
+            'charset': config['MYSQL_CHARSET'],
+            'use_unicode': True,
+        }
+        if config['MYSQL_USER']:
+            kwargs['user'] = config['MYSQL_USER']
+        if config['MYSQL_PASSWORD']:
+            kwargs['passwd'] = config['MYSQL_PASSWORD']
+        if config['MYSQL_DB']:
+            kwargs['db'] = config['MYSQL_DB']
+        if config['MYSQL_UNIX_SOCKET']:
+            kwargs['unix_socket'] = config['MYSQL_UNIX_SOCKET']
+        return kwargs
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    config = self.app.config
+                    self._pool = ConnectionPool(
+                        self._connect_kwargs(),
+                        min_size=config['MYSQL_POOL_MIN_SIZE'],
+                        max_size=config['MYSQL_POOL_MAX_SIZE'],
+                        max_lifetime=config['MYSQL_POOL_MAX_LIFETIME'],
+                        timeout=config['MYSQL_POOL_TIMEOUT'],
+                        ping_interval=config['MYSQL_POOL_PING_INTERVAL'],
+                    )
+        return self._pool
+
+    @property
+    def connection(self):
+        """Connection bound to the current app context"""
+        if not has_app_context():
+            return None
+        connection = g.get('_mysql_pool_connection')
+        if connection is None:
+            entry = self.pool.acquire()
+            g._mysql_pool_entry = entry
+            connection = entry.connection
+            for hook in self.connection_hooks:
+                connection = hook(connection)
+            g._mysql_pool_connection = connection
+        return connection
+
+    def teardown(self, exception):
+        g.pop('_mysql_pool_connection', None)
+        entry = g.pop('_mysql_pool_entry', None)
+        if entry is not None:
+            self.pool.release(entry, discard=isinstance(exception, MySQLdb.OperationalError))
@@ -0,0 +1,219 @@
+"""
+Expense Rollups for Lumorange Management System
+Pre-aggregated expense counts and totals by (status, month, currency)
+
+Usage: python expense_rollups.py --rebuild | --verify
+"""
+
+import sys
+import threading
+from datetime import date, datetime
+
+ROLLUP_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS expense_rollups (
+        status VARCHAR(20) NOT NULL,
+        month DATE NOT NULL,
+        currency VARCHAR(10) NOT NULL,
+        expense_count INT NOT NULL DEFAULT 0,
+        total_amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (status, month, currency),
+        INDEX idx_expense_rollups_month (month)
+    )
+"""
+
+# Source-of-truth aggregation, shared by rebuild and verify
+SOURCE_AGGREGATE = """
+    SELECT COALESCE(status, 'submitted') as status,
+           DATE_FORMAT(COALESCE(expense_date, created_date), '%Y-%m-01') as month,
+           COALESCE(currency, 'INR') as currency,
+           COUNT(*) as expense_count,
+           COALESCE(SUM(amount), 0) as total_amount
+    FROM expense_reports
+    GROUP BY 1, 2, 3
+"""
+
+
+def _month(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+class ExpenseRollups:
+    """Keeps expense_rollups in step with expense_reports
+
+    Write routes bracket their change with `snapshot()` and `apply()` inside
+    the same transaction:
+
+        before = expense_rollups.snapshot(cur, ids)   # locks the rows
+        ... INSERT / UPDATE / DELETE expense_reports ...
+        expense_rollups.apply(cur, before, ids)
+
+    Only the difference between the two snapshots is written, so the cost
+    depends on the rows touched, never on the size of expense_reports.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        self.mysql = mysql
+        app.extensions['expense_rollups'] = self
+
+    def ensure_ready(self):
+        """Create the rollup table and backfill it the first time it is used
+
+        Runs on its own pooled connection and commits there: the request's
+        transaction may be a read that is rolled back, and CREATE TABLE
+        would commit whatever the request had started. `_ready` is only
+        set once the backfill is committed, so a failed one is retried.
+        """
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            with self.mysql.pool.connection() as conn:
+                cur = conn.cursor()
+                try:
+                    cur.execute(ROLLUP_TABLE_DDL)
+                    cur.execute("SELECT EXISTS(SELECT 1 FROM expense_rollups), "
+                                "EXISTS(SELECT 1 FROM expense_reports)")
+                    has_rollups, has_expenses = cur.fetchone()
+                    if has_expenses and not has_rollups:
+                        self.rebuild(cur)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cur.close()
+            self._ready = True
+
+    def snapshot(self, cur, expense_ids):
+        """Lock the given expenses and return their rollup buckets"""
+        self.ensure_ready()
+        expense_ids = [int(expense_id) for expense_id in expense_ids if expense_id]
+        if not expense_ids:
+            return {}
+        placeholders = ','.join(['%s'] * len(expense_ids))
+        cur.execute(f"""
+            SELECT COALESCE(status, 'submitted'), COALESCE(expense_date, created_date),
+                   COALESCE(currency, 'INR'), COALESCE(amount, 0)
+            FROM expense_reports
+            WHERE id IN ({placeholders})
+            FOR UPDATE
+        """, expense_ids)
+        buckets = {}
+        for status, expense_date, currency, amount in cur.fetchall():
+            key = (status, _month(expense_date), currency)
+            count, total = buckets.get(key, (0, 0))
+            buckets[key] = (count + 1, total + amount)
+        return buckets
+
+    def apply(self, cur, before, expense_ids):
+        """Write the difference between `before` and the current state of the rows"""
+        after = self.snapshot(cur, expense_ids)
+        deltas = []
+        for key in set(before) | set(after):
+            count_before, amount_before = before.get(key, (0, 0))
+            count_after, amount_after = after.get(key, (0, 0))
+            if count_after != count_before or amount_after != amount_before:
+                deltas.append(key + (count_after - count_before, amount_after - amount_before))
+        if not deltas:
+            return
+        cur.executemany("""
+            INSERT INTO expense_rollups (status, month, currency, expense_count, total_amount)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE expense_count = expense_count + VALUES(expense_count),
+                                    total_amount = total_amount + VALUES(total_amount)
+        """, deltas)
+        # Emptied buckets stay as zero rows until the next rebuild: a DELETE
+        # by expense_count would lock the whole table in every expense write
+
+    def statistics(self, cur, current_month=None):
+        """Dashboard figures for the /expenses page from the rollup rows"""
+        self.ensure_ready()
+        current_month = current_month or date.today().replace(day=1)
+        cur.execute("""
+            SELECT COALESCE(SUM(expense_count), 0),
+                   COALESCE(SUM(total_amount), 0),
+                   COALESCE(SUM(CASE WHEN status = 'submitted' THEN expense_count END), 0),
+                   COALESCE(SUM(CASE WHEN status = 'submitted' THEN total_amount END), 0),
+                   COALESCE(SUM(CASE WHEN status = 'approved' THEN expense_count END), 0),
+                   COALESCE(SUM(CASE WHEN status = 'approved' THEN total_amount END), 0),
+                   COALESCE(SUM(CASE WHEN month >= %s THEN expense_count END), 0),
+                   COALESCE(SUM(CASE WHEN month >= %s THEN total_amount END), 0)
+            FROM expense_rollups
+        """, (current_month, current_month))
+        row = cur.fetchone()
+        return {
+            'total': row[0],
+            'total_amount': row[1],
+            'pending': row[2],
+            'pending_amount': row[3],
+            'approved': row[4],
+            'approved_amount': row[5],
+            'this_month': row[6],
+            'this_month_amount': row[7]
+        }
+
+    def rebuild(self, cur):
+        """Recompute every rollup row from expense_reports; the caller commits"""
+        cur.execute(ROLLUP_TABLE_DDL)
+        cur.execute("DELETE FROM expense_rollups")
+        cur.execute("INSERT INTO expense_rollups (status, month, currency, expense_count, total_amount) "
+                    + SOURCE_AGGREGATE)
+        return cur.rowcount
+
+    def verify(self, cur):
+        """Compare rollups with a fresh aggregation; returns a list of mismatches"""
+        cur.execute(ROLLUP_TABLE_DDL)
+        cur.execute(SOURCE_AGGREGATE)
+        expected = {(row[0], str(row[1]), row[2]): (row[3], row[4]) for row in cur.fetchall()}
+        cur.execute("SELECT status, month, currency, expense_count, total_amount FROM expense_rollups")
+        actual = {(row[0], str(row[1]), row[2]): (row[3], row[4]) for row in cur.fetchall()}
+        mismatches = []
+        for key in sorted(set(expected) | set(actual)):
+            if expected.get(key, (0, 0)) != actual.get(key, (0, 0)):
+                mismatches.append({'bucket': key, 'expected': expected.get(key, (0, 0)),
+                                   'actual': actual.get(key, (0, 0))})
+        return mismatches
+
+
+def main():
+    import MySQLdb
+
+    if len(sys.argv) != 2 or sys.argv[1] not in ('--rebuild', '--verify'):
+        print(__doc__.strip().splitlines()[-1])
+        return 2
+
+    db = MySQLdb.connect(host='localhost', user='root', passwd='gmkr', db='lumorange_db')
+    cur = db.cursor()
+    rollups = ExpenseRollups()
+    try:
+        if sys.argv[1] == '--rebuild':
+            print("🔧 Rebuilding expense rollups...")
+            buckets = rollups.rebuild(cur)
+            db.commit()
+            print(f"✅ Rebuilt {buckets} rollup rows")
+        mismatches = rollups.verify(cur)
+        if mismatches:
+            print(f"❌ {len(mismatches)} rollup bucket(s) out of step:")
+            for mismatch in mismatches:
+                print(f"   {mismatch['bucket']}: expected {mismatch['expected']}, found {mismatch['actual']}")
+            return 1
+        print("✅ Expense rollups match expense_reports")
+        return 0
+    finally:
+        cur.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Extensions for Lumorange Management System
+Shared extension instances; app.py binds them with init_app and the blueprint views import them from here
+"""
+
+from audit_log import AuditLog
+from candidate_search import CandidateSearch
+from compression import Compression
+from conditional import ConditionalResponses
+from dashboard_stats import DashboardStats
+from db_health import HealthMonitor
+from db_pool import PooledMySQL
+from expense_rollups import ExpenseRollups
+from job_runner import JobRunner
+from notes_autosave import NotesWriteBehind
+from payroll_export import PayrollExporter
+from payroll_reports import PayrollReports
+from query_instrumentation import QueryInstrumentation
+from receipt_storage import ReceiptStorage
+from recruitment_analytics import RecruitmentAnalytics
+from reference_cache import ReferenceCache
+from sequences import SequenceAllocator
+from skill_matching import SkillMatcher
+from template_cache import TemplateCache
+
+mysql = PooledMySQL()
+health_monitor = HealthMonitor()
+query_instrumentation = QueryInstrumentation()
+dashboard_stats = DashboardStats()
+job_runner = JobRunner()
+sequences = SequenceAllocator()
+expense_rollups = ExpenseRollups()
+recruitment_analytics = RecruitmentAnalytics()
+candidate_search = CandidateSearch()
+skill_matcher = SkillMatcher()
+notes_autosave = NotesWriteBehind()
+receipt_storage = ReceiptStorage()
+payroll_reports = PayrollReports()
+payroll_exporter = PayrollExporter()
+audit_log = AuditLog()
+reference_cache = ReferenceCache()
+conditional = ConditionalResponses()
+compression = Compression()
+template_cache = TemplateCache()
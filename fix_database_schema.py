@@ -38,6 +38,23 @@ def fix_database_schema():
             "ALTER TABLE invoices ADD COLUMN IF NOT EXISTS project_id INT",
             "ALTER TABLE invoices ADD COLUMN IF NOT EXISTS notes TEXT",
             
+            # Fix salaries table (detail API version probes read updated_date)
+            "ALTER TABLE salaries ADD COLUMN IF NOT EXISTS updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+            
+            # Interview notes: when the stored text was typed, so autosaves
+            # buffered in one worker never overwrite a later save
+            "ALTER TABLE interviews ADD COLUMN IF NOT EXISTS notes_saved_at DATETIME(6) NULL",
+            
+            # Fix payroll_runs table (progress of runs generated in the background)
+            "ALTER TABLE payroll_runs ADD COLUMN IF NOT EXISTS progress_percent TINYINT UNSIGNED DEFAULT 100",
+            
+            # Fix expense_reports table (receipts stored by content hash)
+            "ALTER TABLE expense_reports ADD COLUMN IF NOT EXISTS receipt_sha256 CHAR(64) NULL",
+            "ALTER TABLE expense_reports ADD COLUMN IF NOT EXISTS receipt_filename VARCHAR(255) NULL",
+            "ALTER TABLE expense_reports ADD COLUMN IF NOT EXISTS receipt_content_type VARCHAR(100) NULL",
+            "ALTER TABLE expense_reports ADD COLUMN IF NOT EXISTS receipt_size INT UNSIGNED NULL",
+            "ALTER TABLE expense_reports ADD INDEX IF NOT EXISTS idx_expense_reports_receipt_sha256 (receipt_sha256)",
+            
             # Update existing data to populate first_name and last_name from name
             """UPDATE employees 
              SET first_name = SUBSTRING_INDEX(name, ' ', 1),
@@ -0,0 +1,228 @@
+"""
+Background Jobs for Lumorange Management System
+In-process job queue persisted in MySQL for long-running work such as payroll runs
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+JOBS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS background_jobs (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        job_type VARCHAR(50) NOT NULL,
+        status ENUM('queued', 'running', 'completed', 'failed') NOT NULL DEFAULT 'queued',
+        progress_percent TINYINT UNSIGNED NOT NULL DEFAULT 0,
+        payload JSON,
+        result JSON,
+        error TEXT,
+        worker_pid INT,
+        attempts INT NOT NULL DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        started_at DATETIME NULL,
+        finished_at DATETIME NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_background_jobs_status (status, created_at)
+    )
+"""
+
+
+def _process_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobContext:
+    """What a job handler gets: its payload, a pooled connection and progress reporting"""
+
+    def __init__(self, job_id, payload, connection):
+        self.job_id = job_id
+        self.payload = payload
+        self.connection = connection
+
+    def progress(self, percent):
+        """Record progress and commit the job's connection
+
+        Call it between units of work; anything the handler has written on
+        this connection so far is committed along with the progress value.
+        """
+        percent = max(0, min(100, int(percent)))
+        cur = self.connection.cursor()
+        cur.execute("UPDATE background_jobs SET progress_percent = %s WHERE id = %s",
+                    (percent, self.job_id))
+        cur.close()
+        self.connection.commit()
+
+
+class JobRunner:
+    """Thread-pool job runner whose queue lives in the background_jobs table
+
+    - `enqueue()` writes the job row and commits together with the caller's
+      own changes, then hands the job id to the worker pool
+    - workers claim a job with a conditional UPDATE, so a job runs only once
+      even when several worker processes share the database
+    - on start-up each process re-queues jobs left behind by a dead process
+    - needs nothing beyond MySQL: no broker, no separate worker service
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.max_workers = 2
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._schema_ready = False
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('JOB_RUNNER_WORKERS', 2)
+        self.mysql = mysql
+        self.max_workers = app.config['JOB_RUNNER_WORKERS']
+        app.extensions['job_runner'] = self
+        app.before_request(self.ensure_started)
+
+    def register(self, job_type, handler):
+        """Register `handler(ctx)` for a job type; its return value is stored as the result"""
+        self._handlers[job_type] = handler
+
+    def ensure_schema(self, cur):
+        if not self._schema_ready:
+            cur.execute(JOBS_TABLE_DDL)
+            self._schema_ready = True
+
+    def ensure_started(self):
+        """Create this process's worker pool and pick up orphaned jobs"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='lumorange-job')
+            self._pid = os.getpid()
+        try:
+            self.recover()
+        except Exception as e:
+            print(f"Error recovering background jobs: {e}")
+
+    def recover(self):
+        """Re-queue jobs whose worker process died and resubmit everything queued"""
+        with self.mysql.pool.connection() as conn:
+            cur = conn.cursor()
+            self.ensure_schema(cur)
+            cur.execute("SELECT id, status, worker_pid FROM background_jobs "
+                        "WHERE status IN ('queued', 'running') ORDER BY id")
+            pending = []
+            for job_id, status, worker_pid in cur.fetchall():
+                if status == 'running':
+                    if _process_alive(worker_pid):
+                        continue
+                    cur.execute("UPDATE background_jobs SET status = 'queued' "
+                                "WHERE id = %s AND status = 'running' AND worker_pid = %s",
+                                (job_id, worker_pid))
+                pending.append(job_id)
+            conn.commit()
+            cur.close()
+        for job_id in pending:
+            self.submit(job_id)
+
+    def enqueue(self, connection, job_type, payload):
+        """Persist a job, commit `connection` and schedule it; returns the job id"""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        self.ensure_started()
+        cur = connection.cursor()
+        self.ensure_schema(cur)
+        cur.execute("INSERT INTO background_jobs (job_type, payload) VALUES (%s, %s)",
+                    (job_type, json.dumps(payload, default=str)))
+        job_id = cur.lastrowid
+        cur.close()
+        connection.commit()
+        self.submit(job_id)
+        return job_id
+
+    def submit(self, job_id):
+        self.ensure_started()
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        try:
+            with self.mysql.pool.connection() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    UPDATE background_jobs
+                    SET status = 'running', worker_pid = %s, started_at = NOW(),
+                        attempts = attempts + 1, error = NULL
+                    WHERE id = %s AND status = 'queued'
+                """, (os.getpid(), job_id))
+                claimed = cur.rowcount == 1
+                conn.commit()
+                if not claimed:
+                    cur.close()
+                    return
+
+                cur.execute("SELECT job_type, payload FROM background_jobs WHERE id = %s", (job_id,))
+                job_type, payload = cur.fetchone()
+                cur.close()
+                context = JobContext(job_id, json.loads(payload) if payload else {}, conn)
+
+                try:
+                    result = self._handlers[job_type](context)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"Background job {job_id} ({job_type}) failed: {e}")
+                    self._finish(conn, job_id, 'failed', error=str(e))
+                    return
+                self._finish(conn, job_id, 'completed', result=result)
+        except Exception as e:
+            print(f"Error running background job {job_id}: {e}")
+
+    def _finish(self, conn, job_id, status, result=None, error=None):
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE background_jobs
+            SET status = %s, finished_at = NOW(), result = %s, error = %s,
+                progress_percent = IF(%s = 'completed', 100, progress_percent)
+            WHERE id = %s
+        """, (status, json.dumps(result, default=str) if result is not None else None,
+              error, status, job_id))
+        cur.close()
+        conn.commit()
+
+    def get(self, cur, job_id):
+        """Job state as a JSON-ready dict, or None"""
+        self.ensure_schema(cur)
+        cur.execute("""
+            SELECT id, job_type, status, progress_percent, payload, result, error,
+                   attempts, created_at, started_at, finished_at
+            FROM background_jobs WHERE id = %s
+        """, (job_id,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        (job_id, job_type, status, progress_percent, payload, result, error,
+         attempts, created_at, started_at, finished_at) = row
+        return {
+            'id': job_id,
+            'job_type': job_type,
+            'status': status,
+            'progress_percent': progress_percent,
+            'payload': json.loads(payload) if payload else None,
+            'result': json.loads(result) if result else None,
+            'error': error,
+            'attempts': attempts,
+            'created_at': created_at.isoformat() if created_at else None,
+            'started_at': started_at.isoformat() if started_at else None,
+            'finished_at': finished_at.isoformat() if finished_at else None,
+        }
@@ -0,0 +1,158 @@
+"""
+Interview Notes Autosave Load Test
+Simulates several interviewers autosaving notes at once and compares commits
+per minute for direct UPDATE + commit against the write-behind buffer. Runs
+against a scratch database so production data is never touched.
+
+Usage: python load_test_autosave.py [interviewers] [seconds] [autosave_interval]
+"""
+
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+import MySQLdb
+
+from db_pool import ConnectionPool
+from notes_autosave import NOTES_UPDATE, NotesWriteBehind
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'passwd': 'gmkr',
+}
+LOAD_TEST_DB = 'lumorange_autosave_loadtest'
+FLUSH_INTERVAL = 5
+
+
+class _PoolOnly:
+    """The part of the Flask MySQL extension NotesWriteBehind uses"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+
+def setup_database(interviewers):
+    db = MySQLdb.connect(**DB_CONFIG)
+    cur = db.cursor()
+    cur.execute(f"DROP DATABASE IF EXISTS {LOAD_TEST_DB}")
+    cur.execute(f"CREATE DATABASE {LOAD_TEST_DB}")
+    cur.execute(f"USE {LOAD_TEST_DB}")
+    cur.execute("""CREATE TABLE interviews (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        interviewer_notes TEXT,
+        notes_saved_at DATETIME(6) NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )""")
+    cur.executemany("INSERT INTO interviews (interviewer_notes) VALUES (%s)", [('',)] * interviewers)
+    db.commit()
+    cur.close()
+    return db
+
+
+def global_commits(db):
+    cur = db.cursor()
+    cur.execute("SHOW GLOBAL STATUS LIKE 'Com_commit'")
+    value = int(cur.fetchone()[1])
+    cur.close()
+    return value
+
+
+def simulate(interviewers, seconds, interval, save):
+    """Each interviewer thread autosaves growing notes every `interval` seconds"""
+    stop_at = time.monotonic() + seconds
+    final_notes = {}
+
+    def interviewer(interview_id):
+        notes = ''
+        # Stagger start-up like real users
+        time.sleep(random.uniform(0, interval))
+        while time.monotonic() < stop_at:
+            notes += f"Point {len(notes) // 10}: candidate answered well. "
+            save(interview_id, notes)
+            final_notes[interview_id] = notes
+            time.sleep(interval * random.uniform(0.8, 1.2))
+
+    threads = [threading.Thread(target=interviewer, args=(interview_id,))
+               for interview_id in range(1, interviewers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return final_notes
+
+
+def run_direct(interviewers, seconds, interval):
+    """The original route: one UPDATE and commit per autosave"""
+    local = threading.local()
+
+    def save(interview_id, notes):
+        if not hasattr(local, 'db'):
+            local.db = MySQLdb.connect(db=LOAD_TEST_DB, **DB_CONFIG)
+        cur = local.db.cursor()
+        saved_at = datetime.now()
+        cur.execute(NOTES_UPDATE, (notes, saved_at, interview_id, saved_at))
+        local.db.commit()
+        cur.close()
+
+    return simulate(interviewers, seconds, interval, save)
+
+
+def run_write_behind(interviewers, seconds, interval):
+    pool = ConnectionPool(dict(DB_CONFIG, db=LOAD_TEST_DB), min_size=1, max_size=4)
+    buffer = NotesWriteBehind(mysql=_PoolOnly(pool))
+    buffer.flush_interval = FLUSH_INTERVAL
+    final_notes = simulate(interviewers, seconds, interval, buffer.buffer)
+    # What the shutdown hook does
+    buffer.flush()
+    pool.close_all()
+    return final_notes, buffer.stats()
+
+
+def verify(db, final_notes):
+    cur = db.cursor()
+    cur.execute(f"SELECT id, interviewer_notes FROM {LOAD_TEST_DB}.interviews")
+    stored = dict(cur.fetchall())
+    cur.close()
+    return all(stored.get(interview_id) == notes for interview_id, notes in final_notes.items())
+
+
+def main():
+    interviewers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    interval = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+
+    print(f"📝 {interviewers} interviewers autosaving every ~{interval}s for {seconds:.0f}s "
+          f"(flush interval {FLUSH_INTERVAL}s)")
+    db = setup_database(interviewers)
+    try:
+        results = []
+        for label, runner in (('Direct commit', run_direct), ('Write-behind', run_write_behind)):
+            before = global_commits(db)
+            started = time.monotonic()
+            outcome = runner(interviewers, seconds, interval)
+            elapsed = time.monotonic() - started
+            final_notes = outcome[0] if isinstance(outcome, tuple) else outcome
+            commits = global_commits(db) - before
+            if not verify(db, final_notes):
+                print(f"❌ {label}: stored notes differ from the last autosave")
+                return 1
+            results.append((label, commits, commits / elapsed * 60))
+            print(f"{label:>14}: {commits:>6} commits  {commits / elapsed * 60:>9.0f} commits/min")
+            if isinstance(outcome, tuple):
+                stats = outcome[1]
+                print(f"{'':>14}  {stats['buffered']} autosaves coalesced into {stats['written']} row writes")
+
+        direct, write_behind = results[0][2], results[1][2]
+        reduction = (1 - write_behind / direct) * 100 if direct else 0
+        print(f"✅ Latest notes persisted in both modes; commits/min reduced by {reduction:.1f}%")
+        return 0
+    finally:
+        db.cursor().execute(f"DROP DATABASE IF EXISTS {LOAD_TEST_DB}")
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
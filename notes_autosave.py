@@ -0,0 +1,154 @@
+"""
+Interview Notes Autosave for Lumorange Management System
+Write-behind buffer that coalesces autosaved notes before they reach MySQL
+"""
+
+import atexit
+import os
+import threading
+from datetime import datetime
+
+# notes_saved_at is when the stored text was typed (app clock, microseconds):
+# buffered text older than what another worker already wrote is skipped
+NOTES_UPDATE = """
+    UPDATE interviews
+    SET interviewer_notes = %s, notes_saved_at = %s, updated_at = CURRENT_TIMESTAMP
+    WHERE id = %s AND (notes_saved_at IS NULL OR notes_saved_at < %s)
+"""
+
+
+class NotesWriteBehind:
+    """Keeps the latest autosaved notes per interview and writes them in batches
+
+    - `buffer()` only replaces the pending text in memory, so a burst of
+      autosaves for one interview costs a single UPDATE
+    - a background thread flushes every NOTES_AUTOSAVE_FLUSH_SECONDS, writing
+      all pending interviews with one commit
+    - `flush(interview_id)` writes one interview straight away, for routes
+      that act on the notes (completing an interview)
+    - `discard(interview_id)` drops pending text that an explicit save is
+      about to supersede, waiting for any flush already writing it, and
+      returns the time the save must store in interviews.notes_saved_at
+    - each worker has its own buffer, so every write is conditional on
+      notes_saved_at: text buffered in one worker never overwrites a later
+      explicit save or autosave handled by another
+    - pending notes are flushed at interpreter exit; failed writes stay
+      buffered and are retried on the next flush unless newer text arrived
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.flush_interval = 5
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stats = {'buffered': 0, 'written': 0, 'superseded': 0, 'flushes': 0, 'commits': 0, 'errors': 0}
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('NOTES_AUTOSAVE_FLUSH_SECONDS', 5)
+        self.mysql = mysql
+        self.flush_interval = app.config['NOTES_AUTOSAVE_FLUSH_SECONDS']
+        app.extensions['notes_autosave'] = self
+        atexit.register(self._flush_at_exit)
+
+    def _ensure_thread(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='lumorange-notes-autosave', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing autosaved notes: {e}")
+
+    def _flush_at_exit(self):
+        try:
+            written = self.flush()
+            if written:
+                print(f"Flushed autosaved notes for {written} interview(s) at shutdown")
+        except Exception as e:
+            print(f"Error flushing autosaved notes at shutdown: {e}")
+
+    def buffer(self, interview_id, notes):
+        """Record the latest notes for an interview; written on the next flush"""
+        self._ensure_thread()
+        with self._lock:
+            self._pending[int(interview_id)] = (notes, datetime.now())
+            self._stats['buffered'] += 1
+
+    def pending(self, interview_id, default=None):
+        """Buffered notes not yet written, else `default`"""
+        with self._lock:
+            entry = self._pending.get(int(interview_id))
+        return entry[0] if entry is not None else default
+
+    def discard(self, interview_id):
+        """Forget buffered notes that an explicit save replaces
+
+        Returns the timestamp to write to notes_saved_at with that save.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._pending.pop(int(interview_id), None)
+            return datetime.now()
+
+    def flush(self, interview_id=None):
+        """Write pending notes (all, or one interview) with a single commit
+
+        Returns the number of interviews written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if interview_id is None:
+                    batch = self._pending
+                    self._pending = {}
+                elif int(interview_id) in self._pending:
+                    batch = {int(interview_id): self._pending.pop(int(interview_id))}
+                else:
+                    batch = {}
+            if not batch:
+                return 0
+            try:
+                with self.mysql.pool.connection() as conn:
+                    cur = conn.cursor()
+                    try:
+                        cur.executemany(NOTES_UPDATE, [(notes, buffered_at, pending_id, buffered_at)
+                                                       for pending_id, (notes, buffered_at) in batch.items()])
+                        written = cur.rowcount
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    finally:
+                        cur.close()
+            except Exception:
+                with self._lock:
+                    self._stats['errors'] += 1
+                    # Newer text buffered during the failed write wins
+                    for pending_id, entry in batch.items():
+                        self._pending.setdefault(pending_id, entry)
+                raise
+            with self._lock:
+                self._stats['written'] += written
+                self._stats['superseded'] += len(batch) - written
+                self._stats['flushes'] += 1
+                self._stats['commits'] += 1
+            return written
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending), flush_interval=self.flush_interval)
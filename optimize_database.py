@@ -44,15 +44,25 @@ def create_performance_indexes():
             # Payroll indexes
             "CREATE INDEX IF NOT EXISTS idx_payroll_runs_date ON payroll_runs(created_date)",
             "CREATE INDEX IF NOT EXISTS idx_payroll_runs_status ON payroll_runs(status)",
+            "CREATE INDEX IF NOT EXISTS idx_payroll_runs_pay_date ON payroll_runs(pay_date)",
             "CREATE INDEX IF NOT EXISTS idx_payroll_entries_run_id ON payroll_entries(payroll_run_id)",
             
             # Project indexes
             "CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status)",
             "CREATE INDEX IF NOT EXISTS idx_projects_client_id ON projects(client_id)",
+            "CREATE INDEX IF NOT EXISTS idx_projects_client_status ON projects(client_id, status)",
             
             # Client indexes
             "CREATE INDEX IF NOT EXISTS idx_clients_status ON clients(status)",
             "CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(name)",
+            
+            # Candidate indexes (skill matching syncs edited candidates by updated_at)
+            "CREATE INDEX IF NOT EXISTS idx_candidates_updated_at ON candidates(updated_at)",
+            
+            # Recruitment indexes (the analytics refresh finds changed days by these)
+            "CREATE INDEX IF NOT EXISTS idx_job_applications_updated_at ON job_applications(updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_applications_date ON job_applications(application_date)",
+            "CREATE INDEX IF NOT EXISTS idx_recruitment_pipeline_created_at ON recruitment_pipeline(created_at)",
         ]
         
         for index_sql in indexes:
@@ -0,0 +1,168 @@
+"""
+Keyset Pagination for Lumorange Management System
+Seek-method paging with stable sort keys for the large list pages
+"""
+
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import request
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, (date, timedelta, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe token for a row's sort key"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Decode a cursor token; returns None for anything malformed"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+class Page:
+    """One page of rows plus the cursors needed to move around"""
+
+    def __init__(self, items, sort, order, page_size, next_cursor=None, prev_cursor=None,
+                 sort_options=None):
+        self.items = items
+        self.sort = sort
+        self.order = order
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.sort_options = sort_options or []
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def url_args(self, **overrides):
+        """Current query-string arguments with paging keys replaced"""
+        args = {key: value for key, value in request.args.items()
+                if key not in ('after', 'before')}
+        args.update({key: value for key, value in overrides.items() if value is not None})
+        return args
+
+
+class KeysetPaginator:
+    """Builds seek predicates and cursors for one list page
+
+    sort_options maps a public sort name to (sql_expression, row_key, label)
+    with an optional fourth element used in place of NULL for nullable
+    columns. Every ordering is made total by appending the tiebreaker column,
+    so rows never repeat or go missing between pages.
+    """
+
+    def __init__(self, sort_options, default_sort, default_order='desc',
+                 tiebreaker=('id', 'id'), default_page_size=25, max_page_size=100):
+        self.sort_options = sort_options
+        self.default_sort = default_sort
+        self.default_order = default_order
+        self.tiebreaker = tiebreaker
+        self.default_page_size = default_page_size
+        self.max_page_size = max_page_size
+
+    def parse(self, args=None):
+        """Read sort/order/page size/cursor from the query string"""
+        args = request.args if args is None else args
+        sort = args.get('sort', self.default_sort)
+        if sort not in self.sort_options:
+            sort = self.default_sort
+        order = args.get('order', self.default_order)
+        if order not in ('asc', 'desc'):
+            order = self.default_order
+        try:
+            page_size = int(args.get('per_page', self.default_page_size))
+        except (TypeError, ValueError):
+            page_size = self.default_page_size
+        page_size = max(1, min(page_size, self.max_page_size))
+
+        direction, cursor = 'next', decode_cursor(args.get('after'), 2)
+        if cursor is None:
+            cursor = decode_cursor(args.get('before'), 2)
+            direction = 'prev' if cursor is not None else 'next'
+        return {'sort': sort, 'order': order, 'page_size': page_size,
+                'cursor': cursor, 'direction': direction}
+
+    def _sort_expression(self, sort):
+        option = self.sort_options[sort]
+        if len(option) > 3:
+            return f"COALESCE({option[0]}, %s)", [option[3]]
+        return option[0], []
+
+    def build(self, query, params, state, group_by=''):
+        """Append the seek predicate, ORDER BY and LIMIT to a query ending in a WHERE clause"""
+        sort_expr, sort_params = self._sort_expression(state['sort'])
+        tie_expr = self.tiebreaker[0]
+        ascending = (state['order'] == 'asc') != (state['direction'] == 'prev')
+        params = list(params)
+
+        if state['cursor'] is not None:
+            op = '>' if ascending else '<'
+            query += f" AND ({sort_expr} {op} %s OR ({sort_expr} = %s AND {tie_expr} {op} %s))"
+            sort_value, tie_value = state['cursor']
+            params.extend(sort_params + [sort_value] + sort_params + [sort_value, tie_value])
+
+        direction = 'ASC' if ascending else 'DESC'
+        if group_by:
+            query += f" {group_by}"
+        query += f" ORDER BY {sort_expr} {direction}, {tie_expr} {direction} LIMIT %s"
+        params.extend(sort_params + [state['page_size'] + 1])
+        return query, params
+
+    def _key(self, row, sort):
+        option = self.sort_options[sort]
+        value = row[option[1]]
+        if value is None and len(option) > 3:
+            value = option[3]
+        return [value, row[self.tiebreaker[1]]]
+
+    def page(self, rows, state):
+        """Turn the fetched rows (page_size + 1 at most) into a Page"""
+        rows = list(rows)
+        page_size = state['page_size']
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if state['direction'] == 'prev':
+            rows.reverse()
+            has_prev, has_next = has_more, True
+        else:
+            has_prev, has_next = state['cursor'] is not None, has_more
+
+        next_cursor = encode_cursor(self._key(rows[-1], state['sort'])) if rows and has_next else None
+        prev_cursor = encode_cursor(self._key(rows[0], state['sort'])) if rows and has_prev else None
+        options = [(name, option[2]) for name, option in self.sort_options.items()]
+        return Page(rows, state['sort'], state['order'], page_size,
+                    next_cursor=next_cursor, prev_cursor=prev_cursor, sort_options=options)
+
+    def fetch(self, cur, query, params, group_by='', args=None):
+        """Parse the request, run the paged query and return a Page"""
+        state = self.parse(args)
+        sql, sql_params = self.build(query, params, state, group_by=group_by)
+        cur.execute(sql, sql_params)
+        return self.page(cur.fetchall(), state)
@@ -0,0 +1,212 @@
+"""
+Payroll Data Export for Lumorange Management System
+Background export of payroll runs and entries for a date range to gzipped CSV or Parquet
+"""
+
+import csv
+import glob
+import gzip
+import importlib.util
+import os
+import tempfile
+import time
+from datetime import date
+
+from csv_export import stream_query
+
+# pyarrow is optional and slow to import, so it is only loaded by a Parquet export
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Runs without entries are exported too, as a single row with empty entry columns
+PAYROLL_EXPORT_QUERY = """
+    SELECT pr.id, pr.run_name, pr.pay_date, pr.pay_period_start, pr.pay_period_end, pr.status,
+           e.employee_id, COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name), e.email,
+           pe.basic_salary, pe.allowances, pe.gross_pay, pe.total_deductions, pe.net_pay
+    FROM payroll_runs pr
+    LEFT JOIN payroll_entries pe ON pe.payroll_run_id = pr.id
+    LEFT JOIN employees e ON pe.employee_id = e.id
+    WHERE pr.pay_date BETWEEN %s AND %s
+    ORDER BY pr.pay_date, pr.id, pe.id
+"""
+
+PAYROLL_EXPORT_COUNT = """
+    SELECT COUNT(*)
+    FROM payroll_runs pr
+    LEFT JOIN payroll_entries pe ON pe.payroll_run_id = pr.id
+    WHERE pr.pay_date BETWEEN %s AND %s
+"""
+
+EXPORT_COLUMNS = ('run_id', 'run_name', 'pay_date', 'pay_period_start', 'pay_period_end', 'run_status',
+                  'employee_code', 'employee_name', 'email',
+                  'basic_salary', 'allowances', 'gross_pay', 'total_deductions', 'net_pay')
+
+EXTENSIONS = {
+    'csv': 'csv.gz',
+    'parquet': 'parquet',
+}
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    amount = pa.decimal128(12, 2)
+    return pa.schema([
+        ('run_id', pa.int32()), ('run_name', pa.string()),
+        ('pay_date', pa.date32()), ('pay_period_start', pa.date32()), ('pay_period_end', pa.date32()),
+        ('run_status', pa.string()),
+        ('employee_code', pa.string()), ('employee_name', pa.string()), ('email', pa.string()),
+        ('basic_salary', amount), ('allowances', amount), ('gross_pay', amount),
+        ('total_deductions', amount), ('net_pay', amount),
+    ])
+
+
+class PayrollExporter:
+    """Writes payroll history for a pay-date range to a compressed file in a background job
+
+    Rows are read in chunks from an unbuffered cursor on a second pooled
+    connection (the job's own connection stays free for progress updates)
+    and appended to the output as they arrive: gzip-compressed CSV, or
+    Parquet with one row group per chunk when pyarrow is installed. The file
+    is written under a temporary name and renamed once complete; exports
+    older than PAYROLL_EXPORT_RETENTION_DAYS are removed as new ones start.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.export_dir = None
+        self.chunk_rows = 5000
+        self.retention_days = 7
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('PAYROLL_EXPORT_DIR', os.path.join(app.root_path, 'exports', 'payroll'))
+        app.config.setdefault('PAYROLL_EXPORT_CHUNK_ROWS', 5000)
+        app.config.setdefault('PAYROLL_EXPORT_RETENTION_DAYS', 7)
+        self.mysql = mysql
+        self.export_dir = app.config['PAYROLL_EXPORT_DIR']
+        self.chunk_rows = app.config['PAYROLL_EXPORT_CHUNK_ROWS']
+        self.retention_days = app.config['PAYROLL_EXPORT_RETENTION_DAYS']
+        app.extensions['payroll_export'] = self
+
+    def formats(self):
+        """Export formats available in this installation"""
+        return ('csv', 'parquet') if PARQUET_AVAILABLE else ('csv',)
+
+    def payload(self, date_from, date_to, export_format):
+        """Validated job payload; raises ValueError with a user-facing message"""
+        try:
+            start = date.fromisoformat(date_from or '')
+            end = date.fromisoformat(date_to or '')
+        except ValueError:
+            raise ValueError('Please provide a valid date range')
+        if start > end:
+            raise ValueError('The start date must be before the end date')
+        if export_format not in self.formats():
+            raise ValueError(f"Unsupported export format: {export_format}")
+        return {'date_from': start.isoformat(), 'date_to': end.isoformat(), 'format': export_format}
+
+    def path_for(self, filename):
+        """Absolute path of a finished export that is still on disk, else None"""
+        if os.path.basename(filename or '') != filename or not filename.startswith('payroll_export_'):
+            return None
+        path = os.path.join(self.export_dir, filename)
+        return path if os.path.exists(path) else None
+
+    def run_job(self, ctx):
+        """Background job handler for 'payroll_export' jobs"""
+        date_from = ctx.payload['date_from']
+        date_to = ctx.payload['date_to']
+        export_format = ctx.payload['format']
+        filename = (f"payroll_export_{ctx.job_id}_{date_from.replace('-', '')}_"
+                    f"{date_to.replace('-', '')}.{EXTENSIONS[export_format]}")
+
+        cur = ctx.connection.cursor()
+        cur.execute(PAYROLL_EXPORT_COUNT, (date_from, date_to))
+        total = cur.fetchone()[0]
+        cur.close()
+
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.prune()
+        fd, tmp_path = tempfile.mkstemp(dir=self.export_dir, prefix='.partial-')
+        os.close(fd)
+        reported = [0]
+
+        def on_chunk(done):
+            percent = min(99, done * 100 // total) if total else 99
+            # Commit progress only when the visible percentage moves
+            if percent > reported[0]:
+                reported[0] = percent
+                ctx.progress(percent)
+
+        try:
+            stream = stream_query(self.mysql, PAYROLL_EXPORT_QUERY, (date_from, date_to),
+                                  chunk_rows=self.chunk_rows)
+            try:
+                if export_format == 'parquet':
+                    rows, runs = self._write_parquet(stream, tmp_path, on_chunk)
+                else:
+                    rows, runs = self._write_csv(stream, tmp_path, on_chunk)
+            finally:
+                stream.close()
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, os.path.join(self.export_dir, filename))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return {
+            'filename': filename,
+            'format': export_format,
+            'date_from': date_from,
+            'date_to': date_to,
+            'rows': rows,
+            'runs': runs,
+            'bytes': os.path.getsize(os.path.join(self.export_dir, filename)),
+        }
+
+    def _write_csv(self, stream, path, on_chunk):
+        rows = 0
+        run_ids = set()
+        with gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=6) as output:
+            writer = csv.writer(output)
+            writer.writerow(EXPORT_COLUMNS)
+            for chunk in stream:
+                writer.writerows(chunk)
+                run_ids.update(row[0] for row in chunk)
+                rows += len(chunk)
+                on_chunk(rows)
+        return rows, len(run_ids)
+
+    def _write_parquet(self, stream, path, on_chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = 0
+        run_ids = set()
+        schema = parquet_schema()
+        with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+            for chunk in stream:
+                columns = list(zip(*chunk))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema))
+                run_ids.update(columns[0])
+                rows += len(chunk)
+                on_chunk(rows)
+            if not rows:
+                writer.write_table(schema.empty_table())
+        return rows, len(run_ids)
+
+    def prune(self):
+        """Delete exports (and leftovers of crashed jobs) past the retention period"""
+        cutoff = time.time() - self.retention_days * 86400
+        paths = (glob.glob(os.path.join(self.export_dir, 'payroll_export_*')) +
+                 glob.glob(os.path.join(self.export_dir, '.partial-*')))
+        for path in paths:
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError as e:
+                print(f"Error removing old payroll export {path}: {e}")
@@ -0,0 +1,138 @@
+"""
+Payroll Generation for Lumorange Management System
+Set-based creation of payroll entries and run totals
+"""
+
+# One entry per active employee with an active salary, computed in the database
+PAYROLL_ENTRIES_INSERT = """
+    INSERT INTO payroll_entries
+    (payroll_run_id, employee_id, salary_id, basic_salary, allowances, gross_pay,
+     total_deductions, net_pay)
+    SELECT %s, e.id, s.id, s.basic_salary, COALESCE(s.allowances, 0),
+           (s.basic_salary + COALESCE(s.allowances, 0)),
+           COALESCE(s.deductions, 0),
+           (s.basic_salary + COALESCE(s.allowances, 0) - COALESCE(s.deductions, 0))
+    FROM employees e
+    JOIN salaries s ON e.id = s.employee_id
+    WHERE e.status = 'active' AND s.is_active = 1
+"""
+
+PAYROLL_RUN_TOTALS_UPDATE = """
+    UPDATE payroll_runs pr
+    JOIN (
+        SELECT COUNT(*) as total_employees,
+               COALESCE(SUM(gross_pay), 0) as total_gross_pay,
+               COALESCE(SUM(total_deductions), 0) as total_deductions,
+               COALESCE(SUM(net_pay), 0) as total_net_pay
+        FROM payroll_entries
+        WHERE payroll_run_id = %s
+    ) t
+    SET pr.total_employees = t.total_employees,
+        pr.total_gross_pay = t.total_gross_pay,
+        pr.total_deductions = t.total_deductions,
+        pr.total_net_pay = t.total_net_pay
+    WHERE pr.id = %s
+"""
+
+
+# Chunked variant used by the background job: keyset on salary id so every
+# salary row lands in exactly one chunk
+PAYROLL_ENTRIES_CHUNK_INSERT = PAYROLL_ENTRIES_INSERT.rstrip() + """
+      AND s.id > %s
+    ORDER BY s.id
+    LIMIT %s
+"""
+
+PAYROLL_ELIGIBLE_COUNT = """
+    SELECT COUNT(*)
+    FROM employees e
+    JOIN salaries s ON e.id = s.employee_id
+    WHERE e.status = 'active' AND s.is_active = 1
+"""
+
+PAYROLL_CHUNK_SIZE = 500
+
+
+def generate_payroll_entries(cur, payroll_run_id):
+    """Fill a payroll run with one INSERT ... SELECT and aggregate its totals
+
+    Two statements regardless of headcount, so the transaction stays short.
+    Returns the number of entries created; the caller commits.
+    """
+    cur.execute(PAYROLL_ENTRIES_INSERT, (payroll_run_id,))
+    created = cur.rowcount
+    refresh_payroll_totals(cur, payroll_run_id)
+    return created
+
+
+def refresh_payroll_totals(cur, payroll_run_id):
+    """Recompute a run's totals from its entries"""
+    cur.execute(PAYROLL_RUN_TOTALS_UPDATE, (payroll_run_id, payroll_run_id))
+
+
+def generate_payroll_entries_chunked(cur, payroll_run_id, chunk_size=PAYROLL_CHUNK_SIZE, on_chunk=None):
+    """INSERT ... SELECT in chunks of `chunk_size` salary rows
+
+    `on_chunk(done, total)` runs after each chunk, typically to commit and
+    report progress. Returns the number of entries created.
+    """
+    cur.execute(PAYROLL_ELIGIBLE_COUNT)
+    total = cur.fetchone()[0]
+    done = 0
+    last_salary_id = 0
+    while True:
+        cur.execute(PAYROLL_ENTRIES_CHUNK_INSERT, (payroll_run_id, last_salary_id, chunk_size))
+        inserted = cur.rowcount
+        if inserted <= 0:
+            break
+        done += inserted
+        cur.execute("SELECT MAX(salary_id) FROM payroll_entries WHERE payroll_run_id = %s",
+                    (payroll_run_id,))
+        last_salary_id = cur.fetchone()[0]
+        if on_chunk:
+            on_chunk(done, max(total, done))
+        if inserted < chunk_size:
+            break
+    return done
+
+
+def run_payroll_job(ctx):
+    """Background job handler for 'payroll_run' jobs
+
+    Entries are committed chunk by chunk so no transaction stays open for the
+    whole run. On failure the partial entries are removed and the run is
+    marked cancelled.
+    """
+    payroll_run_id = ctx.payload['payroll_run_id']
+    conn = ctx.connection
+    cur = conn.cursor()
+    try:
+        # A retried job starts from a clean slate
+        cur.execute("DELETE FROM payroll_entries WHERE payroll_run_id = %s", (payroll_run_id,))
+        cur.execute("UPDATE payroll_runs SET status = 'processing', progress_percent = 0 WHERE id = %s",
+                    (payroll_run_id,))
+        ctx.progress(0)
+
+        def on_chunk(done, total):
+            percent = min(99, done * 100 // total) if total else 99
+            cur.execute("UPDATE payroll_runs SET progress_percent = %s WHERE id = %s",
+                        (percent, payroll_run_id))
+            ctx.progress(percent)
+
+        created = generate_payroll_entries_chunked(cur, payroll_run_id, on_chunk=on_chunk)
+        refresh_payroll_totals(cur, payroll_run_id)
+        cur.execute("""
+            UPDATE payroll_runs SET status = 'draft', progress_percent = 100, updated_date = NOW()
+            WHERE id = %s
+        """, (payroll_run_id,))
+        conn.commit()
+        return {'payroll_run_id': payroll_run_id, 'entries_created': created}
+    except Exception:
+        conn.rollback()
+        cur.execute("DELETE FROM payroll_entries WHERE payroll_run_id = %s", (payroll_run_id,))
+        cur.execute("UPDATE payroll_runs SET status = 'cancelled', updated_date = NOW() WHERE id = %s",
+                    (payroll_run_id,))
+        conn.commit()
+        raise
+    finally:
+        cur.close()
@@ -0,0 +1,298 @@
+"""
+Payroll Reports for Lumorange Management System
+Streams payroll run reports as CSV or XLSX, caching completed runs on disk
+"""
+
+import csv
+import glob
+import io
+import os
+import re
+import tempfile
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from flask import send_file
+from werkzeug.utils import secure_filename
+
+from csv_export import drain_buffer, stream_query, streaming_response
+
+PAYROLL_REPORT_QUERY = """
+    SELECT e.employee_id,
+           COALESCE(CONCAT(e.first_name, ' ', e.last_name), e.name),
+           e.email,
+           pe.basic_salary, pe.allowances, pe.gross_pay, pe.total_deductions, pe.net_pay
+    FROM payroll_entries pe
+    JOIN employees e ON pe.employee_id = e.id
+    WHERE pe.payroll_run_id = %s
+    ORDER BY e.name, pe.id
+"""
+
+REPORT_HEADER = ('Employee Code', 'Employee Name', 'Email',
+                 'Basic Salary', 'Allowances', 'Gross Pay', 'Deductions', 'Net Pay')
+# Columns before this one are text, the rest are amounts
+FIRST_AMOUNT_COLUMN = 3
+
+FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Runs whose entries can no longer change, so their reports can be kept
+IMMUTABLE_STATUSES = ('completed',)
+
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _totals_row(totals):
+    return ('', 'Total', '') + tuple(totals)
+
+
+def _add_to_totals(totals, row):
+    for i, value in enumerate(row[FIRST_AMOUNT_COLUMN:]):
+        if value is not None:
+            totals[i] += value
+
+
+def csv_report(stream):
+    """CSV body for the report rows in a QueryStream, ending with a totals row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    totals = [Decimal('0')] * (len(REPORT_HEADER) - FIRST_AMOUNT_COLUMN)
+    try:
+        writer.writerow(REPORT_HEADER)
+        yield drain_buffer(buffer).encode('utf-8')
+        for rows in stream:
+            for row in rows:
+                writer.writerow(row)
+                _add_to_totals(totals, row)
+            yield drain_buffer(buffer).encode('utf-8')
+        writer.writerow(_totals_row(totals))
+        yield drain_buffer(buffer).encode('utf-8')
+    finally:
+        stream.close()
+
+
+# Minimal SpreadsheetML package: one sheet, inline strings, three cell styles
+# (0 default, 1 bold header, 2 amounts shown as #,##0.00)
+_XLSX_PARTS = (
+    ('[Content_Types].xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '<Override PartName="/xl/styles.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+     '</Types>'),
+    ('_rels/.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ('xl/_rels/workbook.xml.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+     'Target="worksheets/sheet1.xml"/>'
+     '<Relationship Id="rId2" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+     'Target="styles.xml"/>'
+     '</Relationships>'),
+    ('xl/workbook.xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+     'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+     '<sheets><sheet name="Payroll" sheetId="1" r:id="rId1"/></sheets>'
+     '</workbook>'),
+    ('xl/styles.xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+     '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+     '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+     '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+     '<fill><patternFill patternType="gray125"/></fill></fills>'
+     '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+     '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+     '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+     '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+     '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+     '</styleSheet>'),
+)
+
+_SHEET_HEAD = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+               '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+               '<sheetViews><sheetView workbookViewId="0">'
+               '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+               '</sheetView></sheetViews>'
+               '<cols><col min="1" max="1" width="16" customWidth="1"/>'
+               '<col min="2" max="3" width="30" customWidth="1"/>'
+               '<col min="4" max="8" width="14" customWidth="1"/></cols>'
+               '<sheetData>')
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _xlsx_row(values, text_style=0):
+    cells = []
+    for i, value in enumerate(values):
+        if value is None or value == '':
+            cells.append('<c/>')
+        elif i >= FIRST_AMOUNT_COLUMN and not isinstance(value, str):
+            cells.append(f'<c s="2"><v>{value}</v></c>')
+        else:
+            text = escape(_XML_ILLEGAL.sub('', str(value)))
+            cells.append(f'<c t="inlineStr" s="{text_style}"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+class _Sink:
+    """Write-only file object that collects what zipfile writes until drained
+
+    It has no tell()/seek(), so zipfile streams entries with data
+    descriptors instead of seeking back to patch local headers.
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def xlsx_report(stream):
+    """XLSX body for the report rows in a QueryStream, written as a zip stream
+
+    The worksheet is deflated row chunk by row chunk, so only the
+    compressor's window is held in memory, never the whole sheet.
+    """
+    sink = _Sink()
+    totals = [Decimal('0')] * (len(REPORT_HEADER) - FIRST_AMOUNT_COLUMN)
+    try:
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, xml in _XLSX_PARTS:
+                archive.writestr(name, xml)
+            with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                sheet.write((_SHEET_HEAD + _xlsx_row(REPORT_HEADER, text_style=1)).encode('utf-8'))
+                yield sink.drain()
+                for rows in stream:
+                    for row in rows:
+                        _add_to_totals(totals, row)
+                    sheet.write(''.join(_xlsx_row(row) for row in rows).encode('utf-8'))
+                    yield sink.drain()
+                sheet.write((_xlsx_row(_totals_row(totals), text_style=1) + _SHEET_TAIL).encode('utf-8'))
+        yield sink.drain()
+    finally:
+        stream.close()
+
+
+WRITERS = {
+    'csv': csv_report,
+    'xlsx': xlsx_report,
+}
+
+
+class PayrollReports:
+    """Payroll run downloads, streamed straight from an unbuffered cursor
+
+    Entries are read from their own pooled connection in chunks and written
+    out row by row, so a run of any size starts downloading immediately and
+    memory stays flat. Reports for completed runs are also saved as they
+    stream (to a temporary file, renamed into place once the download
+    finishes) and later requests are served from that file. The cache key
+    includes the run's updated_date, so a status change makes a new report.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.cache_dir = None
+        self.chunk_rows = 500
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('PAYROLL_REPORT_CACHE_DIR', os.path.join(app.root_path, 'cache', 'payroll_reports'))
+        app.config.setdefault('PAYROLL_REPORT_CHUNK_ROWS', 500)
+        self.mysql = mysql
+        self.cache_dir = app.config['PAYROLL_REPORT_CACHE_DIR']
+        self.chunk_rows = app.config['PAYROLL_REPORT_CHUNK_ROWS']
+        app.extensions['payroll_reports'] = self
+
+    def cacheable(self, payroll_run):
+        return payroll_run['status'] in IMMUTABLE_STATUSES and payroll_run.get('updated_date') is not None
+
+    def cache_key(self, payroll_run, report_format):
+        stamp = payroll_run['updated_date'].strftime('%Y%m%d%H%M%S')
+        return f"payroll_{payroll_run['id']}_{stamp}.{report_format}"
+
+    def download_name(self, payroll_run, report_format):
+        name = secure_filename(payroll_run.get('run_name') or '') or f"run_{payroll_run['id']}"
+        return f"payroll_{name}.{report_format}"
+
+    def response(self, payroll_run, report_format):
+        """Response for a payroll run dict (id, run_name, status, updated_date)"""
+        mimetype = FORMATS[report_format]
+        download_name = self.download_name(payroll_run, report_format)
+        cache_path = None
+        if self.cacheable(payroll_run):
+            key = self.cache_key(payroll_run, report_format)
+            cache_path = os.path.join(self.cache_dir, key)
+            if os.path.exists(cache_path):
+                response = send_file(cache_path, mimetype=mimetype, as_attachment=True,
+                                     download_name=download_name, conditional=True, etag=key, max_age=0)
+                response.cache_control.public = False
+                response.cache_control.private = True
+                return response
+
+        stream = stream_query(self.mysql, PAYROLL_REPORT_QUERY, (payroll_run['id'],), chunk_rows=self.chunk_rows)
+        body = WRITERS[report_format](stream)
+        if cache_path is not None:
+            body = self._save_while_streaming(body, cache_path, payroll_run['id'], report_format)
+        return streaming_response(body, mimetype, download_name, on_close=stream.close)
+
+    def _save_while_streaming(self, body, cache_path, payroll_id, report_format):
+        """Pass `body` through, keeping a copy that becomes the cache entry if it completes"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.partial-')
+        completed = False
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in body:
+                    tmp.write(chunk)
+                    yield chunk
+            os.chmod(tmp_path, 0o644)
+            # Concurrent downloads of the same report each replace it atomically
+            os.replace(tmp_path, cache_path)
+            completed = True
+        finally:
+            body.close()
+            if not completed and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self.invalidate(payroll_id, report_format, keep=cache_path)
+
+    def invalidate(self, payroll_id, report_format=None, keep=None):
+        """Remove cached reports for a run (e.g. when it is deleted)"""
+        if not self.cache_dir:
+            return
+        extension = report_format or '*'
+        for path in glob.glob(os.path.join(self.cache_dir, f"payroll_{int(payroll_id)}_*.{extension}")):
+            if path != keep:
+                try:
+                    os.unlink(path)
+                except OSError as e:
+                    print(f"Error removing cached payroll report {path}: {e}")
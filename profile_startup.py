@@ -0,0 +1,108 @@
+"""
+Startup Import Profiler
+Imports the app in fresh interpreters with `python -X importtime`, the way a
+new worker starts, and reports the slowest modules (own and cumulative time)
+and what each of app.py's direct imports costs. Fails (exit code 1) when the
+median `import app` time is over the budget or when a module that should
+load on demand - a blueprint's views, NumPy, pyarrow, Pillow - was imported at
+startup, so it can run as a regression check before deploying.
+
+Usage: python profile_startup.py [budget_ms] [runs] [top]
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 600
+
+# Imported on first use only; finding one of these at startup is a regression
+LAZY_MODULES = (
+    'blueprints.employees',
+    'blueprints.projects',
+    'blueprints.invoicing',
+    'blueprints.payroll',
+    'blueprints.expenses',
+    'blueprints.recruitment',
+    'numpy',
+    'pyarrow',
+    'PIL',
+)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def profile_import(module):
+    """One cold import in a new interpreter; returns [(name, self_us, cumulative_us, depth)]"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def is_lazy(name):
+    return any(name == lazy or name.startswith(lazy + '.') for lazy in LAZY_MODULES)
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    top = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+
+    # The first run also writes the .pyc files; a restarted worker finds them in place
+    profile_import('app')
+    samples = [profile_import('app') for _ in range(runs)]
+    totals_ms = [next(cum for name, _, cum, depth in run if name == 'app' and depth == 0) / 1000
+                 for run in samples]
+    median_ms = statistics.median(totals_ms)
+    # The run closest to the median stands for the rest in the tables below
+    modules = min(zip(totals_ms, samples), key=lambda pair: abs(pair[0] - median_ms))[1]
+
+    print(f"🚀 import app: median {median_ms:.0f}ms over {runs} runs "
+          f"(min {min(totals_ms):.0f}ms, max {max(totals_ms):.0f}ms), {len(modules)} modules")
+
+    print(f"\nSlowest modules by own time (top {top})")
+    print(f"{'Self':>9} {'Cumulative':>11}  Module")
+    print("-" * 60)
+    for name, self_us, cumulative_us, _ in sorted(modules, key=lambda row: row[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:>7.1f}ms {cumulative_us / 1000:>9.1f}ms  {name}")
+
+    # Imports are listed after their children: app.py's own imports are the
+    # depth-1 rows between the previous top-level module and app itself
+    app_index = next(i for i, row in enumerate(modules) if row[0] == 'app' and row[3] == 0)
+    start = max((i for i in range(app_index) if modules[i][3] == 0), default=-1) + 1
+    direct = [row for row in modules[start:app_index] if row[3] == 1]
+    app_self_ms = modules[app_index][1] / 1000
+    print(f"\nWhat app.py's direct imports cost (app.py itself: {app_self_ms:.1f}ms)")
+    print(f"{'Cumulative':>11}  Module")
+    print("-" * 60)
+    for name, _, cumulative_us, _ in sorted(direct, key=lambda row: row[2], reverse=True):
+        print(f"{cumulative_us / 1000:>9.1f}ms  {name}")
+
+    failed = False
+    eager = sorted({name for name, _, _, _ in modules if is_lazy(name)})
+    if eager:
+        print(f"\n❌ Imported at startup but meant to load on demand: {', '.join(eager)}")
+        failed = True
+    else:
+        print("\n✅ Blueprint views and optional heavy dependencies stay unloaded until needed")
+    if median_ms > budget_ms:
+        print(f"❌ Startup import takes {median_ms:.0f}ms, over the {budget_ms:.0f}ms budget")
+        failed = True
+    else:
+        print(f"✅ Startup import within budget ({median_ms:.0f}ms of {budget_ms:.0f}ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+SQL Query Instrumentation for Lumorange Management System
+Per-request query counts and timings, Server-Timing headers and a slow-query log
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from flask import g, has_request_context, request
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _params_shape(params):
+    """Describe bound parameters without logging their (possibly sensitive) values"""
+    if params is None:
+        return 'none'
+    if isinstance(params, dict):
+        return f'dict[{len(params)}]'
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (list, tuple, dict)):
+            return f'{type(params).__name__}[{len(params)}x{len(params[0])}]'
+        return f'{type(params).__name__}[{len(params)}]'
+    return type(params).__name__
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times execute/executemany/callproc calls"""
+
+    def __init__(self, cursor, instrumentation):
+        self._cursor = cursor
+        self._instrumentation = instrumentation
+
+    def _timed(self, statement, params, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._instrumentation.record(statement, params, self._cursor.rowcount, elapsed_ms)
+
+    def execute(self, query, args=None):
+        return self._timed(query, args, self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._timed(query, args, self._cursor.executemany, query, args)
+
+    def callproc(self, procname, args=()):
+        return self._timed(f'CALL {procname}', args, self._cursor.callproc, procname, args)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are instrumented"""
+
+    def __init__(self, connection, instrumentation):
+        self._connection = connection
+        self._instrumentation = instrumentation
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._instrumentation)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class QueryInstrumentation:
+    """Records every statement executed during a request
+
+    - totals are attached to the response as a Server-Timing header
+    - statements slower than SQL_SLOW_QUERY_MS go to a rotating log file
+    - per-endpoint totals are kept in memory for /api/db/instrumentation
+    - can be switched on and off at runtime without a restart
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.enabled = True
+        self.slow_query_ms = 200
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._slow_logger = None
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('SQL_INSTRUMENTATION_ENABLED', True)
+        app.config.setdefault('SQL_SLOW_QUERY_MS', 200)
+        app.config.setdefault('SQL_SLOW_QUERY_LOG', os.path.join('logs', 'slow_queries.log'))
+        app.config.setdefault('SQL_SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024)
+        app.config.setdefault('SQL_SLOW_QUERY_LOG_BACKUPS', 5)
+        self.app = app
+        self.enabled = app.config['SQL_INSTRUMENTATION_ENABLED']
+        self.slow_query_ms = app.config['SQL_SLOW_QUERY_MS']
+        app.extensions['sql_instrumentation'] = self
+
+        mysql.connection_hooks.append(self._wrap_connection)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def configure(self, enabled=None, slow_query_ms=None):
+        """Runtime toggle used by the admin endpoint"""
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if slow_query_ms is not None:
+            self.slow_query_ms = float(slow_query_ms)
+
+    def _wrap_connection(self, connection):
+        if not self.enabled or not has_request_context():
+            return connection
+        return InstrumentedConnection(connection, self)
+
+    def _start_request(self):
+        if self.enabled:
+            g._sql_queries = []
+            g._sql_request_started = time.perf_counter()
+
+    def record(self, statement, params, rowcount, elapsed_ms):
+        queries = g.get('_sql_queries')
+        if queries is None:
+            return
+        if isinstance(statement, bytes):
+            statement = statement.decode('utf-8', 'replace')
+        entry = {
+            'statement': _WHITESPACE.sub(' ', statement).strip(),
+            'params': _params_shape(params),
+            'rows': rowcount,
+            'ms': round(elapsed_ms, 3),
+        }
+        queries.append(entry)
+        if elapsed_ms >= self.slow_query_ms:
+            self._log_slow(entry)
+
+    def _log_slow(self, entry):
+        logger = self._slow_logger or self._open_slow_log()
+        logger.warning("%.1fms endpoint=%s rows=%s params=%s sql=%s",
+                       entry['ms'], request.endpoint, entry['rows'], entry['params'],
+                       entry['statement'])
+
+    def _open_slow_log(self):
+        with self._lock:
+            if self._slow_logger is None:
+                path = self.app.config['SQL_SLOW_QUERY_LOG']
+                if os.path.dirname(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                handler = RotatingFileHandler(
+                    path,
+                    maxBytes=self.app.config['SQL_SLOW_QUERY_LOG_MAX_BYTES'],
+                    backupCount=self.app.config['SQL_SLOW_QUERY_LOG_BACKUPS'])
+                handler.setFormatter(logging.Formatter('%(asctime)s pid=%(process)d %(message)s'))
+                logger = logging.getLogger('lumorange.slow_sql')
+                logger.setLevel(logging.WARNING)
+                logger.propagate = False
+                logger.addHandler(handler)
+                self._slow_logger = logger
+        return self._slow_logger
+
+    def _finish_request(self, response):
+        queries = g.pop('_sql_queries', None)
+        if queries is None:
+            return response
+        total_ms = (time.perf_counter() - g.pop('_sql_request_started')) * 1000
+        db_ms = sum(q['ms'] for q in queries)
+
+        timing = f'db;dur={db_ms:.1f};desc="{len(queries)} queries", app;dur={total_ms:.1f}'
+        existing = response.headers.get('Server-Timing')
+        response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        endpoint = request.endpoint or '<unmatched>'
+        with self._lock:
+            totals = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'db_ms': 0.0, 'max_queries': 0, 'max_db_ms': 0.0})
+            totals['requests'] += 1
+            totals['queries'] += len(queries)
+            totals['db_ms'] += db_ms
+            totals['max_queries'] = max(totals['max_queries'], len(queries))
+            totals['max_db_ms'] = max(totals['max_db_ms'], db_ms)
+        return response
+
+    def stats(self):
+        """Per-endpoint totals, busiest first"""
+        with self._lock:
+            endpoints = {name: dict(values) for name, values in self._endpoints.items()}
+        for values in endpoints.values():
+            values['avg_queries'] = round(values['queries'] / values['requests'], 2)
+            values['avg_db_ms'] = round(values['db_ms'] / values['requests'], 2)
+            values['db_ms'] = round(values['db_ms'], 2)
+            values['max_db_ms'] = round(values['max_db_ms'], 2)
+        return {
+            'enabled': self.enabled,
+            'slow_query_ms': self.slow_query_ms,
+            'endpoints': dict(sorted(endpoints.items(), key=lambda item: item[1]['db_ms'], reverse=True)),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
@@ -0,0 +1,200 @@
+"""
+Receipt Storage for Lumorange Management System
+Content-addressed, deduplicated receipt files with lazily generated thumbnails
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Pillow is optional; it is imported by the first thumbnail, not at startup
+PILLOW_AVAILABLE = importlib.util.find_spec('PIL') is not None
+
+ALLOWED_CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.pdf': 'application/pdf',
+}
+
+# Derived images: name -> longest edge in pixels
+VARIANTS = {
+    'thumbnail': 256,
+    'preview': 1024,
+}
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ReceiptError(ValueError):
+    """Upload rejected: unsupported type or too large"""
+
+
+class StoredReceipt:
+    """What store() returns; the attributes map onto the expense_reports columns"""
+
+    __slots__ = ('sha256', 'path', 'filename', 'content_type', 'size', 'deduplicated')
+
+    def __init__(self, sha256, path, filename, content_type, size, deduplicated):
+        self.sha256 = sha256
+        self.path = path
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.deduplicated = deduplicated
+
+
+class ReceiptStorage:
+    """Stores receipts under their SHA-256 in a two-level sharded tree
+
+        <root>/ab/cd/abcd...ef        original bytes
+        <root>/thumbnail/ab/cd/...jpg derived images, made on demand
+
+    Uploads are copied to a temporary file in chunks while being hashed,
+    then renamed into place, or dropped if that content is already stored,
+    so identical receipts occupy disk once. Files never change once
+    written, which lets them be served with a permanent ETag and long cache
+    lifetime. Thumbnails and previews need Pillow and are rendered by a
+    small thread pool: the thumbnail right after upload, anything else the
+    first time it is requested.
+    """
+
+    def __init__(self, app=None):
+        self.root = None
+        self.max_bytes = 5 * 1024 * 1024
+        self.chunk_size = 64 * 1024
+        self.workers = 2
+        self._executor = None
+        self._pid = None
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RECEIPT_STORAGE_ROOT', os.path.join(app.root_path, 'uploads', 'receipts'))
+        app.config.setdefault('RECEIPT_MAX_BYTES', 5 * 1024 * 1024)
+        app.config.setdefault('RECEIPT_CHUNK_SIZE', 64 * 1024)
+        app.config.setdefault('RECEIPT_THUMBNAIL_WORKERS', 2)
+        self.root = app.config['RECEIPT_STORAGE_ROOT']
+        self.max_bytes = app.config['RECEIPT_MAX_BYTES']
+        self.chunk_size = app.config['RECEIPT_CHUNK_SIZE']
+        self.workers = app.config['RECEIPT_THUMBNAIL_WORKERS']
+        app.extensions['receipt_storage'] = self
+
+    def path_for(self, sha256, variant=None):
+        if not SHA256_PATTERN.match(sha256 or ''):
+            raise ReceiptError('Invalid receipt id')
+        shard = os.path.join(sha256[:2], sha256[2:4])
+        if variant is None:
+            return os.path.join(self.root, shard, sha256)
+        return os.path.join(self.root, variant, shard, f"{sha256}.jpg")
+
+    def store(self, file_storage):
+        """Stream an uploaded file into the store; returns a StoredReceipt"""
+        filename = os.path.basename(file_storage.filename or '')
+        extension = os.path.splitext(filename)[1].lower()
+        content_type = ALLOWED_CONTENT_TYPES.get(extension)
+        if content_type is None:
+            raise ReceiptError(f"Unsupported receipt type: {extension or 'unknown'}")
+
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                stream = file_storage.stream
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ReceiptError(f"Receipt is larger than {self.max_bytes // (1024 * 1024)}MB")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            sha256 = digest.hexdigest()
+            final_path = self.path_for(sha256)
+            deduplicated = os.path.exists(final_path)
+            if deduplicated:
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.chmod(tmp_path, 0o644)
+                # Atomic: readers see the whole file or nothing
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        if content_type.startswith('image/'):
+            self.schedule(sha256, 'thumbnail')
+        relative_path = os.path.relpath(final_path, self.root)
+        return StoredReceipt(sha256, relative_path, filename, content_type, size, deduplicated)
+
+    def exists(self, sha256, variant=None):
+        return os.path.exists(self.path_for(sha256, variant))
+
+    def _ensure_executor(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='lumorange-receipts')
+                    self._in_flight = {}
+                    self._pid = os.getpid()
+        return self._executor
+
+    def schedule(self, sha256, variant):
+        """Queue a derived image unless it exists or is already being made
+
+        Only call it for image receipts. Returns False when Pillow is missing.
+        """
+        if not PILLOW_AVAILABLE or variant not in VARIANTS:
+            return False
+        if self.exists(sha256, variant):
+            return True
+        executor = self._ensure_executor()
+        key = (sha256, variant)
+        with self._lock:
+            if key in self._in_flight:
+                return True
+            future = self._in_flight[key] = executor.submit(self._render, sha256, variant)
+        future.add_done_callback(lambda _: self._finished(key))
+        return True
+
+    def _finished(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def _render(self, sha256, variant):
+        from PIL import Image
+
+        source = self.path_for(sha256)
+        target = self.path_for(sha256, variant)
+        try:
+            with Image.open(source) as image:
+                image.thumbnail((VARIANTS[variant], VARIANTS[variant]))
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.jpg')
+                with os.fdopen(fd, 'wb') as tmp:
+                    image.save(tmp, 'JPEG', quality=85, optimize=True)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, target)
+        except Exception as e:
+            print(f"Error rendering receipt {variant} for {sha256}: {e}")
+
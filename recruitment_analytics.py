@@ -0,0 +1,466 @@
+"""
+Recruitment Analytics for Lumorange Management System
+Funnel, conversion, time-to-hire and per-position metrics from per-day aggregates
+
+Usage: python recruitment_analytics.py --rebuild
+"""
+
+import math
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+FUNNEL_STAGES = ['Applied', 'Screening', 'Interview', 'Offer', 'Hired']
+
+# Furthest funnel stage per application, counted by application date
+FUNNEL_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS recruitment_daily_funnel (
+        day DATE NOT NULL,
+        stage_rank TINYINT UNSIGNED NOT NULL,
+        applications INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, stage_rank)
+    )
+"""
+
+# Time-to-hire histogram per application date; whole days make percentiles exact
+HIRES_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS recruitment_daily_hires (
+        day DATE NOT NULL,
+        days_to_hire INT NOT NULL,
+        hires INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, days_to_hire)
+    )
+"""
+
+# Furthest funnel stage per application and job position, counted by application date
+POSITIONS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS recruitment_daily_positions (
+        day DATE NOT NULL,
+        job_position_id INT NOT NULL,
+        stage_rank TINYINT UNSIGNED NOT NULL,
+        applications INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, job_position_id, stage_rank)
+    )
+"""
+
+STATE_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS recruitment_analytics_state (
+        id TINYINT UNSIGNED PRIMARY KEY,
+        refreshed_at DATETIME NULL
+    )
+"""
+
+STATUS_RANK_SQL = """
+    CASE ja.status
+        WHEN 'Under Review' THEN 2
+        WHEN 'Shortlisted' THEN 2
+        WHEN 'Interview Scheduled' THEN 3
+        WHEN 'Interviewed' THEN 3
+        WHEN 'Selected' THEN 3
+        WHEN 'Offer Extended' THEN 4
+        WHEN 'Offer Declined' THEN 4
+        WHEN 'Offer Accepted' THEN 5
+        ELSE 1
+    END
+"""
+
+STAGE_RANK_SQL = """
+    CASE WHEN rp.stage_status = 'Skipped' THEN 0
+         WHEN rp.stage IN ('Resume Screening', 'Phone Screening', 'Technical Test') THEN 2
+         WHEN rp.stage IN ('Technical Interview', 'HR Interview', 'Management Interview',
+                           'Final Interview') THEN 3
+         WHEN rp.stage IN ('Background Check', 'Offer') THEN 4
+         WHEN rp.stage = 'Joined' THEN 5
+         WHEN rp.stage = 'Applied' THEN 1
+         ELSE 0
+    END
+"""
+
+# One row per application: its furthest stage and, once hired, how many days
+# it took. The hire date is the Joined stage, else the last Offer stage, else
+# the summed stage durations, else the day the status last changed.
+APPLICATION_FACTS = f"""
+    SELECT ja.application_date as day, ja.job_position_id,
+           GREATEST({STATUS_RANK_SQL}, COALESCE(p.pipeline_rank, 1)) as stage_rank,
+           CASE WHEN ja.status = 'Offer Accepted' OR p.pipeline_rank = 5 THEN
+               GREATEST(0, COALESCE(DATEDIFF(COALESCE(p.joined_date, p.offer_date), ja.application_date),
+                                    p.duration_days,
+                                    DATEDIFF(DATE(ja.updated_at), ja.application_date)))
+           END as days_to_hire
+    FROM job_applications ja
+    LEFT JOIN (
+        SELECT rp.application_id,
+               MAX({STAGE_RANK_SQL}) as pipeline_rank,
+               MIN(CASE WHEN rp.stage = 'Joined' THEN rp.stage_date END) as joined_date,
+               MAX(CASE WHEN rp.stage = 'Offer' THEN rp.stage_date END) as offer_date,
+               SUM(rp.duration_days) as duration_days
+        FROM recruitment_pipeline rp
+        {{pipeline_filter}}
+        GROUP BY rp.application_id
+    ) p ON p.application_id = ja.id
+    {{application_filter}}
+"""
+
+# Changes are looked for a little before the previous refresh so rows written by
+# transactions that were still open at that moment are not missed
+DIRTY_DAYS_QUERY = """
+    SELECT application_date FROM job_applications
+    WHERE updated_at >= %(since)s - INTERVAL %(overlap)s SECOND
+    UNION
+    SELECT ja.application_date
+    FROM recruitment_pipeline rp
+    JOIN job_applications ja ON ja.id = rp.application_id
+    WHERE rp.created_at >= %(since)s - INTERVAL %(overlap)s SECOND
+"""
+REFRESH_OVERLAP_SECONDS = 300
+
+RECENT_ACTIVITY_QUERY = """
+    SELECT * FROM (
+        (SELECT 'application' as kind, ja.created_at as happened_at, ja.status as detail,
+                CONCAT(c.first_name, ' ', c.last_name) as candidate_name, jp.position_title
+         FROM job_applications ja
+         JOIN candidates c ON c.id = ja.candidate_id
+         JOIN job_positions jp ON jp.id = ja.job_position_id
+         ORDER BY ja.created_at DESC
+         LIMIT %s)
+        UNION ALL
+        (SELECT 'stage' as kind, rp.created_at as happened_at, rp.stage as detail,
+                CONCAT(c.first_name, ' ', c.last_name) as candidate_name, jp.position_title
+         FROM recruitment_pipeline rp
+         JOIN job_applications ja ON ja.id = rp.application_id
+         JOIN candidates c ON c.id = ja.candidate_id
+         JOIN job_positions jp ON jp.id = ja.job_position_id
+         ORDER BY rp.created_at DESC
+         LIMIT %s)
+    ) activity
+    ORDER BY happened_at DESC
+    LIMIT %s
+"""
+
+STAGE_ACTIVITY_STYLES = {
+    'Joined': ('user-check', 'success'),
+    'Offer': ('handshake', 'warning'),
+    'Rejected': ('user-times', 'danger'),
+}
+
+TOP_POSITIONS_QUERY = """
+    SELECT jp.position_title,
+           COALESCE(d.name, 'No Department') as department_name,
+           SUM(p.applications) as application_count,
+           SUM(CASE WHEN p.stage_rank >= 3 THEN p.applications ELSE 0 END) as interview_count,
+           SUM(CASE WHEN p.stage_rank >= 4 THEN p.applications ELSE 0 END) as offer_count,
+           SUM(CASE WHEN p.stage_rank = 5 THEN p.applications ELSE 0 END) as hire_count
+    FROM recruitment_daily_positions p
+    JOIN job_positions jp ON jp.id = p.job_position_id
+    LEFT JOIN departments d ON d.id = jp.department_id
+    {where}
+    GROUP BY p.job_position_id, jp.position_title, d.name
+    ORDER BY hire_count DESC, application_count DESC
+    LIMIT %s
+"""
+
+# Days are recomputed in batches so the IN lists stay a sensible size
+REFRESH_DAY_BATCH = 200
+
+
+def percentile(histogram, fraction):
+    """Nearest-rank percentile of a sorted [(value, count), ...] histogram"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    target = max(1, math.ceil(total * fraction))
+    seen = 0
+    for value, count in histogram:
+        seen += count
+        if seen >= target:
+            return value
+    return histogram[-1][0]
+
+
+class RecruitmentAnalytics:
+    """Recruitment report figures backed by per-day aggregate tables
+
+    Each application contributes to the day it was submitted: one count in
+    recruitment_daily_funnel and recruitment_daily_positions for the
+    furthest stage it reached, and, once hired, one count in
+    recruitment_daily_hires for its time to hire. The report sums those
+    small tables instead of scanning job_applications.
+
+    Refreshes run as 'recruitment_analytics_refresh' background jobs
+    (`run_job()`), never inside a request: the report route enqueues one
+    when `refresh_due()` says so. A refresh recomputes only the days whose
+    applications changed since the previous one (found through
+    job_applications.updated_at and recruitment_pipeline.created_at), and
+    the very first one rebuilds everything. Deleted applications leave no
+    such trace, so routes that delete them collect `application_days()`
+    first and call `refresh_days()` after commit.
+
+    All methods expect a plain (tuple) cursor.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.refresh_interval = 30
+        self._lock = threading.Lock()
+        self._refresh_requested_at = None
+        self._schema_ready = False
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('RECRUITMENT_ANALYTICS_REFRESH_SECONDS', 30)
+        self.mysql = mysql
+        self.refresh_interval = app.config['RECRUITMENT_ANALYTICS_REFRESH_SECONDS']
+        app.extensions['recruitment_analytics'] = self
+
+    def ensure_schema(self, cur):
+        """Create the aggregate tables; called from the refresh job and the CLI only"""
+        if self._schema_ready:
+            return
+        for statement in [FUNNEL_TABLE_DDL, HIRES_TABLE_DDL, POSITIONS_TABLE_DDL, STATE_TABLE_DDL]:
+            cur.execute(statement)
+        self._schema_ready = True
+
+    def refresh_due(self):
+        """True at most once per refresh interval per process: time to enqueue a refresh job"""
+        now = time.monotonic()
+        with self._lock:
+            if (self._refresh_requested_at is not None
+                    and now - self._refresh_requested_at < self.refresh_interval):
+                return False
+            self._refresh_requested_at = now
+            return True
+
+    def run_job(self, ctx):
+        """Background job handler for 'recruitment_analytics_refresh' jobs"""
+        cur = ctx.connection.cursor()
+        try:
+            recomputed = self._refresh(cur)
+        finally:
+            cur.close()
+        return {'days_recomputed': recomputed}
+
+    def refresh_days(self, days):
+        """Recompute specific days straight away on a pooled connection"""
+        with self.mysql.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                recomputed = self.recompute_days(cur, days)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        return recomputed
+
+    def _refresh(self, cur):
+        self.ensure_schema(cur)
+        cur.execute("INSERT IGNORE INTO recruitment_analytics_state (id, refreshed_at) VALUES (1, NULL)")
+        # Serialises refreshes across processes for the rest of the transaction
+        cur.execute("SELECT refreshed_at FROM recruitment_analytics_state WHERE id = 1 FOR UPDATE")
+        last_refresh = cur.fetchone()[0]
+        cur.execute("SELECT NOW()")
+        started = cur.fetchone()[0]
+
+        if last_refresh is None:
+            recomputed = self.rebuild(cur)
+        else:
+            cur.execute(DIRTY_DAYS_QUERY, {'since': last_refresh, 'overlap': REFRESH_OVERLAP_SECONDS})
+            days = [row[0] for row in cur.fetchall()]
+            recomputed = self.recompute_days(cur, days)
+
+        cur.execute("UPDATE recruitment_analytics_state SET refreshed_at = %s WHERE id = 1", (started,))
+        return recomputed
+
+    def rebuild(self, cur):
+        """Recompute every day from scratch; the caller commits"""
+        self.ensure_schema(cur)
+        cur.execute("DELETE FROM recruitment_daily_funnel")
+        cur.execute("DELETE FROM recruitment_daily_hires")
+        cur.execute("DELETE FROM recruitment_daily_positions")
+        facts = APPLICATION_FACTS.format(pipeline_filter='', application_filter='')
+        cur.execute(f"""
+            SELECT day, job_position_id, stage_rank, days_to_hire, COUNT(*)
+            FROM ({facts}) facts
+            GROUP BY day, job_position_id, stage_rank, days_to_hire
+        """)
+        return self._store(cur, cur.fetchall())
+
+    def recompute_days(self, cur, days):
+        """Recompute the aggregates for the given application dates; the caller commits"""
+        days = sorted({day for day in days if day})
+        if not days:
+            return 0
+        self.ensure_schema(cur)
+        recomputed = 0
+        for start in range(0, len(days), REFRESH_DAY_BATCH):
+            batch = days[start:start + REFRESH_DAY_BATCH]
+            placeholders = ','.join(['%s'] * len(batch))
+            cur.execute(f"DELETE FROM recruitment_daily_funnel WHERE day IN ({placeholders})", batch)
+            cur.execute(f"DELETE FROM recruitment_daily_hires WHERE day IN ({placeholders})", batch)
+            cur.execute(f"DELETE FROM recruitment_daily_positions WHERE day IN ({placeholders})", batch)
+            facts = APPLICATION_FACTS.format(
+                pipeline_filter=f"""WHERE rp.application_id IN (
+                    SELECT id FROM job_applications WHERE application_date IN ({placeholders}))""",
+                application_filter=f"WHERE ja.application_date IN ({placeholders})")
+            cur.execute(f"""
+                SELECT day, job_position_id, stage_rank, days_to_hire, COUNT(*)
+                FROM ({facts}) facts
+                GROUP BY day, job_position_id, stage_rank, days_to_hire
+            """, batch + batch)
+            self._store(cur, cur.fetchall())
+            recomputed += len(batch)
+        return recomputed
+
+    def _store(self, cur, rows):
+        """Fold (day, job_position_id, stage_rank, days_to_hire, count) rows into the three tables"""
+        funnel = {}
+        positions = {}
+        hires = {}
+        days = set()
+        for day, job_position_id, stage_rank, days_to_hire, count in rows:
+            days.add(day)
+            funnel[(day, stage_rank)] = funnel.get((day, stage_rank), 0) + count
+            key = (day, job_position_id, stage_rank)
+            positions[key] = positions.get(key, 0) + count
+            if days_to_hire is not None:
+                hires[(day, days_to_hire)] = hires.get((day, days_to_hire), 0) + count
+        if funnel:
+            cur.executemany("INSERT INTO recruitment_daily_funnel (day, stage_rank, applications) "
+                            "VALUES (%s, %s, %s)",
+                            [key + (count,) for key, count in funnel.items()])
+        if positions:
+            cur.executemany("INSERT INTO recruitment_daily_positions (day, job_position_id, stage_rank, "
+                            "applications) VALUES (%s, %s, %s, %s)",
+                            [key + (count,) for key, count in positions.items()])
+        if hires:
+            cur.executemany("INSERT INTO recruitment_daily_hires (day, days_to_hire, hires) "
+                            "VALUES (%s, %s, %s)",
+                            [key + (count,) for key, count in hires.items()])
+        return len(days)
+
+    def application_days(self, cur, candidate_id):
+        """Application dates of a candidate, for refresh_days() after a delete"""
+        cur.execute("SELECT DISTINCT application_date FROM job_applications WHERE candidate_id = %s",
+                    (candidate_id,))
+        return [row[0] for row in cur.fetchall()]
+
+    def report(self, cur, period_days=None):
+        """Funnel, conversions and time-to-hire, optionally for the last `period_days` days"""
+        where, params = _period_filter(period_days)
+
+        cur.execute(f"""
+            SELECT stage_rank, SUM(applications)
+            FROM recruitment_daily_funnel {where}
+            GROUP BY stage_rank
+        """, params)
+        furthest = {int(rank): int(count) for rank, count in cur.fetchall()}
+
+        cur.execute(f"""
+            SELECT days_to_hire, SUM(hires)
+            FROM recruitment_daily_hires {where}
+            GROUP BY days_to_hire
+            ORDER BY days_to_hire
+        """, params)
+        histogram = [(int(days), int(count)) for days, count in cur.fetchall()]
+
+        # An application that reached stage N also passed every earlier stage
+        funnel = []
+        reached = 0
+        for rank in range(len(FUNNEL_STAGES), 0, -1):
+            reached += furthest.get(rank, 0)
+            funnel.append({'stage': FUNNEL_STAGES[rank - 1], 'count': reached})
+        funnel.reverse()
+        previous = None
+        for step in funnel:
+            step['conversion_rate'] = _rate(step['count'], previous) if previous is not None else 100.0
+            step['share'] = _rate(step['count'], funnel[0]['count'])
+            previous = step['count']
+
+        hires = sum(count for _, count in histogram)
+        counts = {step['stage']: step['count'] for step in funnel}
+        return {
+            'funnel': funnel,
+            'total_applications': counts['Applied'],
+            'screened': counts['Screening'],
+            'interviewed': counts['Interview'],
+            'offered': counts['Offer'],
+            'hired': counts['Hired'],
+            'conversion_rate': _rate(counts['Hired'], counts['Applied']),
+            'interview_success_rate': _rate(counts['Offer'], counts['Interview']),
+            'offer_acceptance_rate': _rate(counts['Hired'], counts['Offer']),
+            'time_to_hire': {
+                'hires': hires,
+                'average': round(sum(days * count for days, count in histogram) / hires, 1) if hires else None,
+                'p50': percentile(histogram, 0.5),
+                'p75': percentile(histogram, 0.75),
+                'p90': percentile(histogram, 0.9),
+            },
+        }
+
+    def top_positions(self, cur, period_days=None, limit=10):
+        """Positions with the most hires, then applications, with their per-stage counts"""
+        where, params = _period_filter(period_days, column='p.day')
+        cur.execute(TOP_POSITIONS_QUERY.format(where=where), params + (limit,))
+        columns = [column[0] for column in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def recent_activity(self, cur, limit=8):
+        """Latest applications and pipeline stage changes for the activity feed"""
+        cur.execute(RECENT_ACTIVITY_QUERY, (limit, limit, limit))
+        activities = []
+        for kind, happened_at, detail, candidate_name, position_title in cur.fetchall():
+            if kind == 'application':
+                icon, color = 'user-plus', 'success'
+                title = 'New Application Received'
+                description = f"{candidate_name} applied for {position_title}"
+            else:
+                icon, color = STAGE_ACTIVITY_STYLES.get(detail, ('stream', 'info'))
+                title = f"{detail} Stage"
+                description = f"{candidate_name} moved to {detail} for {position_title}"
+            activities.append({'icon': icon, 'color': color, 'title': title,
+                               'description': description, 'timestamp': happened_at})
+        return activities
+
+
+def _period_filter(period_days, column='day'):
+    if not period_days:
+        return '', ()
+    return f'WHERE {column} >= %s', (date.today() - timedelta(days=int(period_days)),)
+
+
+def _rate(part, whole):
+    return round(part / whole * 100, 1) if whole else 0
+
+
+def main():
+    import MySQLdb
+
+    if sys.argv[1:] != ['--rebuild']:
+        print(__doc__.strip().splitlines()[-1])
+        return 2
+
+    db = MySQLdb.connect(host='localhost', user='root', passwd='gmkr', db='lumorange_db')
+    cur = db.cursor()
+    analytics = RecruitmentAnalytics()
+    try:
+        print("🔧 Rebuilding recruitment analytics...")
+        started = time.perf_counter()
+        analytics.ensure_schema(cur)
+        cur.execute("SELECT NOW()")
+        refreshed_at = cur.fetchone()[0]
+        days = analytics.rebuild(cur)
+        cur.execute("INSERT INTO recruitment_analytics_state (id, refreshed_at) VALUES (1, %s) "
+                    "ON DUPLICATE KEY UPDATE refreshed_at = VALUES(refreshed_at)", (refreshed_at,))
+        db.commit()
+        print(f"✅ Aggregated {days} application days in {time.perf_counter() - started:.2f}s")
+        return 0
+    finally:
+        cur.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -100,6 +100,7 @@ CREATE TABLE IF NOT EXISTS interviews (
     meeting_room VARCHAR(100),
     status ENUM('Scheduled', 'In Progress', 'Completed', 'Cancelled', 'Rescheduled', 'No Show') DEFAULT 'Scheduled',
     interviewer_notes TEXT,
+    notes_saved_at DATETIME(6) NULL,
     technical_score DECIMAL(3,1),
     communication_score DECIMAL(3,1),
     cultural_fit_score DECIMAL(3,1),
@@ -165,6 +166,34 @@ CREATE TABLE IF NOT EXISTS recruitment_pipeline (
     FOREIGN KEY (application_id) REFERENCES job_applications(id) ON DELETE CASCADE
 );
 
+-- Per-day aggregates behind the recruitment reports (filled by the analytics refresh job)
+CREATE TABLE IF NOT EXISTS recruitment_daily_funnel (
+    day DATE NOT NULL,
+    stage_rank TINYINT UNSIGNED NOT NULL,
+    applications INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, stage_rank)
+);
+
+CREATE TABLE IF NOT EXISTS recruitment_daily_hires (
+    day DATE NOT NULL,
+    days_to_hire INT NOT NULL,
+    hires INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, days_to_hire)
+);
+
+CREATE TABLE IF NOT EXISTS recruitment_daily_positions (
+    day DATE NOT NULL,
+    job_position_id INT NOT NULL,
+    stage_rank TINYINT UNSIGNED NOT NULL,
+    applications INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, job_position_id, stage_rank)
+);
+
+CREATE TABLE IF NOT EXISTS recruitment_analytics_state (
+    id TINYINT UNSIGNED PRIMARY KEY,
+    refreshed_at DATETIME NULL
+);
+
 -- Insert Sample Interview Types
 INSERT IGNORE INTO interview_types (type_name, description, typical_duration) VALUES
 ('Phone Screening', 'Initial phone screening with HR/Recruiter', 30),
@@ -183,7 +212,10 @@ CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates(email);
 CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates(status);
 CREATE INDEX IF NOT EXISTS idx_applications_status ON job_applications(status);
 CREATE INDEX IF NOT EXISTS idx_applications_date ON job_applications(application_date);
+CREATE INDEX IF NOT EXISTS idx_job_applications_updated_at ON job_applications(updated_at);
+CREATE INDEX IF NOT EXISTS idx_recruitment_pipeline_created_at ON recruitment_pipeline(created_at);
 CREATE INDEX IF NOT EXISTS idx_interviews_date ON interviews(scheduled_date);
 CREATE INDEX IF NOT EXISTS idx_interviews_status ON interviews(status);
 CREATE INDEX IF NOT EXISTS idx_job_positions_status ON job_positions(status);
-CREATE INDEX IF NOT EXISTS idx_offers_status ON job_offers(status);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_offers_status ON job_offers(status);
+CREATE FULLTEXT INDEX IF NOT EXISTS ft_candidates_search ON candidates(first_name, last_name, email, current_company, skills, notes);
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Reference Data Cache for Lumorange Management System
+Dropdown lists held in process memory, invalidated through database version counters
+"""
+
+import threading
+import time
+
+VERSIONS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS reference_data_versions (
+        name VARCHAR(50) PRIMARY KEY,
+        version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+"""
+
+# LAST_INSERT_ID(expr) hands the new counter back to this connection
+VERSION_BUMP = """
+    INSERT INTO reference_data_versions (name, version) VALUES (%s, LAST_INSERT_ID(1))
+    ON DUPLICATE KEY UPDATE version = LAST_INSERT_ID(version + 1)
+"""
+
+# List name -> (query, source table whose writes invalidate it)
+REFERENCE_LISTS = {
+    'departments': ("SELECT id, name FROM departments ORDER BY name", 'departments'),
+    'clients': ("SELECT id, name FROM clients ORDER BY name", 'clients'),
+    'active_clients': ("SELECT id, name FROM clients WHERE status = 'active' ORDER BY name", 'clients'),
+    'projects': ("SELECT id, name FROM projects ORDER BY name", 'projects'),
+    'open_projects': ("SELECT id, name, client_id FROM projects WHERE status != 'completed' ORDER BY name",
+                      'projects'),
+    'active_employees': ("""SELECT id, COALESCE(CONCAT(first_name, ' ', last_name), name) as name, position
+                            FROM employees WHERE status = 'active'
+                            ORDER BY first_name, last_name, name""", 'employees'),
+    'interview_types': ("SELECT id, type_name FROM interview_types ORDER BY type_name", 'interview_types'),
+}
+
+
+class _ReferenceList:
+    __slots__ = ('tuples', 'dicts')
+
+    def __init__(self, columns, rows):
+        self.tuples = [tuple(row[column] for column in columns) if isinstance(row, dict) else tuple(row)
+                       for row in rows]
+        self.dicts = [dict(zip(columns, row)) for row in self.tuples]
+
+
+class ReferenceCache:
+    """Serves the small lists behind the app's dropdowns from memory
+
+    Each list is loaded with the request's cursor the first time it is
+    needed and then shared by every request in the process, as tuples or,
+    with as_dicts=True (for routes working with a DictCursor), as dicts.
+    Returned lists are shared: treat them as read-only.
+
+    Write routes call `invalidate()` with the table they changed after their
+    commit. That drops the lists built from it in this process and bumps the
+    table's counter in reference_data_versions; other workers read all the
+    counters in one query at most every REFERENCE_CACHE_CHECK_SECONDS and
+    reload whatever has moved, so they trail a change by at most that long.
+    Tables without a write route here (interview_types) pick up edits made
+    elsewhere once something bumps their counter.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.check_interval = 2.0
+        self._lock = threading.Lock()
+        self._lists = {}
+        self._versions = {}
+        self._generations = {}
+        self._next_check = 0.0
+        self._schema_ready = False
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'remote_invalidations': 0,
+                       'version_checks': 0, 'errors': 0}
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('REFERENCE_CACHE_CHECK_SECONDS', 2.0)
+        self.mysql = mysql
+        self.check_interval = app.config['REFERENCE_CACHE_CHECK_SECONDS']
+        app.extensions['reference_cache'] = self
+
+    def _ensure_schema(self, cur):
+        if not self._schema_ready:
+            cur.execute(VERSIONS_TABLE_DDL)
+            self._schema_ready = True
+
+    def _drop(self, table):
+        """Forget the lists built from `table`; caller holds the lock"""
+        self._generations[table] = self._generations.get(table, 0) + 1
+        for name, (_query, source) in REFERENCE_LISTS.items():
+            if source == table:
+                self._lists.pop(name, None)
+
+    def _check_versions(self, cur):
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+        try:
+            self._ensure_schema(cur)
+            cur.execute("SELECT name, version FROM reference_data_versions")
+            rows = cur.fetchall()
+        except Exception as e:
+            # Without the counters, fall back to reloading everything next time
+            print(f"Error reading reference data versions: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+                for table in set(source for _query, source in REFERENCE_LISTS.values()):
+                    self._drop(table)
+            return
+        with self._lock:
+            for row in rows:
+                table, version = (row['name'], row['version']) if isinstance(row, dict) else row
+                if self._versions.get(table, 0) != version:
+                    if self._stats['version_checks']:
+                        self._stats['remote_invalidations'] += 1
+                    self._versions[table] = version
+                    self._drop(table)
+            self._stats['version_checks'] += 1
+
+    def get(self, cur, name, as_dicts=False):
+        """Rows of a reference list, loaded with `cur` when not cached"""
+        query, table = REFERENCE_LISTS[name]
+        self._check_versions(cur)
+        with self._lock:
+            cached = self._lists.get(name)
+            if cached is not None:
+                self._stats['hits'] += 1
+                return cached.dicts if as_dicts else cached.tuples
+            # An invalidation that lands during the load keeps the result out of the cache
+            generation = self._generations.get(table, 0)
+
+        cur.execute(query)
+        rows = cur.fetchall()
+        loaded = _ReferenceList([column[0] for column in cur.description], rows)
+        with self._lock:
+            if self._generations.get(table, 0) == generation:
+                self._lists[name] = loaded
+            self._stats['misses'] += 1
+        return loaded.dicts if as_dicts else loaded.tuples
+
+    def invalidate(self, *tables):
+        """Drop lists built from `tables` here and signal the other workers
+
+        Call after the write has been committed; the counter update is
+        committed on the request's connection. The new counter values are
+        recorded here, so this worker does not take its own bump for a
+        remote change on its next version check.
+        """
+        with self._lock:
+            for table in tables:
+                self._drop(table)
+            self._stats['invalidations'] += 1
+        cur = None
+        try:
+            cur = self.mysql.connection.cursor()
+            self._ensure_schema(cur)
+            bumped = {}
+            for table in tables:
+                cur.execute(VERSION_BUMP, (table,))
+                cur.execute("SELECT LAST_INSERT_ID()")
+                bumped[table] = int(cur.fetchone()[0])
+            self.mysql.connection.commit()
+            with self._lock:
+                for table, version in bumped.items():
+                    # A version check may already have seen a later bump
+                    self._versions[table] = max(self._versions.get(table, 0), version)
+        except Exception as e:
+            print(f"Error publishing reference data invalidation for {', '.join(tables)}: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+        finally:
+            if cur is not None:
+                cur.close()
+
+    def stats(self):
+        """Cache counters and the lists currently held, for monitoring"""
+        with self._lock:
+            return dict(self._stats, cached=sorted(self._lists),
+                        versions=dict(self._versions), check_seconds=self.check_interval)
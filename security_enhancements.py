@@ -3,10 +3,16 @@ Security Enhancement Script for Lumorange Management System
 Implements CSRF protection, input validation, and security headers
 """
 
-from flask import request, session, abort, g
+from flask import request, session, abort, g, current_app, make_response
 from functools import wraps
+from collections import OrderedDict
 import hashlib
+import math
+import os
 import secrets
+import sqlite3
+import threading
+import time
 import re
 from datetime import datetime, timedelta
 import html
@@ -201,44 +207,248 @@ class InputValidator:
         
         return errors
 
+class RateLimitResult:
+    """Outcome of a single rate limit check"""
+    
+    __slots__ = ('allowed', 'limit', 'remaining', 'retry_after')
+    
+    def __init__(self, allowed, limit, remaining, retry_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Token bucket: bursts of up to max_requests, refilled evenly over time_window
+    
+    State is (tokens, last_refill, unused).
+    """
+    
+    @staticmethod
+    def check(state, now, max_requests, time_window, cost=1):
+        """Returns (allowed, new_state, remaining, retry_after, expires_at)"""
+        rate = max_requests / time_window
+        if state is None:
+            tokens = float(max_requests)
+        else:
+            tokens = min(float(max_requests), state[0] + (now - state[1]) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+            retry_after = 0.0
+        else:
+            retry_after = (cost - tokens) / rate
+        # A full bucket is the same as no state, so it can be forgotten then
+        expires_at = now + (max_requests - tokens) / rate
+        return allowed, (tokens, now, 0.0), int(tokens), retry_after, expires_at
+
+class SlidingWindowCounter:
+    """Sliding window counter: two fixed-window counts instead of a timestamp log
+    
+    The previous window's count is weighted by how much of it still overlaps
+    the last time_window seconds. State is (window_index, current, previous).
+    """
+    
+    @staticmethod
+    def check(state, now, max_requests, time_window, cost=1):
+        """Returns (allowed, new_state, remaining, retry_after, expires_at)"""
+        index = int(now // time_window)
+        window_start = index * time_window
+        current = previous = 0.0
+        if state is not None:
+            if state[0] == index:
+                current, previous = state[1], state[2]
+            elif state[0] == index - 1:
+                previous = state[1]
+        weight = 1 - (now - window_start) / time_window
+        estimated = previous * weight + current
+        allowed = estimated + cost <= max_requests
+        if allowed:
+            current += cost
+            estimated += cost
+            retry_after = 0.0
+        elif previous and current + cost <= max_requests:
+            # Wait until enough of the previous window has slid out
+            needed_weight = (max_requests - current - cost) / previous
+            retry_after = window_start + (1 - needed_weight) * time_window - now
+        else:
+            # This window is full; it becomes the previous one and must slide out
+            needed_weight = max(0.0, (max_requests - cost) / current) if current else 0.0
+            retry_after = window_start + (2 - needed_weight) * time_window - now
+        expires_at = window_start + 2 * time_window
+        return allowed, (index, current, previous), max(0, int(max_requests - estimated)), retry_after, expires_at
+
+RATE_LIMIT_ALGORITHMS = {
+    'token_bucket': TokenBucket,
+    'sliding_window': SlidingWindowCounter,
+}
+
+class MemoryRateLimitStore:
+    """Per-process limiter state, least recently used identifiers evicted past max_entries
+    
+    Each entry is a key and three floats (a few hundred bytes), so max_entries
+    caps memory however many distinct clients show up.
+    """
+    
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._states)
+    
+    def check(self, key, algorithm, max_requests, time_window, cost=1):
+        now = time.time()
+        with self._lock:
+            entry = self._states.get(key)
+            state = entry[0] if entry is not None and entry[1] > now else None
+            allowed, state, remaining, retry_after, expires_at = algorithm.check(
+                state, now, max_requests, time_window, cost)
+            self._states[key] = (state, expires_at)
+            self._states.move_to_end(key)
+            # Drop expired entries at the cold end, then enforce the cap
+            while self._states:
+                oldest = next(iter(self._states.values()))
+                if oldest[1] > now and len(self._states) <= self.max_entries:
+                    break
+                self._states.popitem(last=False)
+                self.evictions += 1
+        return RateLimitResult(allowed, max_requests, remaining, retry_after)
+
+class SQLiteRateLimitStore:
+    """Limiter state in a SQLite file, so limits hold across all worker processes
+    
+    Every check is one short BEGIN IMMEDIATE transaction (a read and an
+    upsert of a single row) in WAL mode. Expired rows, then the least
+    recently used ones beyond max_entries, are pruned every prune_every
+    checks per process.
+    """
+    
+    def __init__(self, path, max_entries=100000, prune_every=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._local = threading.local()
+    
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            # SQLite connections must not cross a fork or be shared between threads
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    a REAL NOT NULL,
+                    b REAL NOT NULL,
+                    c REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    touched_at REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_expires ON rate_limits (expires_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_touched ON rate_limits (touched_at)")
+            local.connection = connection
+            local.pid = os.getpid()
+            local.checks = 0
+        return local.connection
+    
+    def check(self, key, algorithm, max_requests, time_window, cost=1):
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT a, b, c, expires_at FROM rate_limits WHERE key = ?",
+                                     (key,)).fetchone()
+            state = row[:3] if row is not None and row[3] > now else None
+            allowed, state, remaining, retry_after, expires_at = algorithm.check(
+                state, now, max_requests, time_window, cost)
+            connection.execute("INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, state[0], state[1], state[2], expires_at, now))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        
+        self._local.checks += 1
+        if self._local.checks % self.prune_every == 0:
+            self.prune()
+        return RateLimitResult(allowed, max_requests, remaining, retry_after)
+    
+    def prune(self):
+        connection = self._connection()
+        connection.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (time.time(),))
+        connection.execute("""
+            DELETE FROM rate_limits WHERE key IN (
+                SELECT key FROM rate_limits ORDER BY touched_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
 class RateLimiter:
-    """Simple rate limiting implementation"""
+    """Rate limiting with constant work per request and bounded memory
+    
+    `algorithm` is 'sliding_window' (smooth limit over the window) or
+    'token_bucket' (allows bursts, refills gradually). State lives in
+    `store`: a MemoryRateLimitStore by default, or a SQLiteRateLimitStore
+    to share limits between worker processes.
+    """
     
-    def __init__(self):
-        self.requests = {}
+    def __init__(self, algorithm='sliding_window', store=None, max_entries=10000):
+        if algorithm not in RATE_LIMIT_ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.algorithm = RATE_LIMIT_ALGORITHMS[algorithm]
+        self.store = store if store is not None else MemoryRateLimitStore(max_entries)
+    
+    def hit(self, identifier, max_requests=100, time_window=3600, cost=1):
+        """Count a request against the limit; returns a RateLimitResult"""
+        return self.store.check(identifier, self.algorithm, max_requests, time_window, cost)
     
     def is_allowed(self, identifier, max_requests=100, time_window=3600):
         """Check if request is within rate limits"""
-        now = datetime.now()
-        
-        if identifier not in self.requests:
-            self.requests[identifier] = []
-        
-        # Clean old requests
-        cutoff = now - timedelta(seconds=time_window)
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier] 
-            if req_time > cutoff
-        ]
-        
-        # Check if under limit
-        if len(self.requests[identifier]) < max_requests:
-            self.requests[identifier].append(now)
-            return True
-        
-        return False
+        return self.hit(identifier, max_requests, time_window).allowed
+
+_store_lock = threading.Lock()
+
+def rate_limit_store(app):
+    """The app's shared limiter store, built from config on first use
+    
+    RATE_LIMIT_STORAGE is 'memory' (default, per process) or
+    'sqlite:///path/to/file.db' to share limits across gunicorn workers.
+    """
+    store = app.extensions.get('rate_limit_store')
+    if store is None:
+        with _store_lock:
+            store = app.extensions.get('rate_limit_store')
+            if store is None:
+                storage = app.config.get('RATE_LIMIT_STORAGE', 'memory')
+                max_entries = app.config.get('RATE_LIMIT_MAX_ENTRIES', 10000)
+                if storage.startswith('sqlite:///'):
+                    store = SQLiteRateLimitStore(storage[len('sqlite:///'):], max_entries=max_entries)
+                else:
+                    store = MemoryRateLimitStore(max_entries)
+                app.extensions['rate_limit_store'] = store
+    return store
 
 # Decorator for rate limiting
-def rate_limit(max_requests=100, time_window=3600):
-    """Rate limiting decorator"""
-    limiter = RateLimiter()
+def rate_limit(max_requests=100, time_window=3600, algorithm='sliding_window', key_func=None):
+    """Rate limiting decorator, keyed by client IP unless key_func() says otherwise"""
+    algorithm_class = RATE_LIMIT_ALGORITHMS[algorithm]
     
     def decorator(f):
+        scope = f"{f.__module__}.{f.__qualname__}"
+        
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            identifier = request.remote_addr
-            if not limiter.is_allowed(identifier, max_requests, time_window):
-                abort(429)  # Too Many Requests
+            identifier = key_func() if key_func else request.remote_addr
+            result = rate_limit_store(current_app).check(
+                f"{scope}:{identifier}", algorithm_class, max_requests, time_window)
+            if not result.allowed:
+                response = make_response('Too Many Requests', 429)
+                response.headers['Retry-After'] = str(max(1, math.ceil(result.retry_after)))
+                abort(response)
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -270,6 +480,9 @@ from security_enhancements import SecurityManager, InputValidator, rate_limit
 # Initialize security
 security = SecurityManager(app)
 
+# Optional: share rate limits across gunicorn workers
+app.config['RATE_LIMIT_STORAGE'] = 'sqlite:////var/run/lumorange/rate_limits.db'
+
 @app.route('/add_employee', methods=['POST'])
 @rate_limit(max_requests=10, time_window=60)  # 10 requests per minute
 def add_employee():
@@ -277,7 +490,7 @@ def add_employee():
     errors = InputValidator.validate_form_data('employee', request.form)
     if errors:
         flash('Please correct the following errors: ' + ', '.join(errors.values()), 'danger')
-        return redirect(url_for('employees'))
+        return redirect(url_for('employees.employees'))
     
     # Sanitize input
     clean_data = SecurityManager.sanitize_input(dict(request.form))
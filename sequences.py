@@ -0,0 +1,141 @@
+"""
+Code Sequences for Lumorange Management System
+Atomic counters behind employee IDs, invoice numbers, candidate IDs and interview codes
+"""
+
+import os
+import threading
+
+SEQUENCES_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS code_sequences (
+        name VARCHAR(64) PRIMARY KEY,
+        value BIGINT UNSIGNED NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+"""
+
+
+class _Sequence:
+    """Format plus the query that seeds a counter from codes already in use"""
+
+    __slots__ = ('name', 'code_format', 'seed_sql', 'block_size')
+
+    def __init__(self, name, code_format, seed_sql, block_size):
+        self.name = name
+        self.code_format = code_format
+        self.seed_sql = seed_sql
+        self.block_size = block_size
+
+
+class SequenceAllocator:
+    """Hands out codes from counters in the code_sequences table
+
+    Each allocation is a single `UPDATE ... SET value = LAST_INSERT_ID(value + n)`
+    on its own pooled connection and committed straight away, so the counter
+    row is never locked for the length of the caller's transaction and two
+    requests can never receive the same value. A sequence with block_size > 1
+    reserves that many values per round trip and serves them from memory;
+    values from a block that is never used are simply skipped.
+
+    A counter that does not exist yet is seeded from the highest code already
+    in the table, so existing data is never reissued.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.block_sizes = {}
+        self._sequences = {}
+        self._blocks = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._schema_ready = False
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('SEQUENCE_BLOCK_SIZES', {})
+        self.mysql = mysql
+        self.block_sizes = app.config['SEQUENCE_BLOCK_SIZES']
+        app.extensions['sequences'] = self
+
+    def define(self, name, code_format, seed_sql, block_size=None):
+        """Register a sequence
+
+        `code_format` is a str.format template receiving `value` plus any scope
+        keywords passed to next_code(). `seed_sql` selects the highest number
+        already in use and may reference the same scope keywords as %(name)s.
+        """
+        if block_size is None:
+            block_size = self.block_sizes.get(name, 1)
+        self._sequences[name] = _Sequence(name, code_format, seed_sql, max(1, int(block_size)))
+
+    def next_code(self, name, **scope):
+        """Next formatted code, e.g. next_code('invoice', year=2025) -> 'INV-2025-0042'"""
+        sequence = self._sequences[name]
+        return sequence.code_format.format(value=self.next_value(name, **scope), **scope)
+
+    def next_value(self, name, **scope):
+        sequence = self._sequences[name]
+        key = ':'.join([name] + [str(scope[k]) for k in sorted(scope)])
+        with self._lock:
+            if self._pid != os.getpid():
+                # Blocks reserved by the parent process belong to the parent
+                self._blocks.clear()
+                self._pid = os.getpid()
+            block = self._blocks.get(key)
+            if block and block[0] <= block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+
+        first, last = self._reserve(sequence, key, scope)
+        if last > first:
+            with self._lock:
+                self._blocks[key] = [first + 1, last]
+        return first
+
+    def _reserve(self, sequence, key, scope):
+        """Atomically take `block_size` values; returns the first and last"""
+        count = sequence.block_size
+        with self.mysql.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                if not self._schema_ready:
+                    cur.execute(SEQUENCES_TABLE_DDL)
+                    self._schema_ready = True
+                cur.execute("UPDATE code_sequences SET value = LAST_INSERT_ID(value + %s) WHERE name = %s",
+                            (count, key))
+                if cur.rowcount == 0:
+                    # First use: start after the highest code already issued.
+                    # INSERT IGNORE lets concurrent first users race safely.
+                    cur.execute(f"INSERT IGNORE INTO code_sequences (name, value) "
+                                f"SELECT %(sequence_key)s, COALESCE(({sequence.seed_sql}), 0)",
+                                dict(scope, sequence_key=key))
+                    cur.execute("UPDATE code_sequences SET value = LAST_INSERT_ID(value + %s) WHERE name = %s",
+                                (count, key))
+                cur.execute("SELECT LAST_INSERT_ID()")
+                last = int(cur.fetchone()[0])
+                conn.commit()
+            finally:
+                cur.close()
+        return last - count + 1, last
+
+
+def define_default_sequences(sequences):
+    """The four application codes, seeded from the existing data"""
+    sequences.define(
+        'employee', 'EMP{value:03d}',
+        "SELECT MAX(CAST(SUBSTRING(employee_id, 4) AS UNSIGNED)) FROM employees "
+        "WHERE employee_id REGEXP '^EMP[0-9]+$'")
+    sequences.define(
+        'invoice', 'INV-{year}-{value:04d}',
+        "SELECT MAX(CAST(SUBSTRING_INDEX(invoice_number, '-', -1) AS UNSIGNED)) FROM invoices "
+        "WHERE invoice_number LIKE CONCAT('INV-', %(year)s, '-%%')")
+    sequences.define(
+        'candidate', 'CAND{value:06d}',
+        "SELECT MAX(CAST(SUBSTRING(candidate_id, 5) AS UNSIGNED)) FROM candidates "
+        "WHERE candidate_id REGEXP '^CAND[0-9]+$'")
+    sequences.define(
+        'interview', 'INT{value:03d}',
+        "SELECT MAX(CAST(SUBSTRING(interview_code, 4) AS UNSIGNED)) FROM interviews "
+        "WHERE interview_code REGEXP '^INT[0-9]+$'")
@@ -12,6 +12,10 @@ CREATE TABLE expense_reports (
     amount DECIMAL(10,2) NOT NULL,
     currency VARCHAR(10) DEFAULT 'INR',
     receipt_path VARCHAR(255),
+    receipt_sha256 CHAR(64),
+    receipt_filename VARCHAR(255),
+    receipt_content_type VARCHAR(100),
+    receipt_size INT UNSIGNED,
     vendor_name VARCHAR(100),
     project_id INT,
     status ENUM('submitted', 'approved', 'rejected', 'paid') DEFAULT 'submitted',
@@ -24,7 +28,8 @@ CREATE TABLE expense_reports (
     updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (employee_id) REFERENCES employees(id),
     FOREIGN KEY (approved_by) REFERENCES employees(id),
-    FOREIGN KEY (project_id) REFERENCES projects(id)
+    FOREIGN KEY (project_id) REFERENCES projects(id),
+    INDEX idx_expense_reports_receipt_sha256 (receipt_sha256)
 );
 
 -- Sample expense categories
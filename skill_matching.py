@@ -0,0 +1,264 @@
+"""
+Skill Matching for Lumorange Management System
+Ranks candidates against a job position's required skills
+"""
+
+import importlib.util
+import math
+import re
+import threading
+import time
+
+# NumPy is slow to import, so it is only loaded by the first scoring call
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+
+# Separators used in the free-text skills fields ("Python, Django; REST | SQL")
+_SKILL_SEPARATORS = re.compile(r'[,;|\n\r\t]+|\s+(?:and|&)\s+', re.IGNORECASE)
+_VERSION_SUFFIX = re.compile(r'\s+v?\d+(?:\.\d+)*$')
+
+# Common spellings folded onto one canonical skill
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'node': 'nodejs',
+    'node.js': 'nodejs',
+    'golang': 'go',
+    'k8s': 'kubernetes',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'c sharp': 'c#',
+    'cpp': 'c++',
+}
+
+
+def normalize_skills(text):
+    """Split a free-text skills field into a sorted tuple of canonical skill names"""
+    skills = set()
+    for part in _SKILL_SEPARATORS.split(text or ''):
+        skill = ' '.join(part.lower().split()).strip(' .-')
+        skill = _VERSION_SUFFIX.sub('', skill)
+        if not skill or len(skill) > 60:
+            continue
+        skills.add(SKILL_ALIASES.get(skill, skill))
+    return tuple(sorted(skills))
+
+
+class SkillIndex:
+    """In-memory sparse skill vectors, one row per candidate
+
+    Rows are kept in a dict so single candidates can be replaced cheaply;
+    the packed CSR-style arrays used for scoring are rebuilt lazily after a
+    change, in one pass over all rows.
+    """
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.skills = []
+        self.document_frequency = []
+        self.rows = {}
+        self.members = set()
+        self._packed = None
+
+    def __len__(self):
+        return len(self.members)
+
+    def _column(self, skill):
+        column = self.vocabulary.get(skill)
+        if column is None:
+            column = self.vocabulary[skill] = len(self.skills)
+            self.skills.append(skill)
+            self.document_frequency.append(0)
+        return column
+
+    def set(self, candidate_id, skills):
+        """Replace a candidate's skills"""
+        self.remove(candidate_id)
+        self.members.add(candidate_id)
+        columns = tuple(sorted(self._column(skill) for skill in skills))
+        if columns:
+            self.rows[candidate_id] = columns
+            for column in columns:
+                self.document_frequency[column] += 1
+        self._packed = None
+
+    def remove(self, candidate_id):
+        self.members.discard(candidate_id)
+        columns = self.rows.pop(candidate_id, None)
+        if columns:
+            for column in columns:
+                self.document_frequency[column] -= 1
+            self._packed = None
+
+    def columns(self, skills):
+        """Vocabulary columns for the skills the index knows about"""
+        return [self.vocabulary[skill] for skill in skills if skill in self.vocabulary]
+
+    def weights(self):
+        """Inverse document frequency per column; rare skills count for more"""
+        total = len(self.members)
+        return [math.log((total + 1) / (frequency + 1)) + 1 for frequency in self.document_frequency]
+
+    def _pack(self):
+        import numpy as np
+
+        if self._packed is None:
+            ids = list(self.rows)
+            lengths = [len(self.rows[candidate_id]) for candidate_id in ids]
+            starts = np.zeros(len(ids), dtype=np.int64)
+            if ids:
+                starts[1:] = np.cumsum(lengths[:-1])
+            indices = np.fromiter((column for candidate_id in ids for column in self.rows[candidate_id]),
+                                  dtype=np.int32, count=sum(lengths))
+            self._packed = (np.array(ids, dtype=np.int64), starts, indices)
+        return self._packed
+
+    def score(self, query_weights, limit):
+        """Top `limit` (candidate_id, score, matched) by summed weight of matched skills"""
+        if not self.rows or not query_weights:
+            return []
+        if not NUMPY_AVAILABLE:
+            return self._score_python(query_weights, limit)
+        import numpy as np
+
+        ids, starts, indices = self._pack()
+        query = np.zeros(len(self.skills), dtype=np.float64)
+        for column, weight in query_weights.items():
+            query[column] = weight
+        hits = query[indices]
+        # Every packed row has at least one skill, so reduceat never sees an empty slice
+        scores = np.add.reduceat(hits, starts)
+        matched = np.add.reduceat((hits > 0).astype(np.int32), starts)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        order = np.lexsort((-matched[candidates], -scores[candidates]))
+        return [(int(ids[i]), float(scores[i]), int(matched[i])) for i in candidates[order]]
+
+    def _score_python(self, query_weights, limit):
+        results = []
+        for candidate_id, columns in self.rows.items():
+            weights = [query_weights[column] for column in columns if column in query_weights]
+            if weights:
+                results.append((candidate_id, sum(weights), len(weights)))
+        results.sort(key=lambda result: (-result[1], -result[2]))
+        return results[:limit]
+
+
+class SkillMatcher:
+    """Ranks candidates for a position by weighted overlap of normalized skills
+
+    Each process keeps a SkillIndex of every candidate's skills, loaded on
+    first use and then kept current incrementally: `update_candidate()` and
+    `remove_candidate()` after local edits, plus a periodic sync of rows
+    whose updated_at moved, which picks up edits made by other processes.
+    A position is scored against all candidates at once (vectorised with
+    NumPy when it is installed).
+
+    The score is the share of the position's required skills a candidate
+    covers, each skill weighted by its rarity among candidates. Methods that
+    take a cursor expect a plain (tuple) cursor.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.mysql = mysql
+        self.top_k = 20
+        self.sync_interval = 10
+        self.index = SkillIndex()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._synced_at = None
+        self._checked_at = 0.0
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('SKILL_MATCH_TOP_K', 20)
+        app.config.setdefault('SKILL_MATCH_SYNC_SECONDS', 10)
+        self.mysql = mysql
+        self.top_k = app.config['SKILL_MATCH_TOP_K']
+        self.sync_interval = app.config['SKILL_MATCH_SYNC_SECONDS']
+        app.extensions['skill_matcher'] = self
+
+    def update_candidate(self, candidate_id, skills_text):
+        """Refresh one candidate's vector after it was added or edited"""
+        with self._lock:
+            if self._loaded:
+                self.index.set(int(candidate_id), normalize_skills(skills_text))
+
+    def remove_candidate(self, candidate_id):
+        with self._lock:
+            self.index.remove(int(candidate_id))
+
+    def sync(self, cur, force=False):
+        """Load every candidate on first use, afterwards only the changed ones"""
+        if not force and self._loaded and time.monotonic() - self._checked_at < self.sync_interval:
+            return
+        with self._lock:
+            cur.execute("SELECT NOW()")
+            started = cur.fetchone()[0]
+            if self._loaded:
+                # One second of overlap covers rows committed in the same second
+                cur.execute("SELECT id, skills FROM candidates WHERE updated_at >= %s - INTERVAL 1 SECOND",
+                            (self._synced_at,))
+                for candidate_id, skills in cur.fetchall():
+                    self.index.set(candidate_id, normalize_skills(skills))
+                # Deletions leave no updated_at behind, so compare counts
+                cur.execute("SELECT COUNT(*) FROM candidates")
+                self._loaded = cur.fetchone()[0] == len(self.index)
+            if not self._loaded:
+                cur.execute("SELECT id, skills FROM candidates")
+                index = SkillIndex()
+                for candidate_id, skills in cur.fetchall():
+                    index.set(candidate_id, normalize_skills(skills))
+                self.index = index
+                self._loaded = True
+            self._synced_at = started
+            self._checked_at = time.monotonic()
+
+    def matches(self, cur, required_skills, limit=None):
+        """Top candidates for a required-skills text
+
+        Returns (required, results) where results are dicts with the candidate
+        id, a 0-100 score and the matched and missing skills.
+        """
+        self.sync(cur)
+        limit = max(1, min(int(limit or self.top_k), 500))
+        required = normalize_skills(required_skills)
+        with self._lock:
+            index = self.index
+            weights = index.weights()
+            columns = index.columns(required)
+            query_weights = {column: weights[column] for column in columns}
+            # Skills no candidate has still count towards the maximum score
+            unknown_weight = math.log(len(index) + 1) + 1
+            possible = sum(query_weights.values()) + unknown_weight * (len(required) - len(columns))
+            ranked = index.score(query_weights, limit)
+            candidate_skills = {candidate_id: {index.skills[column] for column in index.rows[candidate_id]}
+                                for candidate_id, _, _ in ranked}
+
+        results = []
+        for candidate_id, score, matched in ranked:
+            skills = candidate_skills[candidate_id]
+            results.append({
+                'candidate_id': candidate_id,
+                'score': round(score / possible * 100, 1) if possible else 0,
+                'matched_skills': [skill for skill in required if skill in skills],
+                'missing_skills': [skill for skill in required if skill not in skills],
+            })
+        return required, results
@@ -0,0 +1,143 @@
+"""
+Template Cache for Lumorange Management System
+Shared Jinja bytecode cache, startup warm-up and per-template compile/render timings
+"""
+
+import os
+import threading
+import time
+
+import click
+from flask import before_render_template, g, template_rendered
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+
+class TimedBytecodeCache(FileSystemBytecodeCache):
+    """FileSystemBytecodeCache that remembers which templates it could serve"""
+
+    def __init__(self, directory):
+        super().__init__(directory, pattern='__lumorange_%s.cache')
+        self.hits = set()
+
+    def load_bytecode(self, bucket):
+        super().load_bytecode(bucket)
+        if bucket.code is not None:
+            self.hits.add(bucket.key)
+
+
+class TemplateCache:
+    """Takes template compilation off the request path
+
+    - compiled templates are stored in TEMPLATE_BYTECODE_CACHE_DIR; every
+      worker reads the same files (written atomically by Jinja), and an
+      entry is only reused while the template's source is unchanged
+    - `warm_up()` loads every template when the app starts (unless
+      TEMPLATE_WARMUP is off), so the first request for a page after a
+      deploy renders straight away; run `flask --app app compile-templates`
+      as a build step to fill the cache before the workers start
+    - `stats()` lists, per template, how long loading took in this process
+      and whether it came from bytecode, plus render count, average and
+      slowest render time
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.bytecode_cache = None
+        self._lock = threading.Lock()
+        self._templates = {}
+        self._warmed = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TEMPLATE_BYTECODE_CACHE_DIR', os.path.join(app.root_path, 'cache', 'jinja'))
+        app.config.setdefault('TEMPLATE_WARMUP', True)
+        self.app = app
+        cache_dir = app.config['TEMPLATE_BYTECODE_CACHE_DIR']
+        os.makedirs(cache_dir, exist_ok=True)
+        self.bytecode_cache = TimedBytecodeCache(cache_dir)
+        app.jinja_env.bytecode_cache = self.bytecode_cache
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        app.cli.command('compile-templates')(self._compile_command)
+        app.extensions['template_cache'] = self
+
+    def _entry(self, name):
+        entry = self._templates.get(name)
+        if entry is None:
+            entry = self._templates[name] = {'load_ms': None, 'source': None, 'error': None,
+                                             'renders': 0, 'render_ms_total': 0.0, 'render_ms_max': 0.0}
+        return entry
+
+    def warm_up(self):
+        """Load every .html template once; returns (loaded, from bytecode, failed)"""
+        if self._warmed is not None:
+            return self._warmed
+        env = self.app.jinja_env
+        loaded = from_bytecode = failed = 0
+        for name in env.list_templates(extensions=['html']):
+            started = time.perf_counter()
+            try:
+                template = env.get_template(name)
+            except TemplateError as e:
+                failed += 1
+                print(f"Error compiling template {name}: {e}")
+                with self._lock:
+                    self._entry(name)['error'] = str(e)
+                continue
+            source = 'bytecode' if self._from_bytecode(template) else 'compiled'
+            with self._lock:
+                entry = self._entry(name)
+                entry['load_ms'] = round((time.perf_counter() - started) * 1000, 2)
+                entry['source'] = source
+            loaded += 1
+            from_bytecode += source == 'bytecode'
+        self._warmed = (loaded, from_bytecode, failed)
+        return self._warmed
+
+    def _from_bytecode(self, template):
+        # Jinja keys buckets by template name plus file name
+        key = self.bytecode_cache.get_cache_key(template.name, template.filename)
+        return key in self.bytecode_cache.hits
+
+    def _render_started(self, sender, template, context, **extra):
+        g.setdefault('_template_render_started', []).append(time.perf_counter())
+
+    def _render_finished(self, sender, template, context, **extra):
+        stack = g.get('_template_render_started')
+        if not stack:
+            return
+        elapsed_ms = (time.perf_counter() - stack.pop()) * 1000
+        with self._lock:
+            entry = self._entry(template.name)
+            entry['renders'] += 1
+            entry['render_ms_total'] += elapsed_ms
+            entry['render_ms_max'] = max(entry['render_ms_max'], elapsed_ms)
+
+    def stats(self):
+        """Per-template load and render timings, slowest average render first"""
+        with self._lock:
+            templates = []
+            for name, entry in self._templates.items():
+                row = dict(entry, name=name)
+                row['render_ms_avg'] = round(entry['render_ms_total'] / entry['renders'], 2) if entry['renders'] else None
+                row['render_ms_total'] = round(entry['render_ms_total'], 2)
+                row['render_ms_max'] = round(entry['render_ms_max'], 2)
+                templates.append(row)
+        templates.sort(key=lambda row: row['render_ms_avg'] or 0, reverse=True)
+        return {'bytecode_cache_dir': self.bytecode_cache.directory, 'templates': templates}
+
+    def _compile_command(self):
+        """Compile every template into the bytecode cache and print timings"""
+        loaded, from_bytecode, failed = self.warm_up()
+        rows = sorted(self.stats()['templates'], key=lambda row: row['load_ms'] or 0, reverse=True)
+        for row in rows:
+            if row['error']:
+                click.echo(f"❌ {row['name']}: {row['error']}")
+            else:
+                click.echo(f"{row['load_ms']:>9.1f}ms  {row['source']:<8}  {row['name']}")
+        total_ms = sum(row['load_ms'] or 0 for row in rows)
+        click.echo(f"✅ {loaded} templates ready ({from_bytecode} already cached, {failed} failed) "
+                   f"in {total_ms:.0f}ms")
+        if failed:
+            raise SystemExit(1)
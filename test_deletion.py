@@ -5,7 +5,6 @@ Test script to verify deletion functionality in the recruitment system
 
 import MySQLdb
 import MySQLdb.cursors
-from flask_mysqldb import MySQL
 from app import app
 import sys
 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination cursors
+Cursor encoding/decoding, the seek predicate built for each direction and a
+forward/backward walk over rows with duplicate sort values. Needs no database.
+
+Usage: python test_pagination.py   (or pytest test_pagination.py)
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from pagination import KeysetPaginator, decode_cursor, encode_cursor
+
+SORT_OPTIONS = {
+    'name': ('e.name', 'name', 'Name'),
+    'salary': ('e.salary', 'salary', 'Salary', 0),
+}
+
+
+def paginator(page_size=3):
+    return KeysetPaginator(SORT_OPTIONS, 'name', default_order='asc', default_page_size=page_size)
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(['Asha', 42])
+    assert decode_cursor(token, 2) == ['Asha', 42]
+
+
+def test_cursor_is_url_safe_without_padding():
+    # Lengths that would need one and two padding characters
+    for values in (['a', 1], ['ab', 1], ['abc', 1], ['?>~?>~', 7]):
+        token = encode_cursor(values)
+        assert '=' not in token and '+' not in token and '/' not in token
+        assert decode_cursor(token, 2) == values
+
+
+def test_cursor_encodes_dates_and_decimals_as_strings():
+    values = [datetime(2025, 3, 1, 9, 30), date(2025, 3, 1), timedelta(hours=2), Decimal('1234.50')]
+    assert decode_cursor(encode_cursor(values), 4) == [
+        '2025-03-01 09:30:00', '2025-03-01', '2:00:00', '1234.50']
+
+
+def test_malformed_cursors_decode_to_none():
+    assert decode_cursor(None, 2) is None
+    assert decode_cursor('', 2) is None
+    assert decode_cursor('not base64!', 2) is None
+    assert decode_cursor('bm90IGpzb24', 2) is None  # "not json"
+    assert decode_cursor('eyJhIjogMX0', 2) is None  # {"a": 1}
+    assert decode_cursor('ImFiIg', 2) is None  # "ab"
+    assert decode_cursor('__4', 2) is None  # not UTF-8
+    assert decode_cursor('été', 2) is None
+
+
+def test_cursor_of_the_wrong_size_is_ignored():
+    assert decode_cursor(encode_cursor(['Asha']), 2) is None
+    assert decode_cursor(encode_cursor(['Asha', 1, 2]), 2) is None
+
+
+def test_parse_falls_back_on_bad_arguments():
+    state = paginator().parse({'sort': 'password', 'order': 'sideways', 'per_page': 'lots',
+                               'after': 'garbage'})
+    assert state == {'sort': 'name', 'order': 'asc', 'page_size': 3, 'cursor': None, 'direction': 'next'}
+    assert paginator().parse({'per_page': '100000'})['page_size'] == 100
+
+
+def test_parse_reads_before_cursor():
+    state = paginator().parse({'before': encode_cursor(['Asha', 4])})
+    assert state['direction'] == 'prev' and state['cursor'] == ['Asha', 4]
+
+
+def test_build_seek_predicate_for_each_direction():
+    query = "SELECT * FROM employees e WHERE e.status = %s"
+    state = paginator().parse({'after': encode_cursor(['Asha', 4])})
+    sql, params = paginator().build(query, ['Active'], state)
+    assert sql.endswith("AND (e.name > %s OR (e.name = %s AND id > %s)) "
+                        "ORDER BY e.name ASC, id ASC LIMIT %s")
+    assert params == ['Active', 'Asha', 'Asha', 4, 4]
+
+    # Going back over an ascending list seeks downwards, then page() reverses the rows
+    state = paginator().parse({'before': encode_cursor(['Asha', 4])})
+    sql, _ = paginator().build(query, ['Active'], state)
+    assert "e.name < %s" in sql and sql.endswith("ORDER BY e.name DESC, id DESC LIMIT %s")
+
+
+def test_build_substitutes_nulls_in_nullable_sort_columns():
+    state = paginator().parse({'sort': 'salary', 'after': encode_cursor([0, 9])})
+    sql, params = paginator().build("SELECT * FROM employees e WHERE 1=1", [], state)
+    assert "COALESCE(e.salary, %s) > %s" in sql
+    assert params == [0, 0, 0, 0, 9, 0, 4]
+
+
+ROWS = [{'id': i, 'name': name} for i, name in enumerate(
+    ['Ravi', 'Asha', 'Meera', 'Asha', 'Kiran', 'Asha', 'Zoya', 'Meera'], start=1)]
+
+
+def fetch(pager, args):
+    """What the database returns for build()'s query over ROWS"""
+    state = pager.parse(args)
+    ascending = (state['order'] == 'asc') != (state['direction'] == 'prev')
+    rows = sorted(ROWS, key=lambda row: (row['name'], row['id']), reverse=not ascending)
+    if state['cursor'] is not None:
+        key = tuple(state['cursor'])
+        rows = [row for row in rows if ((row['name'], row['id']) > key) == ascending
+                and (row['name'], row['id']) != key]
+    return pager.page(rows[:state['page_size'] + 1], state)
+
+
+def test_walk_forward_and_back_visits_every_row_once():
+    pager = paginator()
+    expected = [row['id'] for row in sorted(ROWS, key=lambda row: (row['name'], row['id']))]
+
+    pages = [fetch(pager, {})]
+    assert not pages[0].has_prev
+    while pages[-1].has_next:
+        pages.append(fetch(pager, {'after': pages[-1].next_cursor}))
+    assert [row['id'] for page in pages for row in page.items] == expected
+    assert [len(page.items) for page in pages] == [3, 3, 2]
+
+    back = [pages[-1]]
+    while back[-1].has_prev:
+        back.append(fetch(pager, {'before': back[-1].prev_cursor}))
+    assert [[row['id'] for row in page.items] for page in back] == \
+        [[row['id'] for row in page.items] for page in reversed(pages)]
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e!r}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test rate limiter decisions and Retry-After values
+Token bucket and sliding window checks at window boundaries, plus the
+429 response of the rate_limit decorator. Needs no database.
+
+Usage: python test_rate_limiter.py   (or pytest test_rate_limiter.py)
+"""
+
+import math
+import sys
+
+from flask import Flask
+
+import security_enhancements
+from security_enhancements import MemoryRateLimitStore, SlidingWindowCounter, TokenBucket, rate_limit
+
+
+def hits(algorithm, times, max_requests, time_window, state=None):
+    """Run checks at the given times; returns (results, final state)"""
+    results = []
+    for now in times:
+        allowed, state, remaining, retry_after, expires_at = algorithm.check(
+            state, now, max_requests, time_window)
+        results.append((allowed, remaining, retry_after, expires_at))
+    return results, state
+
+
+def test_token_bucket_allows_a_full_burst_then_denies():
+    results, _ = hits(TokenBucket, [100.0] * 11, 10, 10)
+    assert all(allowed for allowed, _, _, _ in results[:10])
+    assert [remaining for _, remaining, _, _ in results[:10]] == list(range(9, -1, -1))
+    allowed, remaining, retry_after, _ = results[10]
+    assert not allowed and remaining == 0
+    # One token refills per second at 10 requests / 10 seconds
+    assert retry_after == 1.0
+
+
+def test_token_bucket_retry_after_is_exact():
+    _, state = hits(TokenBucket, [100.0] * 10, 10, 10)
+    denied, _ = hits(TokenBucket, [100.999], 10, 10, state)
+    assert not denied[0][0]
+    assert math.isclose(denied[0][2], 0.001, abs_tol=1e-9)
+    allowed, _ = hits(TokenBucket, [101.0], 10, 10, state)
+    assert allowed[0][0]
+
+
+def test_token_bucket_state_expires_when_full_again():
+    results, _ = hits(TokenBucket, [100.0] * 4, 10, 10)
+    # Four tokens used, refilled one per second
+    assert results[-1][3] == 104.0
+
+
+def test_token_bucket_cost_above_tokens_waits_for_the_difference():
+    _, state = hits(TokenBucket, [100.0] * 8, 10, 10)
+    allowed, state, remaining, retry_after, _ = TokenBucket.check(state, 100.0, 10, 10, cost=3)
+    assert not allowed and remaining == 2
+    assert retry_after == 1.0
+
+
+def test_sliding_window_denies_past_the_limit():
+    results, _ = hits(SlidingWindowCounter, [600.0] * 11, 10, 60)
+    assert all(allowed for allowed, _, _, _ in results[:10])
+    allowed, remaining, retry_after, expires_at = results[10]
+    assert not allowed and remaining == 0
+    # The full window must slide out until 9 of its 10 requests no longer count
+    assert retry_after == 66.0
+    assert expires_at == 720.0
+
+
+def test_sliding_window_allows_exactly_at_retry_after():
+    _, state = hits(SlidingWindowCounter, [600.0] * 10, 10, 60)
+    early, _ = hits(SlidingWindowCounter, [665.9], 10, 60, state)
+    assert not early[0][0]
+    on_time, _ = hits(SlidingWindowCounter, [666.0], 10, 60, state)
+    assert on_time[0][0]
+
+
+def test_sliding_window_retry_after_while_previous_window_slides_out():
+    _, state = hits(SlidingWindowCounter, [600.0] * 10 + [666.0], 10, 60)
+    denied, _ = hits(SlidingWindowCounter, [666.0], 10, 60, state)
+    allowed, _, retry_after, _ = denied[0]
+    assert not allowed
+    # Needs the previous window's weight down to 0.8: 12 seconds into the window
+    assert math.isclose(retry_after, 6.0)
+    later, _ = hits(SlidingWindowCounter, [672.0], 10, 60, state)
+    assert later[0][0]
+
+
+def test_sliding_window_forgets_windows_older_than_the_previous_one():
+    _, state = hits(SlidingWindowCounter, [600.0] * 10, 10, 60)
+    results, _ = hits(SlidingWindowCounter, [720.0], 10, 60, state)
+    allowed, remaining, _, _ = results[0]
+    assert allowed and remaining == 9
+
+
+def test_memory_store_keeps_clients_apart():
+    store = MemoryRateLimitStore()
+    assert store.check('a', SlidingWindowCounter, 1, 60).allowed
+    assert not store.check('a', SlidingWindowCounter, 1, 60).allowed
+    assert store.check('b', SlidingWindowCounter, 1, 60).allowed
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def _limited_app():
+    app = Flask(__name__)
+
+    @app.route('/limited')
+    @rate_limit(max_requests=1, time_window=60)
+    def limited():
+        return 'ok'
+
+    return app
+
+
+def test_decorator_sends_retry_after_at_window_boundaries():
+    clock = _Clock(600.0)
+    real_time = security_enhancements.time
+    security_enhancements.time = clock
+    try:
+        client = _limited_app().test_client()
+        assert client.get('/limited').status_code == 200
+        response = client.get('/limited')
+        assert response.status_code == 429
+        # A full window at its start waits for the next one to slide past it
+        assert response.headers['Retry-After'] == '120'
+        clock.now = 659.5
+        assert client.get('/limited').headers['Retry-After'] == '61'
+        clock.now = 660.0
+        assert client.get('/limited').headers['Retry-After'] == '60'
+        clock.now = 719.9999
+        assert client.get('/limited').headers['Retry-After'] == '1'
+        clock.now = 720.0
+        assert client.get('/limited').status_code == 200
+    finally:
+        security_enhancements.time = real_time
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e!r}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test reference list caching
+Lists loaded through an instrumented DictCursor-shaped cursor come back in
+the shape the caller asks for, from memory after the first load, and are
+reloaded when another worker bumps their version. Needs no database.
+
+Usage: python test_reference_cache.py   (or pytest test_reference_cache.py)
+"""
+
+import sys
+
+from flask import Flask, g
+
+from query_instrumentation import InstrumentedCursor, QueryInstrumentation
+from reference_cache import ReferenceCache
+
+DEPARTMENTS = [(1, 'Engineering'), (2, 'Finance')]
+
+
+class FakeCursor:
+    """Answers the two queries the cache runs, with dict rows like MySQLdb's DictCursor"""
+
+    def __init__(self, versions, dict_rows=True):
+        self.versions = versions
+        self.dict_rows = dict_rows
+        self.statements = []
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+
+    def execute(self, query, args=None):
+        self.statements.append(query)
+        if 'reference_data_versions' in query:
+            columns, rows = ('name', 'version'), list(self.versions.items())
+        else:
+            columns, rows = ('id', 'name'), DEPARTMENTS
+        self.description = tuple((column,) for column in columns)
+        self._rows = [dict(zip(columns, row)) if self.dict_rows else row for row in rows]
+        self.rowcount = len(rows)
+        return self.rowcount
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        pass
+
+
+def instrumented(fake):
+    instrumentation = QueryInstrumentation()
+    instrumentation.slow_query_ms = float('inf')
+    return InstrumentedCursor(fake, instrumentation)
+
+
+def cache():
+    reference_cache = ReferenceCache()
+    reference_cache.check_interval = 0
+    return reference_cache
+
+
+def test_dict_cursor_through_instrumentation_proxy():
+    app = Flask(__name__)
+    reference_cache = cache()
+    fake = FakeCursor({'departments': 1})
+    with app.test_request_context():
+        g._sql_queries = []
+        cur = instrumented(fake)
+        departments = reference_cache.get(cur, 'departments', as_dicts=True)
+        assert departments == [{'id': 1, 'name': 'Engineering'}, {'id': 2, 'name': 'Finance'}]
+        # Served from memory the second time, still as dicts
+        assert reference_cache.get(cur, 'departments', as_dicts=True) == departments
+        assert sum('FROM departments' in sql for sql in fake.statements) == 1
+        assert reference_cache.get(cur, 'departments') == DEPARTMENTS
+        assert len(g._sql_queries) == len(fake.statements)
+    stats = reference_cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 1 and stats['errors'] == 0
+
+
+def test_tuple_cursor_load_serves_dict_callers():
+    app = Flask(__name__)
+    reference_cache = cache()
+    with app.app_context():
+        assert reference_cache.get(instrumented(FakeCursor({}, dict_rows=False)), 'departments') == DEPARTMENTS
+        dict_cur = instrumented(FakeCursor({}))
+        assert reference_cache.get(dict_cur, 'departments', as_dicts=True)[1] == {'id': 2, 'name': 'Finance'}
+
+
+def test_remote_version_bump_reloads_the_list():
+    app = Flask(__name__)
+    reference_cache = cache()
+    versions = {'departments': 1}
+    fake = FakeCursor(versions)
+    with app.app_context():
+        cur = instrumented(fake)
+        reference_cache.get(cur, 'departments', as_dicts=True)
+        versions['departments'] = 2
+        reference_cache.get(cur, 'departments', as_dicts=True)
+    assert sum('FROM departments' in sql for sql in fake.statements) == 2
+    assert reference_cache.stats()['remote_invalidations'] == 1
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e!r}")
+    sys.exit(1 if failed else 0)